@@ -1,16 +1,56 @@
+import asyncio
+import base64
 import os
 import json
-from dataclasses import dataclass
-from typing import Any, Literal, Dict, Optional
+import re
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, AsyncIterator, Literal, Dict, Optional
 
 from dotenv import load_dotenv
 import httpx
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from decimal import Decimal
 
 from pydantic import BaseModel, ConfigDict, Field
-from pydantic_ai import Agent, RunContext
+from pydantic_ai import (
+    Agent,
+    AgentRunResultEvent,
+    ApprovalRequired,
+    DeferredToolRequests,
+    DeferredToolResults,
+    FunctionToolCallEvent,
+    FunctionToolResultEvent,
+    FunctionToolset,
+    PartDeltaEvent,
+    PartStartEvent,
+    RunContext,
+    RunUsage,
+    TextPart,
+    TextPartDelta,
+    ToolCallPart,
+    ToolReturnPart,
+    ToolsetTool,
+    WrapperToolset,
+)
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    UserPromptPart,
+)
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
@@ -39,22 +79,91 @@ api_key: {api_key[:4]}...{api_key[-4:]}
 
 # ---------- Exceptions ----------
 
-class ClientSidePaymentRequired(Exception):
-    """Raised when the backend returns 402, signaling the frontend must pay."""
+class ClientSidePaymentRequired(ApprovalRequired):
+    """
+    Raised when the backend returns 402, signaling the frontend must pay.
+
+    The tool call is deferred rather than failing the run: the run ends with
+    DeferredToolRequests whose metadata holds the payment request, and the
+    call is retried once the frontend sends payment headers.
+    """
     def __init__(self, payment_info: Dict[str, Any]):
         self.payment_info = payment_info
-        super().__init__("Payment Required")
+        super().__init__(metadata={"payment_request": payment_info})
 
 # ---------- Dependencies for the agent ----------
 
+# Tool calls of one chat turn that may run at the same time
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+
+
+class ToolTiming(BaseModel):
+    tool: str
+    tool_call_id: str | None = None
+    start_ms: float = Field(description="Start, relative to the beginning of the turn")
+    duration_ms: float
+    outcome: Literal["ok", "payment_required", "error"]
+
+
 @dataclass
 class Deps:
     """
     Dependencies injected into tools.
     
-    Holds optional payment headers provided by the frontend after a successful payment.
+    Holds optional payment headers provided by the frontend after a successful payment,
+    the tool call they pay for (None: any call), plus the per-turn tool slots and
+    the timings of the tool calls made so far.
     """
     payment_headers: Optional[Dict[str, str]] = None
+    payment_for: Optional[str] = None
+    tool_slots: asyncio.Semaphore = field(default_factory=lambda: asyncio.Semaphore(TOOL_CONCURRENCY))
+    tool_timings: list[ToolTiming] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+@asynccontextmanager
+async def tool_slot(deps: Deps, tool_name: str, tool_call_id: str | None) -> AsyncIterator[None]:
+    """Hold one of the turn's tool slots and record how long the call took."""
+    async with deps.tool_slots:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        except ClientSidePaymentRequired:
+            outcome = "payment_required"
+            raise
+        finally:
+            deps.tool_timings.append(
+                ToolTiming(
+                    tool=tool_name,
+                    tool_call_id=tool_call_id,
+                    start_ms=round((started - deps.started_at) * 1000, 1),
+                    duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                    outcome=outcome,
+                )
+            )
+
+
+@dataclass
+class TimedToolset(WrapperToolset[Deps]):
+    """
+    Runs backend tools with bounded parallelism and records their timings.
+
+    pydantic-ai starts all tool calls of a model response at once, e.g.
+    get_node_stats and list_lxc_stats, or exec on several ctids. Each call
+    waits for one of the turn's TOOL_CONCURRENCY slots, so a wide fan-out
+    does not flood the backend.
+    """
+
+    async def call_tool(
+        self, name: str, tool_args: dict[str, Any], ctx: RunContext[Deps], tool: ToolsetTool[Deps]
+    ) -> Any:
+        async with tool_slot(ctx.deps, name, ctx.tool_call_id):
+            return await super().call_tool(name, tool_args, ctx, tool)
+
+
+backend_tools = FunctionToolset[Deps]()
 
 
 # ---------- Define the agent ----------
@@ -68,6 +177,9 @@ agent = Agent(
         )
     ),
     deps_type=Deps,
+    toolsets=[TimedToolset(backend_tools)],
+    # Tool calls that hit a 402 end the run as DeferredToolRequests
+    output_type=[str, DeferredToolRequests],
     instructions=(
         "You are a chatbot that can create paid LXC leases via x402.\n"
         "- Before any paid action, calculate and show the estimated USD price using this formula and ask the user to confirm. Only submit lease_container or renew_lease after the user explicitly approves and set confirmPurchase=True on that call.\n"
@@ -89,6 +201,43 @@ def backend_base_url() -> str:
     return os.getenv("BACKEND_BASE_URL", "http://localhost:4021").rstrip("/")
 
 
+# ---------- Shared HTTP client to the backend ----------
+
+_backend_client: httpx.AsyncClient | None = None
+
+
+def backend_client() -> httpx.AsyncClient:
+    """
+    App-lifetime pooled client to BACKEND_BASE_URL.
+
+    Connections are kept alive between tool calls, so a chat turn that
+    chains several tools reuses them instead of reconnecting. Per-call
+    headers (payment, wallet) are passed on each request, never set on
+    the shared client. Limits come from BACKEND_MAX_CONNECTIONS,
+    BACKEND_MAX_KEEPALIVE and BACKEND_KEEPALIVE_EXPIRY.
+    """
+    global _backend_client
+    if _backend_client is None or _backend_client.is_closed:
+        _backend_client = httpx.AsyncClient(
+            base_url=backend_base_url(),
+            timeout=float(os.getenv("BACKEND_TIMEOUT", "60")),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("BACKEND_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("BACKEND_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("BACKEND_KEEPALIVE_EXPIRY", "30")),
+            ),
+        )
+    return _backend_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    backend_client()
+    yield
+    if _backend_client is not None:
+        await _backend_client.aclose()
+
+
 def _forward_auth_headers(request: Request) -> dict[str, str]:
     headers: dict[str, str] = {}
     for header_name in ("X-Wallet", "X-Payment"):
@@ -99,8 +248,7 @@ def _forward_auth_headers(request: Request) -> dict[str, str]:
 
 
 async def _proxy_get_json(path: str, request: Request) -> Any:
-    async with httpx.AsyncClient(base_url=backend_base_url(), timeout=20.0) as client:
-        resp = await client.get(path, headers=_forward_auth_headers(request))
+    resp = await backend_client().get(path, headers=_forward_auth_headers(request), timeout=20.0)
 
     if resp.status_code >= 400:
         try:
@@ -212,25 +360,14 @@ class LxcStats(BaseModel):
     error: str | None = None
 
 
-def _client(deps: Deps) -> httpx.AsyncClient:
+def _backend_headers(ctx: RunContext[Deps], wallet: str | None = None) -> Dict[str, str]:
     """
-    Create a standard httpx client.
-    If headers are present in deps, they are attached.
+    Per-call headers for the backend: payment headers from deps, when they
+    pay for this call, plus X-Wallet when given.
     """
-    headers = {}
-    if deps.payment_headers:
-        headers.update(deps.payment_headers)
-    
-    return httpx.AsyncClient(
-        base_url=backend_base_url(),
-        headers=headers,
-        timeout=60.0,
-    )
-
-
-def _headers_with_wallet(deps: Deps, wallet: str | None) -> Dict[str, str]:
+    deps = ctx.deps
     headers: Dict[str, str] = {}
-    if deps.payment_headers:
+    if deps.payment_headers and deps.payment_for in (None, ctx.tool_call_id):
         headers.update(deps.payment_headers)
     if wallet:
         headers["X-Wallet"] = wallet
@@ -273,7 +410,7 @@ def _estimate_price(
     return f"${total.quantize(Decimal('0.0001'))}"
 
 
-@agent.tool
+@backend_tools.tool
 async def lease_container(
     ctx: RunContext[Deps],
     sku: str,
@@ -328,13 +465,13 @@ async def lease_container(
         requester=requester,
     )
 
-    async with _client(ctx.deps) as client:
-        resp = await client.post("/lease/container", json=payload.model_dump(exclude_none=True))
-        await _check_response(resp)
-        return LeaseResponse.model_validate(resp.json())
+    client = backend_client()
+    resp = await client.post("/lease/container", json=payload.model_dump(exclude_none=True), headers=_backend_headers(ctx))
+    await _check_response(resp)
+    return LeaseResponse.model_validate(resp.json())
 
 
-@agent.tool
+@backend_tools.tool
 async def exec_container_command(
     ctx: RunContext[Deps],
     ctid: str,
@@ -353,13 +490,13 @@ async def exec_container_command(
     """
     payload = ExecRequest(command=command, extraArgs=extraArgs)
 
-    async with _client(ctx.deps) as client:
-        resp = await client.post(f"/management/exec/{ctid}", json=payload.model_dump(exclude_none=True))
-        await _check_response(resp)
-        return ExecResponse.model_validate(resp.json())
+    client = backend_client()
+    resp = await client.post(f"/management/exec/{ctid}", json=payload.model_dump(exclude_none=True), headers=_backend_headers(ctx))
+    await _check_response(resp)
+    return ExecResponse.model_validate(resp.json())
 
 
-@agent.tool
+@backend_tools.tool
 async def exec_lease_command(
     ctx: RunContext[Deps],
     ctid: str,
@@ -378,13 +515,13 @@ async def exec_lease_command(
     """
     payload = ExecRequest(command=command, extraArgs=extraArgs)
 
-    async with _client(ctx.deps) as client:
-        resp = await client.post(f"/management/exec/{ctid}", json=payload.model_dump(exclude_none=True))
-        await _check_response(resp)
-        return ExecResponse.model_validate(resp.json())
+    client = backend_client()
+    resp = await client.post(f"/management/exec/{ctid}", json=payload.model_dump(exclude_none=True), headers=_backend_headers(ctx))
+    await _check_response(resp)
+    return ExecResponse.model_validate(resp.json())
 
 
-@agent.tool
+@backend_tools.tool
 async def renew_lease(
     ctx: RunContext[Deps],
     ctid: str,
@@ -408,13 +545,13 @@ async def renew_lease(
 
     payload = RenewLeaseRequest(runtimeMinutes=runtimeMinutes)
 
-    async with _client(ctx.deps) as client:
-        resp = await client.post(f"/lease/{ctid}/renew", json=payload.model_dump())
-        await _check_response(resp)
-        return LeaseResponse.model_validate(resp.json())
+    client = backend_client()
+    resp = await client.post(f"/lease/{ctid}/renew", json=payload.model_dump(), headers=_backend_headers(ctx))
+    await _check_response(resp)
+    return LeaseResponse.model_validate(resp.json())
 
 
-@agent.tool
+@backend_tools.tool
 async def open_container_console(
     ctx: RunContext[Deps],
     ctid: str,
@@ -429,13 +566,13 @@ async def open_container_console(
     """
     payload = ConsoleRequest(consoleType=consoleType)
 
-    async with _client(ctx.deps) as client:
-        resp = await client.post(f"/management/console/{ctid}", json=payload.model_dump(exclude_none=True))
-        await _check_response(resp)
-        return ConsoleResponse.model_validate(resp.json())
+    client = backend_client()
+    resp = await client.post(f"/management/console/{ctid}", json=payload.model_dump(exclude_none=True), headers=_backend_headers(ctx))
+    await _check_response(resp)
+    return ConsoleResponse.model_validate(resp.json())
 
 
-@agent.tool
+@backend_tools.tool
 async def open_lease_console(
     ctx: RunContext[Deps],
     ctid: str,
@@ -451,19 +588,19 @@ async def open_lease_console(
     return await open_container_console(ctx, ctid=ctid, consoleType=consoleType)
 
 
-@agent.tool
+@backend_tools.tool
 async def list_managed_containers(ctx: RunContext[Deps]) -> list[ManagedContainer]:
     """
     Retrieve active and past leases via `/management/list`.
     """
-    async with _client(ctx.deps) as client:
-        resp = await client.get("/management/list")
-        await _check_response(resp)
-        raw_list = resp.json()
-        return [ManagedContainer.model_validate(item) for item in raw_list]
+    client = backend_client()
+    resp = await client.get("/management/list", headers=_backend_headers(ctx))
+    await _check_response(resp)
+    raw_list = resp.json()
+    return [ManagedContainer.model_validate(item) for item in raw_list]
 
 
-@agent.tool
+@backend_tools.tool
 async def get_node_stats(
     ctx: RunContext[Deps],
     wallet: str | None = None,
@@ -474,18 +611,13 @@ async def get_node_stats(
     Optional:
     - wallet: address to send via X-Wallet header for mock auth
     """
-    headers = _headers_with_wallet(ctx.deps, wallet)
-    async with httpx.AsyncClient(
-        base_url=backend_base_url(),
-        headers=headers,
-        timeout=60.0,
-    ) as client:
-        resp = await client.get("/stats/node")
-        await _check_response(resp)
-        return NodeStatsResponse.model_validate(resp.json())
+    client = backend_client()
+    resp = await client.get("/stats/node", headers=_backend_headers(ctx, wallet))
+    await _check_response(resp)
+    return NodeStatsResponse.model_validate(resp.json())
 
 
-@agent.tool
+@backend_tools.tool
 async def list_lxc_stats(
     ctx: RunContext[Deps],
     wallet: str | None = None,
@@ -496,21 +628,16 @@ async def list_lxc_stats(
     Optional:
     - wallet: address to send via X-Wallet header for mock auth
     """
-    headers = _headers_with_wallet(ctx.deps, wallet)
-    async with httpx.AsyncClient(
-        base_url=backend_base_url(),
-        headers=headers,
-        timeout=60.0,
-    ) as client:
-        resp = await client.get("/stats/lxc")
-        await _check_response(resp)
-        raw_list = resp.json()
-        return [LxcStats.model_validate(item) for item in raw_list]
+    client = backend_client()
+    resp = await client.get("/stats/lxc", headers=_backend_headers(ctx, wallet))
+    await _check_response(resp)
+    raw_list = resp.json()
+    return [LxcStats.model_validate(item) for item in raw_list]
 
 
 # ---------- FastAPI wrapper around the agent ----------
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -530,11 +657,17 @@ class ChatRequest(BaseModel):
     message: str
     history: list[ChatMessage] = []
     payment_headers: Optional[Dict[str, str]] = None
+    conversation_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
     reply: str
     payment_request: Optional[Dict[str, Any]] = None
+    conversation_id: Optional[str] = None
+    tool_timings: list[ToolTiming] = []
+
+
+PAYMENT_REQUIRED_REPLY = "Payment Required. Please confirm the transaction in your wallet."
 
 
 class InfoResponse(BaseModel):
@@ -543,47 +676,747 @@ class InfoResponse(BaseModel):
     api_key: str
 
 
-def build_prompt(message: str, history: list[ChatMessage]) -> str:
+# ---------- Conversation history ----------
+
+# Rough token budget for replayed history; older turns are folded into a summary
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+SUMMARY_CHARS_PER_MESSAGE = 200
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting
+    return len(text) // 4 + 1
+
+
+def _part_text(part: Any) -> str:
+    content = getattr(part, "content", None)
+    if content is None:
+        content = getattr(part, "args", None)
+    if content is None:
+        return ""
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+def _is_turn_start(message: ModelMessage) -> bool:
+    """A user prompt opens a turn; tool returns and retries do not."""
+    return isinstance(message, ModelRequest) and any(
+        isinstance(part, UserPromptPart) for part in message.parts
+    )
+
+
+def _history_cut(messages: list[ModelMessage], budget: int) -> int:
+    """
+    Index of the first message replayed verbatim.
+
+    The cut moves forward in steps of half the budget, measured from the
+    start of the conversation, so it stays put for several turns. Until it
+    moves, every request starts with the same messages and provider prompt
+    caches keep hitting. It always lands on the start of a turn, so tool
+    calls are never separated from their results, and never goes past the
+    start of the last turn: that turn is the one being answered, and it holds
+    any tool calls still waiting for payment.
     """
-    Convert chat history + new user message into a single prompt string
-    for the agent. We avoid relying on Agent history APIs to keep this
-    compatible with the current library version.
+    tokens = [
+        sum(_estimate_tokens(_part_text(part)) for part in m.parts) for m in messages
+    ]
+    excess = sum(tokens) - budget
+    if excess <= 0:
+        return 0
+    last_turn = max((i for i, m in enumerate(messages) if _is_turn_start(m)), default=0)
+
+    step = max(budget // 2, 1)
+    target = (excess // step + 1) * step
+    cut, dropped = 0, 0
+    while cut < len(messages) and dropped < target:
+        dropped += tokens[cut]
+        cut += 1
+    while cut < len(messages) and not _is_turn_start(messages[cut]):
+        cut += 1
+    return min(cut, last_turn)
+
+
+def _summarize(messages: list[ModelMessage], budget: int) -> str:
+    """Condense dropped turns into a short recap, keeping the most recent ones."""
+    lines: list[str] = []
+    used = 0
+    for m in reversed(messages):
+        role = "USER" if isinstance(m, ModelRequest) else "ASSISTANT"
+        for part in reversed(m.parts):
+            # Tool traffic is left out; the replies that followed describe it
+            if not isinstance(part, (UserPromptPart, TextPart)) or not isinstance(part.content, str):
+                continue
+            content = " ".join(part.content.split())
+            if len(content) > SUMMARY_CHARS_PER_MESSAGE:
+                content = content[:SUMMARY_CHARS_PER_MESSAGE] + "..."
+            line = f"{role}: {content}"
+            used += _estimate_tokens(line)
+            if used > budget:
+                break
+            lines.append(line)
+        if used > budget:
+            break
+    lines.reverse()
+    return "Summary of the earlier conversation (older turns shortened):\n" + "\n".join(lines)
+
+
+def history_messages(history: list[ChatMessage]) -> list[ModelMessage]:
+    """Convert client-sent chat history into pydantic-ai messages."""
+    return [
+        ModelRequest.user_text_prompt(m.content)
+        if m.role == "user"
+        else ModelResponse(parts=[TextPart(content=m.content)])
+        for m in history
+    ]
+
+
+def trim_history(messages: list[ModelMessage], budget: int = HISTORY_TOKEN_BUDGET) -> list[ModelMessage]:
     """
-    lines = [f"{m.role.upper()}: {m.content}" for m in history]
-    lines.append(f"USER: {message}")
-    return "\n".join(lines)
+    Messages to pass as `message_history`.
 
+    Each turn stays its own request/response message rather than being
+    flattened into one prompt, so the instructions, tool schemas and earlier
+    turns form a prefix that is identical from one request to the next.
+    Beyond `budget` tokens the oldest turns are replaced by a recap.
+    """
+    cut = _history_cut(messages, budget)
+    if not cut:
+        return messages
+    recap = ModelRequest.user_text_prompt(_summarize(messages[:cut], budget // 4))
+    return [recap, *messages[cut:]]
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest) -> ChatResponse:
-    deps = Deps(payment_headers=req.payment_headers)
 
-    prompt = build_prompt(req.message, req.history)
+# ---------- Conversation sessions ----------
+
+# Tool arguments that are never stored in the clear
+SECRET_ARGS = frozenset({"password", "passwordConfirm"})
+REDACTED = "[redacted]"
+
+
+def _is_redacted(call: ToolCallPart) -> bool:
+    return any(call.args_as_dict().get(name) == REDACTED for name in SECRET_ARGS)
+
+
+def redact_secrets(messages: list[ModelMessage], keep: set[str] = frozenset()) -> list[ModelMessage]:
+    """Messages with secret tool arguments replaced, except in the calls whose ids are in `keep`."""
+    redacted: list[ModelMessage] = []
+    for message in messages:
+        if isinstance(message, ModelResponse) and any(
+            isinstance(part, ToolCallPart) and part.tool_call_id not in keep and SECRET_ARGS & part.args_as_dict().keys()
+            for part in message.parts
+        ):
+            parts = []
+            for part in message.parts:
+                if isinstance(part, ToolCallPart) and part.tool_call_id not in keep:
+                    args = part.args_as_dict()
+                    if SECRET_ARGS & args.keys():
+                        part = replace(part, args={**args, **{name: REDACTED for name in SECRET_ARGS & args.keys()}})
+                parts.append(part)
+            message = replace(message, parts=parts)
+        redacted.append(message)
+    return redacted
+
+
+class SessionStore:
+    """
+    Conversation history per conversation id, as pydantic-ai messages.
+
+    Recently used sessions are kept in memory, evicting the least recently
+    used beyond `max_sessions`. With `db_path`, sessions are also written to
+    SQLite, so they survive evictions and restarts. Database reads and writes
+    run in worker threads, so they do not stall the event loop.
+
+    Secret tool arguments are redacted before a session is stored. Only the
+    in-memory copy keeps them, for the calls still waiting for payment, which
+    need them to run.
+    """
+
+    def __init__(self, max_sessions: int = 1000, db_path: str | None = None):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, list[ModelMessage]] = OrderedDict()
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._db: sqlite3.Connection | None = None
+        # The connection is shared by the worker threads that read and write it
+        self._db_lock = threading.Lock()
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS chat_sessions (
+                        conversation_id TEXT PRIMARY KEY,
+                        messages BLOB NOT NULL,
+                        updated_at REAL NOT NULL
+                    );
+                    """
+                )
+
+    async def get(self, conversation_id: str) -> list[ModelMessage] | None:
+        messages = self._sessions.get(conversation_id)
+        if messages is not None:
+            self._sessions.move_to_end(conversation_id)
+            return messages
+        if self._db is None:
+            return None
+        messages = await asyncio.to_thread(self._load, conversation_id)
+        if messages is None:
+            return None
+        self._remember(conversation_id, messages)
+        return messages
+
+    def lock(self, conversation_id: str) -> asyncio.Lock:
+        """Lock held by the request working on a conversation, for as long as anyone uses it."""
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = self._locks[conversation_id] = asyncio.Lock()
+        return lock
+
+    async def save(self, conversation_id: str, messages: list[ModelMessage]) -> None:
+        pending = {call.tool_call_id for call in pending_tool_calls(messages)}
+        self._remember(conversation_id, redact_secrets(messages, keep=pending))
+        if self._db is None:
+            return
+        # Serializing and writing a long conversation takes a while; keep it off the event loop
+        await asyncio.to_thread(self._store, conversation_id, redact_secrets(messages))
+
+    def _load(self, conversation_id: str) -> list[ModelMessage] | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT messages FROM chat_sessions WHERE conversation_id = ?;",
+                (conversation_id,),
+            ).fetchone()
+        return None if row is None else ModelMessagesTypeAdapter.validate_json(row[0])
+
+    def _store(self, conversation_id: str, messages: list[ModelMessage]) -> None:
+        data = ModelMessagesTypeAdapter.dump_json(messages)
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT INTO chat_sessions (conversation_id, messages, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(conversation_id) DO UPDATE SET messages = excluded.messages, updated_at = excluded.updated_at;",
+                (conversation_id, data, time.time()),
+            )
+
+    def _remember(self, conversation_id: str, messages: list[ModelMessage]) -> None:
+        self._sessions[conversation_id] = messages
+        self._sessions.move_to_end(conversation_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+
+sessions = SessionStore(
+    max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+    db_path=os.getenv("SESSION_DB_PATH"),
+)
+
+
+async def load_conversation(req: ChatRequest) -> tuple[str, list[ModelMessage]]:
+    """
+    Conversation id and prior messages for a request.
+
+    A known conversation_id replays the stored session and ignores
+    `history`. Otherwise the client-sent history seeds the session, under
+    the client's conversation_id if it sent one: sessions can be evicted or
+    lost on restart, so clients send `history` with every request.
+    """
+    if req.conversation_id:
+        stored = await sessions.get(req.conversation_id)
+        if stored is not None:
+            return req.conversation_id, stored
+    return req.conversation_id or uuid.uuid4().hex, history_messages(req.history)
+
+
+@asynccontextmanager
+async def locked_conversation(req: ChatRequest) -> AsyncIterator[tuple[str, list[ModelMessage]]]:
+    """
+    `load_conversation`, holding the conversation's lock until the turn is stored.
+
+    Requests on one conversation id run one after another, so two retries
+    with payment headers cannot both resume the same pending call.
+    """
+    if not req.conversation_id:
+        yield await load_conversation(req)
+        return
+    async with sessions.lock(req.conversation_id):
+        yield await load_conversation(req)
+
+
+async def _record_reply(conversation_id: str, stored: list[ModelMessage], message: str, reply: str) -> None:
+    """Store a turn that ended without a normal agent result, e.g. a tool's ValueError."""
+    await sessions.save(
+        conversation_id,
+        [*stored, ModelRequest.user_text_prompt(message), ModelResponse(parts=[TextPart(content=reply)])],
+    )
+
+
+# ---------- Resuming after client-side payment ----------
+
+PAYMENT_NOT_COMPLETED = "The payment was not completed, so this call did not run."
+SECRETS_NOT_KEPT = "The container password is not kept across restarts, so this call did not run. Please provide it again."
+
+
+def pending_tool_calls(messages: list[ModelMessage]) -> list[ToolCallPart]:
+    """
+    Tool calls of the last model response that have no result yet.
+
+    A run that stopped on a 402 is stored up to the model response that made
+    the paid call, so the session itself is the checkpoint to resume from.
+    """
+    answered: set[str] = set()
+    for message in reversed(messages):
+        if isinstance(message, ModelResponse):
+            return [call for call in message.tool_calls if call.tool_call_id not in answered]
+        answered.update(
+            part.tool_call_id
+            for part in message.parts
+            if isinstance(part, (ToolReturnPart, RetryPromptPart))
+        )
+    return []
+
+
+def _with_tool_results(messages: list[ModelMessage], parts: list[Any]) -> list[ModelMessage]:
+    """Append tool results, merged into a trailing request so a call is never answered twice."""
+    if messages and isinstance(messages[-1], ModelRequest):
+        return [*messages[:-1], ModelRequest(parts=[*messages[-1].parts, *parts])]
+    return [*messages, ModelRequest(parts=parts)]
+
+
+def close_pending_calls(messages: list[ModelMessage], pending: list[ToolCallPart], reason: str) -> list[ModelMessage]:
+    """Answer calls that will not be retried, so the conversation can move on."""
+    if not pending:
+        return messages
+    return _with_tool_results(
+        messages,
+        [ToolReturnPart(tool_name=call.tool_name, content=reason, tool_call_id=call.tool_call_id) for call in pending],
+    )
+
+
+def with_payment_requests(
+    messages: list[ModelMessage], output: str | DeferredToolRequests
+) -> list[ModelMessage]:
+    """
+    Record the 402 of each deferred call on the model response that made it.
+
+    The checkpoint then knows what every pending call asks to be paid, so a
+    payment can be matched to the call it is for.
+    """
+    if not isinstance(output, DeferredToolRequests):
+        return messages
+    requests = {
+        call_id: m["payment_request"] for call_id, m in output.metadata.items() if "payment_request" in m
+    }
+    for i in range(len(messages) - 1, -1, -1):
+        response = messages[i]
+        if isinstance(response, ModelResponse):
+            metadata = response.metadata or {}
+            metadata = {**metadata, "payment_requests": {**metadata.get("payment_requests", {}), **requests}}
+            return [*messages[:i], replace(response, metadata=metadata), *messages[i + 1 :]]
+    return messages
+
+
+def _pays_for(payment_headers: Dict[str, str], payment_request: Dict[str, Any] | None) -> bool:
+    """
+    Whether the X-PAYMENT header pays one of the requirements of a 402 response.
 
+    x402 clients authorize exactly maxAmountRequired, so the amount has to be
+    equal: a larger payment for another call would meet it too.
+    """
+    header = next((v for k, v in payment_headers.items() if k.lower() == "x-payment"), None)
+    if not header or not payment_request:
+        return False
     try:
-        result = await agent.run(
-            prompt,
-            deps=deps,
+        payment = json.loads(base64.b64decode(header))
+        authorization = payment["payload"]["authorization"]
+        return any(
+            req.get("scheme") == payment.get("scheme")
+            and req.get("network") == payment.get("network")
+            and str(req.get("payTo", "")).lower() == str(authorization.get("to", "")).lower()
+            and int(authorization["value"]) == int(req.get("maxAmountRequired", -1))
+            for req in payment_request.get("accepts", [])
         )
-        reply = result.output
-        return ChatResponse(reply=reply)
-        
-    except ClientSidePaymentRequired as exc:
-        # Stop here and tell frontend to pay
-        return ChatResponse(
-            reply="Payment Required. Please confirm the transaction in your wallet.",
-            payment_request=exc.payment_info
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return False
+
+
+def paid_call(
+    messages: list[ModelMessage], pending: list[ToolCallPart], payment_headers: Dict[str, str]
+) -> ToolCallPart:
+    """
+    The pending call a payment is for: the one whose 402 it pays, else the
+    first, which is the one whose payment request the frontend was shown.
+    """
+    response = next(m for m in reversed(messages) if isinstance(m, ModelResponse))
+    requests = (response.metadata or {}).get("payment_requests", {})
+    return next(
+        (call for call in pending if _pays_for(payment_headers, requests.get(call.tool_call_id))),
+        pending[0],
+    )
+
+
+def _gib(value: int | None) -> str:
+    return "?" if value is None else f"{value / 1024**3:.1f} GiB"
+
+
+def _describe_usage(cpu: CpuStats | None, memory: UsageStats | None, disk: UsageStats | None) -> str:
+    fields = []
+    if cpu is not None:
+        text = f"CPU {cpu.pct:.0f}%" if cpu.pct is not None else "CPU ?"
+        fields.append(text + (f" of {cpu.cores} cores" if cpu.cores else ""))
+    for label, usage in (("memory", memory), ("disk", disk)):
+        if usage is not None:
+            text = f"{label} {_gib(usage.used)} of {_gib(usage.total)}"
+            fields.append(text + (f" ({usage.pct:.0f}%)" if usage.pct is not None else ""))
+    return ", ".join(fields)
+
+
+def _describe_container(item: ManagedContainer | LxcStats) -> str:
+    text = f"- Container {item.ctid} (lease {item.leaseId})"
+    if isinstance(item, LxcStats):
+        if item.error:
+            return f"{text}: {item.error}"
+        return f"{text}: {item.status or 'unknown'}, {_describe_usage(item.cpu, item.memory, item.disk)}"
+    text += f": {item.status}"
+    if item.expiresAt:
+        text += f", expires {item.expiresAt}"
+    if item.vmStatus and item.vmStatus.get("status"):
+        text += f", VM {item.vmStatus['status']}"
+    return text
+
+
+def _describe_result(part: ToolReturnPart | RetryPromptPart) -> str:
+    """Plain-text reply for a tool result, used where no model writes one."""
+    if isinstance(part, RetryPromptPart):
+        return f"{part.tool_name or 'The tool'} failed: {_part_text(part)}"
+    content = part.content
+    if isinstance(content, LeaseResponse):
+        text = f"Lease {content.leaseId} is {content.status}"
+        if content.ctid:
+            text += f" on container {content.ctid}"
+        if content.expiresAt:
+            text += f", expiring at {content.expiresAt}"
+        text += "."
+        if content.message:
+            text += f" {content.message}"
+        return text
+    if isinstance(content, NodeStatsResponse):
+        return f"Node {content.node}: {_describe_usage(content.cpu, content.memory, content.disk)}."
+    if isinstance(content, list) and all(isinstance(item, (ManagedContainer, LxcStats)) for item in content):
+        if not content:
+            return "You have no containers."
+        return "\n".join(_describe_container(item) for item in content)
+    return f"{part.tool_name} returned:\n```json\n{part.model_response_str()}\n```"
+
+
+async def resume_paid_calls(
+    deps: Deps,
+    stored: list[ModelMessage],
+    pending: list[ToolCallPart],
+) -> tuple[list[ModelMessage], str | DeferredToolRequests]:
+    """
+    Retry the tool calls that stopped on a 402, now with payment headers.
+
+    One payment pays for one call, so the headers are sent only with the call
+    whose 402 they pay. pydantic-ai needs a result for every pending call, so
+    the others run again without them; they get a fresh 402 and stay pending.
+
+    The run starts from the stored model response, so the model is not asked
+    to plan the calls again, and it stops once they have run: the reply is
+    built from their results instead of sending them back to the model.
+    Returns the updated session and the reply, or DeferredToolRequests if a
+    call still needs payment.
+    """
+    deps.payment_for = paid_call(stored, pending, deps.payment_headers or {}).tool_call_id
+    async with agent.iter(
+        deps=deps,
+        message_history=trim_history(stored),
+        deferred_tool_results=DeferredToolResults(approvals={call.tool_call_id: True for call in pending}),
+    ) as run:
+        node = run.next_node
+        while not Agent.is_model_request_node(node):
+            if Agent.is_end_node(node):
+                # Still unpaid; keep the results of calls that did go through
+                done = [part for m in run.new_messages() if isinstance(m, ModelRequest) for part in m.parts]
+                return _with_tool_results(stored, done), node.data.output
+            node = await run.next(node)
+
+    # Describe every call of the response, including ones paid for by earlier requests
+    messages = _with_tool_results(stored, node.request.parts)
+    results = [part for part in messages[-1].parts if isinstance(part, (ToolReturnPart, RetryPromptPart))]
+    reply = "\n\n".join(_describe_result(part) for part in results)
+    return [*messages, ModelResponse(parts=[TextPart(content=reply)])], reply
+
+
+# ---------- Fast-path intents ----------
+
+# Set FAST_PATH_INTENTS=0 to send every message to the model
+FAST_PATH_INTENTS = os.getenv("FAST_PATH_INTENTS", "1") != "0"
+
+_POLITE = r"(?:please |can you |could you )?"
+_PLEASE = r"(?: please)?"
+
+# Whole-message patterns, matched against the lowercased message without
+# trailing punctuation. Anything they do not match goes to the model.
+INTENT_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (
+        re.compile(rf"{_POLITE}(?:list|show)(?: me)?(?: all)?(?: (?:my|the))? (?:containers|leases){_PLEASE}"),
+        "list_managed_containers",
+    ),
+    (
+        re.compile(rf"{_POLITE}(?:show|get)(?: me)?(?: the)? node (?:stats|usage){_PLEASE}"),
+        "get_node_stats",
+    ),
+    (
+        re.compile(
+            rf"{_POLITE}(?:show|get)(?: me)?(?: (?:my|the))? (?:container|lxc) (?:stats|usage)"
+            rf"(?: (?:for|of) (?:wallet )?(?P<wallet>0x[0-9a-f]{{40}}))?{_PLEASE}"
+        ),
+        "list_lxc_stats",
+    ),
+    (
+        re.compile(
+            rf"{_POLITE}renew (?:ctid |container |lease )?(?P<ctid>\d+) (?:for )?"
+            rf"(?P<amount>\d+) ?(?P<unit>minutes?|mins?|m|hours?|hrs?|h){_PLEASE}"
+        ),
+        "renew_lease",
+    ),
+]
+
+FAST_PATH_TOOLS = {
+    "list_managed_containers": list_managed_containers,
+    "get_node_stats": get_node_stats,
+    "list_lxc_stats": list_lxc_stats,
+    "renew_lease": renew_lease,
+}
+
+# Tools whose route is scoped to the caller's wallet. Without a wallet in the
+# message or a payment to take it from, /stats/lxc would answer for every
+# owner, so the model handles the request and asks for one.
+FAST_PATH_WALLET_TOOLS = frozenset({"list_lxc_stats"})
+
+
+def match_intent(message: str) -> tuple[str, dict[str, Any]] | None:
+    """Tool name and arguments for an unambiguous request, or None."""
+    text = " ".join(message.lower().split()).rstrip(".!?")
+    for pattern, tool_name in INTENT_PATTERNS:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        if tool_name != "renew_lease":
+            wallet = match.groupdict().get("wallet")
+            return tool_name, {"wallet": wallet} if wallet else {}
+        minutes = int(match["amount"]) * (60 if match["unit"].startswith("h") else 1)
+        if minutes <= 0:
+            return None
+        return tool_name, {"ctid": match["ctid"], "runtimeMinutes": minutes}
+    return None
+
+
+async def fast_path(
+    req: ChatRequest,
+    deps: Deps,
+    stored: list[ModelMessage],
+) -> tuple[list[ModelMessage], str | DeferredToolRequests] | None:
+    """
+    Answer a common request by calling its tool directly, without the model.
+
+    The turn is stored as the model would have produced it: the prompt, the
+    tool call, its result and the reply. Later turns see the same history
+    either way, and a call that hits a 402 leaves the same checkpoint as an
+    agent run, so the paid retry resumes it. A renewal is only quoted here;
+    like the agent, it waits for the user to confirm the price. Requests
+    missing something the route needs, such as the wallet its container
+    stats belong to, are left to the model.
+    """
+    intent = match_intent(req.message)
+    if intent is None:
+        return None
+    tool_name, args = intent
+    if tool_name in FAST_PATH_WALLET_TOOLS and "wallet" not in args and not req.payment_headers:
+        return None
+    prompt = ModelRequest.user_text_prompt(req.message)
+
+    if tool_name == "renew_lease":
+        minutes = args["runtimeMinutes"]
+        reply = (
+            f"Renewing container {args['ctid']} for {minutes} minutes costs "
+            f"{_estimate_price(minutes)}. Shall I go ahead?"
         )
+        return [*stored, prompt, ModelResponse(parts=[TextPart(content=reply)])], reply
+
+    call = ToolCallPart(tool_name=tool_name, args=args)
+    ctx = RunContext(
+        deps=deps,
+        model=agent.model,
+        usage=RunUsage(),
+        prompt=req.message,
+        tool_name=tool_name,
+        tool_call_id=call.tool_call_id,
+    )
+    messages = [*stored, prompt, ModelResponse(parts=[call])]
+    try:
+        async with tool_slot(deps, tool_name, call.tool_call_id):
+            content = await FAST_PATH_TOOLS[tool_name](ctx, **args)
+    except ClientSidePaymentRequired as exc:
+        return messages, DeferredToolRequests(approvals=[call], metadata={call.tool_call_id: exc.metadata})
+
+    result = ToolReturnPart(tool_name=tool_name, content=content, tool_call_id=call.tool_call_id)
+    reply = _describe_result(result)
+    return [*messages, ModelRequest(parts=[result]), ModelResponse(parts=[TextPart(content=reply)])], reply
+
+
+def _final_response(output: str | DeferredToolRequests, conversation_id: str, deps: Deps) -> ChatResponse:
+    if not isinstance(output, DeferredToolRequests):
+        return ChatResponse(reply=output, conversation_id=conversation_id, tool_timings=deps.tool_timings)
+    payment_request = next(
+        (m["payment_request"] for m in output.metadata.values() if "payment_request" in m),
+        None,
+    )
+    return ChatResponse(
+        reply=PAYMENT_REQUIRED_REPLY,
+        payment_request=payment_request,
+        conversation_id=conversation_id,
+        tool_timings=deps.tool_timings,
+    )
+
+
+def _pending_for(req: ChatRequest, stored: list[ModelMessage]) -> tuple[list[ModelMessage], list[ToolCallPart]]:
+    """
+    Calls to resume for this request.
+
+    A request with payment headers resumes the calls that stopped on a 402,
+    paying for one of them; any other message abandons them. Calls whose
+    secrets were redacted, because the session was reloaded from the
+    database, cannot run again and are abandoned too.
+    """
+    pending = pending_tool_calls(stored)
+    if pending and not req.payment_headers:
+        return close_pending_calls(stored, pending, PAYMENT_NOT_COMPLETED), []
+    redacted = [call for call in pending if _is_redacted(call)]
+    if redacted:
+        stored = close_pending_calls(stored, redacted, SECRETS_NOT_KEPT)
+        pending = [call for call in pending if call not in redacted]
+    return stored, pending
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest) -> ChatResponse:
+    deps = Deps(payment_headers=req.payment_headers)
+    async with locked_conversation(req) as (conversation_id, stored):
+        stored, pending = _pending_for(req, stored)
+
+        try:
+            if pending:
+                messages, output = await resume_paid_calls(deps, stored, pending)
+            elif FAST_PATH_INTENTS and (answer := await fast_path(req, deps, stored)) is not None:
+                messages, output = answer
+            else:
+                result = await agent.run(
+                    req.message,
+                    deps=deps,
+                    message_history=trim_history(stored),
+                )
+                messages, output = [*stored, *result.new_messages()], result.output
+            await sessions.save(conversation_id, with_payment_requests(messages, output))
+
+            # On DeferredToolRequests, tell frontend to pay; the session keeps the pending call
+            return _final_response(output, conversation_id, deps)
         
-    except ValueError as exc:
-        reply = str(exc)
-        return ChatResponse(reply=reply)
+        except ValueError as exc:
+            reply = str(exc)
+            await _record_reply(conversation_id, close_pending_calls(stored, pending, reply), req.message, reply)
+            return _final_response(reply, conversation_id, deps)
         
-    except Exception as exc:
-        import traceback
-        traceback.print_exc()
-        reply = f"Request failed: {exc}"
-        return ChatResponse(reply=reply)
+        except Exception as exc:
+            traceback.print_exc()
+            reply = f"Request failed: {exc}"
+            return _final_response(reply, conversation_id, deps)
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _final_event(output: str | DeferredToolRequests, conversation_id: str, deps: Deps) -> str:
+    event = "payment_required" if isinstance(output, DeferredToolRequests) else "done"
+    return _sse(event, _final_response(output, conversation_id, deps).model_dump())
+
+
+async def _chat_events(req: ChatRequest) -> AsyncIterator[str]:
+    """
+    Run the agent and translate its stream into server-sent events:
+
+    - token: {"delta"} text as the model produces it
+    - tool_start: {"id", "name"} when a tool call begins
+    - tool_end: {"id", "name", "ok", "duration_ms"} when it returns
+      (ok=False means the model was asked to retry)
+    - payment_required: final ChatResponse with payment_request set
+    - done: final ChatResponse, including tool_timings
+    - error: {"reply"} when the run failed
+
+    Tool arguments are not sent since they can hold container passwords.
+    Paid retries and fast-path intents skip the model and send only the
+    final event.
+    """
+    deps = Deps(payment_headers=req.payment_headers)
+    async with locked_conversation(req) as (conversation_id, stored):
+        stored, pending = _pending_for(req, stored)
+
+        try:
+            answer = None
+            if pending:
+                answer = await resume_paid_calls(deps, stored, pending)
+            elif FAST_PATH_INTENTS:
+                answer = await fast_path(req, deps, stored)
+            if answer is not None:
+                messages, output = answer
+                await sessions.save(conversation_id, with_payment_requests(messages, output))
+                yield _final_event(output, conversation_id, deps)
+                return
+
+            async for event in agent.run_stream_events(
+                req.message,
+                deps=deps,
+                message_history=trim_history(stored),
+            ):
+                if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+                    if event.part.content:
+                        yield _sse("token", {"delta": event.part.content})
+                elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+                    yield _sse("token", {"delta": event.delta.content_delta})
+                elif isinstance(event, FunctionToolCallEvent):
+                    yield _sse("tool_start", {"id": event.tool_call_id, "name": event.part.tool_name})
+                elif isinstance(event, FunctionToolResultEvent):
+                    timing = next((t for t in deps.tool_timings if t.tool_call_id == event.tool_call_id), None)
+                    yield _sse(
+                        "tool_end",
+                        {
+                            "id": event.tool_call_id,
+                            "name": event.result.tool_name,
+                            "ok": isinstance(event.result, ToolReturnPart),
+                            "duration_ms": timing.duration_ms if timing else None,
+                        },
+                    )
+                elif isinstance(event, AgentRunResultEvent):
+                    messages = [*stored, *event.result.new_messages()]
+                    await sessions.save(conversation_id, with_payment_requests(messages, event.result.output))
+                    yield _final_event(event.result.output, conversation_id, deps)
+
+        except ValueError as exc:
+            await _record_reply(conversation_id, close_pending_calls(stored, pending, str(exc)), req.message, str(exc))
+            yield _final_event(str(exc), conversation_id, deps)
+
+        except Exception as exc:
+            traceback.print_exc()
+            yield _sse("error", {"reply": f"Request failed: {exc}", "conversation_id": conversation_id})
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest) -> StreamingResponse:
+    return StreamingResponse(
+        _chat_events(req),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/info", response_model=InfoResponse)
@@ -613,6 +1446,10 @@ BACKEND_BASE_URL=http://localhost:4021 \
 curl -X POST http://localhost:8000/chat \
   -H "Content-Type: application/json" \
   -d '{"message": "Lease a basic-lxc for 30 minutes with 2 cores and 2048 MB RAM."}'
+
+curl -N -X POST http://localhost:8000/chat/stream \
+  -H "Content-Type: application/json" \
+  -d '{"message": "Show me the node stats."}'
 """
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+SERVER_PATH = Path(__file__).resolve().parent.parent / "pydantic-server.py"
+
+
+def load_server():
+    """Import pydantic-server.py, whose file name is not a valid module name."""
+    os.environ.setdefault("LLM_PROVIDER", "openai")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-test-not-a-real-key")
+    # Sessions stay in memory unless a test gives a database
+    os.environ.pop("SESSION_DB_PATH", None)
+    spec = importlib.util.spec_from_file_location("pydantic_server", SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_server = load_server()
+
+
+@pytest.fixture
+def server():
+    return _server
@@ -0,0 +1,59 @@
+import httpx
+import pytest
+
+WALLET = "0x00000000000000000000000000000000000000aa"
+
+
+@pytest.fixture
+def backend(server, monkeypatch):
+    """Stub backend recording the requests the tools make."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/stats/node":
+            usage = {"used": 1, "total": 4, "pct": 25.0}
+            return httpx.Response(
+                200, json={"node": "pve", "cpu": {"pct": 12.0, "cores": 8}, "memory": usage, "disk": usage}
+            )
+        if request.url.path == "/stats/lxc":
+            return httpx.Response(200, json=[{"leaseId": "L1", "ctid": "105", "status": "running"}])
+        return httpx.Response(404)
+
+    client = httpx.AsyncClient(base_url="http://backend.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(server, "_backend_client", client)
+    return requests
+
+
+async def test_node_stats_need_no_wallet(server, backend):
+    messages, reply = await server.fast_path(server.ChatRequest(message="show node stats"), server.Deps(), [])
+
+    assert reply.startswith("Node pve")
+    assert [request.url.path for request in backend] == ["/stats/node"]
+
+
+async def test_container_stats_without_a_wallet_go_to_the_model(server, backend):
+    result = await server.fast_path(server.ChatRequest(message="show my container stats"), server.Deps(), [])
+
+    assert result is None
+    assert backend == []
+
+
+async def test_container_stats_for_a_wallet(server, backend):
+    req = server.ChatRequest(message=f"show container stats for {WALLET}")
+    messages, reply = await server.fast_path(req, server.Deps(), [])
+
+    assert "105" in reply
+    [request] = backend
+    assert request.url.path == "/stats/lxc"
+    assert request.headers["X-Wallet"] == WALLET
+
+
+async def test_container_stats_with_a_payment(server, backend):
+    # The backend takes the wallet from the payment
+    headers = {"X-PAYMENT": "payment"}
+    req = server.ChatRequest(message="show my container stats", payment_headers=headers)
+    await server.fast_path(req, server.Deps(payment_headers=headers), [])
+
+    [request] = backend
+    assert request.headers["X-PAYMENT"] == "payment"
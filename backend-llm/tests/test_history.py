@@ -0,0 +1,54 @@
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+)
+
+
+def turn(question: str, answer: str) -> list:
+    return [ModelRequest.user_text_prompt(question), ModelResponse(parts=[TextPart(content=answer)])]
+
+
+def test_short_history_is_replayed_verbatim(server):
+    messages = turn("hi", "hello") + turn("how are you?", "fine")
+    assert server._history_cut(messages, budget=1000) == 0
+    assert server.trim_history(messages, budget=1000) is messages
+
+
+def test_long_history_is_cut_at_a_turn_start(server):
+    messages = [m for i in range(20) for m in turn(f"question {i} " + "x" * 200, f"answer {i}")]
+    cut = server._history_cut(messages, budget=500)
+    assert 0 < cut < len(messages)
+    assert server._is_turn_start(messages[cut])
+
+    trimmed = server.trim_history(messages, budget=500)
+    assert trimmed[1:] == messages[cut:]
+    [recap] = trimmed[0].parts
+    assert recap.content.startswith("Summary of the earlier conversation")
+    assert f"question {cut // 2 - 1}" in recap.content
+
+
+def test_cut_stays_put_while_history_grows(server):
+    messages = [m for i in range(20) for m in turn(f"question {i} " + "x" * 200, f"answer {i}")]
+    cut = server._history_cut(messages, budget=2000)
+    # A short extra turn does not move the cut, so the replayed prefix is stable
+    assert server._history_cut(messages + turn("one more", "ok"), budget=2000) == cut
+
+
+def test_cut_keeps_tool_calls_with_their_results(server):
+    call = ToolCallPart(tool_name="exec_container_command", args={"ctid": "1"}, tool_call_id="a")
+    result = ToolReturnPart(tool_name="exec_container_command", content="x" * 20000, tool_call_id="a")
+    pending = ToolCallPart(tool_name="renew_lease", args={"ctid": "1"}, tool_call_id="b")
+    messages = turn("hi", "hello") * 3 + [
+        ModelRequest.user_text_prompt("run it"),
+        ModelResponse(parts=[call]),
+        ModelRequest(parts=[result]),
+        ModelResponse(parts=[pending]),
+    ]
+
+    trimmed = server.trim_history(messages, budget=1000)
+    # The oversized last turn is kept whole: it holds the call waiting for payment
+    assert trimmed[1:] == messages[6:]
+    assert server.pending_tool_calls(trimmed) == [pending]
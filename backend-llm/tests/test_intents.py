@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "message, intent",
+    [
+        ("list my containers", ("list_managed_containers", {})),
+        ("Please show me all the leases.", ("list_managed_containers", {})),
+        ("Show me the node stats", ("get_node_stats", {})),
+        ("get container stats", ("list_lxc_stats", {})),
+        (
+            "show container stats for 0x00000000000000000000000000000000000000Aa",
+            ("list_lxc_stats", {"wallet": "0x00000000000000000000000000000000000000aa"}),
+        ),
+        ("renew ctid 105 for 30 minutes", ("renew_lease", {"ctid": "105", "runtimeMinutes": 30})),
+        ("Renew 105 for 2h please!", ("renew_lease", {"ctid": "105", "runtimeMinutes": 120})),
+    ],
+)
+def test_match_intent(server, message, intent):
+    assert server.match_intent(message) == intent
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "list my containers and renew 105",
+        "what is a container?",
+        "renew 105 for 0 minutes",
+        "renew 105",
+    ],
+)
+def test_ambiguous_messages_go_to_the_model(server, message):
+    assert server.match_intent(message) is None
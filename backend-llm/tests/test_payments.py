@@ -0,0 +1,58 @@
+import base64
+import json
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, ToolCallPart
+
+PAY_TO = "0x00000000000000000000000000000000000000Aa"
+
+
+def payment_request(amount: str) -> dict:
+    return {
+        "x402Version": 1,
+        "error": "X-PAYMENT header is required",
+        "accepts": [
+            {"scheme": "exact", "network": "base-sepolia", "payTo": PAY_TO, "maxAmountRequired": amount},
+        ],
+    }
+
+
+def payment_headers(amount: str, pay_to: str = PAY_TO.lower()) -> dict:
+    payment = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {"signature": "0x12", "authorization": {"to": pay_to, "value": amount}},
+    }
+    return {"X-PAYMENT": base64.b64encode(json.dumps(payment).encode()).decode()}
+
+
+def test_pays_for_matches_the_requirements(server):
+    request = payment_request("1000")
+    assert server._pays_for(payment_headers("1000"), request)
+    # Header names are case-insensitive
+    assert server._pays_for({"x-payment": payment_headers("1000")["X-PAYMENT"]}, request)
+
+
+def test_pays_for_rejects_other_payments(server):
+    request = payment_request("1000")
+    # A larger payment is for another call
+    assert not server._pays_for(payment_headers("2000"), request)
+    assert not server._pays_for(payment_headers("1000", pay_to="0xbeef"), request)
+    assert not server._pays_for(payment_headers("1000"), None)
+    assert not server._pays_for({}, request)
+    assert not server._pays_for({"X-PAYMENT": "not base64"}, request)
+
+
+def test_paid_call_picks_the_call_the_payment_is_for(server):
+    first = ToolCallPart(tool_name="renew_lease", args={"ctid": "101"}, tool_call_id="a")
+    second = ToolCallPart(tool_name="renew_lease", args={"ctid": "102"}, tool_call_id="b")
+    response = ModelResponse(
+        parts=[first, second],
+        metadata={"payment_requests": {"a": payment_request("1000"), "b": payment_request("2000")}},
+    )
+    messages = [ModelRequest.user_text_prompt("renew both"), response]
+
+    assert server.paid_call(messages, [first, second], payment_headers("2000")) is second
+    assert server.paid_call(messages, [first, second], payment_headers("1000")) is first
+    # Unmatched payments go to the first call, whose request the frontend showed
+    assert server.paid_call(messages, [first, second], payment_headers("5")) is first
@@ -0,0 +1,72 @@
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolCallPart
+
+
+def lease_turn(call_id: str, password: str = "hunter22") -> list:
+    call = ToolCallPart(
+        tool_name="lease_container",
+        args={"cores": 1, "password": password, "passwordConfirm": password},
+        tool_call_id=call_id,
+    )
+    return [ModelRequest.user_text_prompt("lease a container"), ModelResponse(parts=[call])]
+
+
+def call_args(messages: list) -> dict:
+    return messages[-1].parts[0].args_as_dict()
+
+
+def test_redact_secrets(server):
+    messages = lease_turn("a")
+    redacted = server.redact_secrets(messages)
+
+    assert call_args(redacted) == {"cores": 1, "password": "[redacted]", "passwordConfirm": "[redacted]"}
+    assert server._is_redacted(redacted[-1].parts[0])
+    # The input is left untouched
+    assert call_args(messages)["password"] == "hunter22"
+
+
+def test_redact_secrets_keeps_listed_calls(server):
+    messages = lease_turn("a")
+    assert server.redact_secrets(messages, keep={"a"}) == messages
+    reply = [ModelResponse(parts=[TextPart(content="hi")])]
+    assert server.redact_secrets(reply) == reply
+
+
+async def test_session_round_trip_through_the_database(server, tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    store = server.SessionStore(db_path=db_path)
+    messages = lease_turn("a")
+
+    await store.save("c1", messages)
+    # The call still waits for payment, so the in-memory copy keeps its secrets
+    assert call_args(await store.get("c1"))["password"] == "hunter22"
+
+    # A restarted server only finds the redacted copy
+    restarted = server.SessionStore(db_path=db_path)
+    stored = await restarted.get("c1")
+    assert [type(m) for m in stored] == [ModelRequest, ModelResponse]
+    assert call_args(stored)["password"] == "[redacted]"
+    assert await restarted.get("unknown") is None
+
+
+async def test_least_recently_used_sessions_are_evicted(server):
+    store = server.SessionStore(max_sessions=2)
+    for conversation_id in ("a", "b"):
+        await store.save(conversation_id, [ModelRequest.user_text_prompt(conversation_id)])
+
+    await store.get("a")
+    await store.save("c", [ModelRequest.user_text_prompt("c")])
+
+    assert await store.get("b") is None
+    assert await store.get("a") is not None
+    assert await store.get("c") is not None
+
+
+async def test_evicted_sessions_are_reloaded_from_the_database(server, tmp_path):
+    store = server.SessionStore(max_sessions=1, db_path=str(tmp_path / "sessions.db"))
+    await store.save("a", [ModelRequest.user_text_prompt("a")])
+    await store.save("b", [ModelRequest.user_text_prompt("b")])
+
+    assert list(store._sessions) == ["b"]
+    [message] = await store.get("a")
+    assert message.parts[0].content == "a"
+    assert list(store._sessions) == ["a"]
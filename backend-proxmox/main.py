@@ -11,6 +11,7 @@ from others.require_payment_wrapper import (
     dynamic_require_payment
 )
 from others.lease_worker import start_lease_worker, stop_lease_worker
+from x402.payment_log import set_payment_debug, set_payment_log_sample_rate
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +24,10 @@ CDP_CLIENT_KEY = os.getenv("CDP_CLIENT_KEY")
 if not ADDRESS:
     raise ValueError("Missing required environment variables")
 
+# Payment diagnostics: one structured record per paid request, full dumps only in debug mode
+set_payment_debug(os.getenv("X402_PAYMENT_DEBUG", "false").lower() in ("1", "true", "yes"))
+set_payment_log_sample_rate(float(os.getenv("X402_PAYMENT_LOG_SAMPLE_RATE", "1.0")))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Start background lease status refresher
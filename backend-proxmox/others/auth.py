@@ -1,23 +1,20 @@
-import base64
-import json
 from typing import Optional
 
 from fastapi import HTTPException, Request, status
+from x402.fastapi.middleware import decode_request_payment
 from x402.types import VerifyResponse
 
 
-def _wallet_from_x_payment(header_value: str) -> Optional[str]:
+def _wallet_from_x_payment(request: Request) -> Optional[str]:
+    # Shares the decoded payload with the x402 middleware via request.state
     try:
-        decoded = base64.b64decode(header_value).decode("utf-8")
-        payload = json.loads(decoded)
-    except Exception:
+        payment = decode_request_payment(request)
+    except ValueError:
         return None
 
-    auth = payload.get("payload", {}).get("authorization", {})
-    wallet = auth.get("from")
-    if isinstance(wallet, str) and wallet:
-        return wallet
-    return None
+    if payment is None:
+        return None
+    return payment.payload.authorization.from_ or None
 
 
 def get_request_wallet(request: Request) -> str:
@@ -33,11 +30,9 @@ def get_request_wallet(request: Request) -> str:
     if verify is not None and verify.payer:
         return verify.payer
 
-    x_payment = request.headers.get("X-Payment")
-    if x_payment:
-        wallet = _wallet_from_x_payment(x_payment)
-        if wallet:
-            return wallet
+    wallet = _wallet_from_x_payment(request)
+    if wallet:
+        return wallet
 
     wallet = request.headers.get("X-Wallet")
     if wallet:
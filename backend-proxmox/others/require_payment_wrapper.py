@@ -81,6 +81,27 @@ async def PaywallConfig_builder(request: Request) -> Optional[Dict[str, Any]]:
         case _:
             return None
 
+# One x402 middleware per paywall config, the price left out, for the app's lifetime
+_middlewares: Dict[str, Callable] = {}
+
+
+def _request_price(request: Request) -> str:
+    return request.state.x402_price
+
+
+def _require_payment_for(config: Dict[str, Any]) -> Callable:
+    """
+    Reuse one x402 middleware per paywall config. The price is computed per
+    request and passed through request.state, so a single facilitator client,
+    breaker and set of precomputed requirements serve every price.
+    """
+    key = json.dumps(config, sort_keys=True)
+    middleware = _middlewares.get(key)
+    if middleware is None:
+        middleware = _middlewares[key] = require_payment(price=_request_price, **config)
+    return middleware
+
+
 def dynamic_require_payment(config_builder: Callable):
     async def dyn_middleware(request: Request, call_next):
         config = await config_builder(request)
@@ -88,7 +109,8 @@ def dynamic_require_payment(config_builder: Callable):
         if not config:  # no paywall
             return await call_next(request)
         
-        new_middleware = require_payment(**config)
+        request.state.x402_price = config.pop("price")
+        new_middleware = _require_payment_for(config)
         return await new_middleware(request, call_next)
     
     return dyn_middleware
@@ -0,0 +1,74 @@
+"""Throughput of X-PAYMENT header encoding and decoding.
+
+Compares the previous str <-> bytes round trips through the stdlib json with
+the bytes-only codec layer, on each installed JSON backend.
+
+Run with: uv run python benchmarks/bench_encoding.py
+"""
+
+import json
+import secrets
+import timeit
+
+from x402.encoding import (
+    OrjsonCodec,
+    StdlibJSONCodec,
+    b64decode_json,
+    b64encode_json,
+    orjson,
+    safe_base64_decode,
+    safe_base64_encode,
+    set_json_codec,
+)
+
+ITERATIONS = 50_000
+
+HEADER = {
+    "x402Version": 1,
+    "scheme": "exact",
+    "network": "base-sepolia",
+    "payload": {
+        "signature": "0x" + secrets.token_hex(65),
+        "authorization": {
+            "from": "0x" + secrets.token_hex(20),
+            "to": "0x" + secrets.token_hex(20),
+            "value": "10000",
+            "validAfter": "1700000000",
+            "validBefore": "1700000060",
+            "nonce": "0x" + secrets.token_hex(32),
+        },
+    },
+}
+
+
+def default(obj):
+    if hasattr(obj, "hex"):
+        return obj.hex()
+    raise TypeError(obj)
+
+
+def report(name: str, fn) -> None:
+    elapsed = timeit.timeit(fn, number=ITERATIONS)
+    print(f"{name:>24}: {ITERATIONS / elapsed:10.0f} ops/s")
+
+
+def main() -> None:
+    encoded = safe_base64_encode(json.dumps(HEADER, default=default))
+
+    report(
+        "encode (previous)",
+        lambda: safe_base64_encode(json.dumps(HEADER, default=default)),
+    )
+    report("decode (previous)", lambda: json.loads(safe_base64_decode(encoded)))
+
+    codecs = [StdlibJSONCodec]
+    if orjson is not None:
+        codecs.append(OrjsonCodec)
+    for codec in codecs:
+        set_json_codec(codec())
+        report(f"encode ({codec.name})", lambda: b64encode_json(HEADER, default))
+        report(f"decode ({codec.name})", lambda: b64decode_json(encoded))
+
+
+if __name__ == "__main__":
+    main()
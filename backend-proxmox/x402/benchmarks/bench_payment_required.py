@@ -0,0 +1,87 @@
+"""Microbenchmark for building the FastAPI middleware's JSON 402 response.
+
+Both sides start from the same payment requirements, so only the response
+construction is compared: validating, dumping and re-serializing the models
+per request versus splicing the cached, pre-serialized body.
+
+Run with: uv run python benchmarks/bench_payment_required.py
+"""
+
+import timeit
+from typing import cast
+
+from fastapi.responses import JSONResponse
+
+from x402.common import process_price_to_atomic_amount, x402_VERSION
+from x402.encoding import json_dumps
+from x402.fastapi.middleware import PaymentRequiredResponse
+from x402.types import (
+    PaymentRequirements,
+    SupportedNetworks,
+    x402PaymentRequiredResponse,
+)
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+NETWORK = "base-sepolia"
+ERROR = "No X-PAYMENT header provided"
+ITERATIONS = 20_000
+
+
+def make_requirements() -> list[PaymentRequirements]:
+    max_amount_required, asset_address, eip712_domain = process_price_to_atomic_amount(
+        "$0.01", NETWORK
+    )
+    return [
+        PaymentRequirements(
+            scheme="exact",
+            network=cast(SupportedNetworks, NETWORK),
+            asset=asset_address,
+            max_amount_required=max_amount_required,
+            resource="http://testserver/protected",
+            description="",
+            mime_type="",
+            pay_to=PAY_TO,
+            max_timeout_seconds=60,
+            output_schema={
+                "input": {"type": "http", "method": "GET", "discoverable": True},
+                "output": None,
+            },
+            extra=eip712_domain,
+        )
+    ]
+
+
+def uncached_402(payment_requirements: list[PaymentRequirements]) -> JSONResponse:
+    """The previous per-request construction: validate, dump and re-serialize."""
+    response_data = x402PaymentRequiredResponse(
+        x402_version=x402_VERSION,
+        accepts=payment_requirements,
+        error=ERROR,
+    ).model_dump(by_alias=True)
+    return JSONResponse(
+        content=response_data,
+        status_code=402,
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def main() -> None:
+    payment_requirements = make_requirements()
+    accepts_json = json_dumps(
+        [req.model_dump(by_alias=True) for req in payment_requirements]
+    )
+
+    baseline = timeit.timeit(
+        lambda: uncached_402(payment_requirements), number=ITERATIONS
+    )
+    cached = timeit.timeit(
+        lambda: PaymentRequiredResponse(accepts_json, ERROR), number=ITERATIONS
+    )
+
+    print(f"iterations: {ITERATIONS}")
+    print(f"uncached 402 build:    {baseline / ITERATIONS * 1e6:8.2f} us/402")
+    print(f"cached 402 build:      {cached / ITERATIONS * 1e6:8.2f} us/402")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Throughput of a multi-threaded requests session driving paid calls.
+
+A local server answers 402 until an X-PAYMENT header is present, so every
+call exercises the full parse, sign and retry path of the x402 adapter.
+
+Run with: uv run python benchmarks/bench_requests_adapter.py
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_account import Account
+
+from x402.clients.requests import x402_requests
+from x402.common import process_price_to_atomic_amount
+from x402.types import PaymentRequirements, x402PaymentRequiredResponse
+
+PAY_TO = "0x1111111111111111111111111111111111111111"
+NETWORK = "base-sepolia"
+CALLS = 400
+THREAD_COUNTS = (1, 4, 16)
+
+
+def payment_required_body(port: int) -> bytes:
+    max_amount_required, asset_address, eip712_domain = process_price_to_atomic_amount(
+        "$0.01", NETWORK
+    )
+    return json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1,
+            accepts=[
+                PaymentRequirements(
+                    scheme="exact",
+                    network=NETWORK,
+                    asset=asset_address,
+                    max_amount_required=max_amount_required,
+                    resource=f"http://127.0.0.1:{port}/paid",
+                    description="",
+                    mime_type="",
+                    pay_to=PAY_TO,
+                    max_timeout_seconds=60,
+                    extra=eip712_domain,
+                )
+            ],
+            error="No X-PAYMENT header provided",
+        ).model_dump(by_alias=True)
+    ).encode()
+
+
+def start_server() -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        required_body = b""
+
+        def do_GET(self):
+            if self.headers.get("X-PAYMENT"):
+                status, body = 200, b'{"ok":true}'
+            else:
+                status, body = 402, self.required_body
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    Handler.required_body = payment_required_body(server.server_port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_port}/paid"
+    session = x402_requests(Account.create(), pool_connections=32, pool_maxsize=32)
+
+    def call(_: int) -> int:
+        return session.get(url).status_code
+
+    # Warm up connections and pydantic validators
+    assert call(0) == 200
+
+    for threads in THREAD_COUNTS:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            start = time.perf_counter()
+            statuses = list(pool.map(call, range(CALLS)))
+            elapsed = time.perf_counter() - start
+        assert statuses == [200] * CALLS, "paid retry did not succeed"
+        print(
+            f"{threads:>3} threads: {CALLS / elapsed:8.1f} paid calls/s "
+            f"({elapsed / CALLS * 1e3:.2f} ms/call)"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
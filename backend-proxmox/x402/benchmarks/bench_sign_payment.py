@@ -0,0 +1,129 @@
+"""Signatures per second for exact-scheme payment headers.
+
+Compares eth_account's generic EIP-712 path, which rebuilds and re-hashes the
+domain and type strings on every call, with `sign_payment_header`, which
+reuses the cached domain separator and struct type hash.
+
+The digest rows isolate the hashing work this module controls; the signature
+rows include the secp256k1 signing, which dominates unless eth_keys has the
+coincurve backend installed.
+
+Run with: uv run python benchmarks/bench_sign_payment.py
+"""
+
+import secrets
+import time
+import timeit
+
+from eth_account import Account
+from eth_account.messages import SignableMessage, encode_typed_data
+from eth_utils import keccak
+
+from x402.chains import get_chain_id
+from x402.clients.base import build_unsigned_header
+from x402.common import process_price_to_atomic_amount
+from x402.exact import authorization_signable, sign_payment_header
+from x402.types import PaymentRequirements
+
+NETWORK = "base-sepolia"
+ITERATIONS = 2_000
+
+
+def make_requirements() -> PaymentRequirements:
+    max_amount_required, asset_address, eip712_domain = process_price_to_atomic_amount(
+        "$0.01", NETWORK
+    )
+    return PaymentRequirements(
+        scheme="exact",
+        network=NETWORK,
+        asset=asset_address,
+        max_amount_required=max_amount_required,
+        resource="https://example.com/paid",
+        description="",
+        mime_type="",
+        pay_to="0x1111111111111111111111111111111111111111",
+        max_timeout_seconds=60,
+        extra=eip712_domain,
+    )
+
+
+def eip191_digest(message: SignableMessage) -> bytes:
+    return keccak(b"\x19" + message.version + message.header + message.body)
+
+
+def unsigned_header(account, requirements):
+    now = int(time.time())
+    return build_unsigned_header(
+        account.address,
+        requirements,
+        1,
+        valid_after=now - 60,
+        valid_before=now + requirements.max_timeout_seconds,
+        nonce=secrets.token_hex(32),
+    )
+
+
+def typed_data(auth, requirements) -> dict:
+    return dict(
+        domain_data={
+            "name": requirements.extra["name"],
+            "version": requirements.extra["version"],
+            "chainId": int(get_chain_id(requirements.network)),
+            "verifyingContract": requirements.asset,
+        },
+        message_types={
+            "TransferWithAuthorization": [
+                {"name": "from", "type": "address"},
+                {"name": "to", "type": "address"},
+                {"name": "value", "type": "uint256"},
+                {"name": "validAfter", "type": "uint256"},
+                {"name": "validBefore", "type": "uint256"},
+                {"name": "nonce", "type": "bytes32"},
+            ]
+        },
+        message_data={
+            "from": auth["from"],
+            "to": auth["to"],
+            "value": int(auth["value"]),
+            "validAfter": int(auth["validAfter"]),
+            "validBefore": int(auth["validBefore"]),
+            "nonce": bytes.fromhex(auth["nonce"]),
+        },
+    )
+
+
+def sign_typed_data(account, requirements) -> bytes:
+    """The previous per-call construction through eth_account's EIP-712 encoder."""
+    auth = unsigned_header(account, requirements)["payload"]["authorization"]
+    return account.sign_typed_data(**typed_data(auth, requirements)).signature
+
+
+def main() -> None:
+    account = Account.create()
+    requirements = make_requirements()
+
+    auth = unsigned_header(account, requirements)["payload"]["authorization"]
+
+    cases = {
+        "typed_data digest": lambda: eip191_digest(
+            encode_typed_data(**typed_data(auth, requirements))
+        ),
+        "cached digest": lambda: eip191_digest(
+            authorization_signable(requirements, auth)
+        ),
+        "sign_typed_data": lambda: sign_typed_data(account, requirements),
+        "sign_payment_header": lambda: sign_payment_header(
+            account, requirements, unsigned_header(account, requirements)
+        ),
+    }
+    for name, fn in cases.items():
+        fn()  # warm up caches
+        elapsed = timeit.timeit(fn, number=ITERATIONS)
+        print(
+            f"{name:>20}: {ITERATIONS / elapsed:8.0f} ops/s "
+            f"({elapsed / ITERATIONS * 1e6:.0f} µs/op)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Construction time and memory of hot-path payment payload types.
+
+Compares the full PaymentPayload model with the slotted CompactPaymentPayload
+the middlewares decode X-PAYMENT headers into.
+
+Run with: uv run python benchmarks/bench_types.py
+"""
+
+import json
+import secrets
+import timeit
+import tracemalloc
+
+from x402.types import CompactPaymentPayload, PaymentPayload
+
+ITERATIONS = 50_000
+INSTANCES = 10_000
+
+RAW = json.dumps(
+    {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {
+            "signature": "0x" + secrets.token_hex(65),
+            "authorization": {
+                "from": "0x" + secrets.token_hex(20),
+                "to": "0x" + secrets.token_hex(20),
+                "value": "10000",
+                "validAfter": "1700000000",
+                "validBefore": "1700000060",
+                "nonce": "0x" + secrets.token_hex(32),
+            },
+        },
+    }
+).encode()
+
+
+def bytes_per_instance(cls) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [cls.model_validate_json(RAW) for _ in range(INSTANCES)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del instances
+    return size / INSTANCES
+
+
+def main() -> None:
+    for cls in (PaymentPayload, CompactPaymentPayload):
+        parse = timeit.timeit(
+            lambda cls=cls: cls.model_validate_json(RAW), number=ITERATIONS
+        )
+        instance = cls.model_validate_json(RAW)
+        dump = timeit.timeit(
+            lambda instance=instance: instance.model_dump(by_alias=True),
+            number=ITERATIONS,
+        )
+        print(
+            f"{cls.__name__:>22}: "
+            f"parse {parse / ITERATIONS * 1e6:5.2f} µs, "
+            f"dump {dump / ITERATIONS * 1e6:5.2f} µs, "
+            f"{bytes_per_instance(cls):6.0f} B/instance"
+        )
+
+
+if __name__ == "__main__":
+    main()
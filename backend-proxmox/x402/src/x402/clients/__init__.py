@@ -1,8 +1,14 @@
-from x402.clients.base import x402Client, decode_x_payment_response
+from x402.clients.base import (
+    PaymentHeaderResult,
+    x402Client,
+    decode_x_payment_response,
+)
+from x402.clients.cache import PaymentRequirementsCache
 from x402.clients.httpx import (
     x402_payment_hooks,
     x402HttpxClient,
 )
+from x402.clients.presign import PaymentAuthorizationPool
 from x402.clients.requests import (
     x402HTTPAdapter,
     x402_http_adapter,
@@ -14,6 +20,9 @@ __all__ = [
     "decode_x_payment_response",
     "x402_payment_hooks",
     "x402HttpxClient",
+    "PaymentAuthorizationPool",
+    "PaymentHeaderResult",
+    "PaymentRequirementsCache",
     "x402HTTPAdapter",
     "x402_http_adapter",
     "x402_requests",
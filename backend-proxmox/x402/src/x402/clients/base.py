@@ -1,5 +1,10 @@
+import multiprocessing
+import os
+import threading
 import time
-from typing import Optional, Callable, Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Optional, Callable, Dict, Any, List, NamedTuple
 from eth_account import Account
 from x402.exact import sign_payment_header
 from x402.types import (
@@ -7,9 +12,12 @@ from x402.types import (
     UnsupportedSchemeException,
 )
 from x402.common import x402_VERSION
+from x402.clients.cache import PaymentRequirementsCache
 import secrets
-from x402.encoding import safe_base64_decode
-import json
+from x402.encoding import b64decode_json
+
+if TYPE_CHECKING:
+    from x402.clients.presign import PaymentAuthorizationPool
 
 # Define type for the payment requirements selector
 PaymentSelectorCallable = Callable[
@@ -31,9 +39,7 @@ def decode_x_payment_response(header: str) -> Dict[str, Any]:
         - network: str
         - payer: str (address)
     """
-    decoded = safe_base64_decode(header)
-    result = json.loads(decoded)
-    return result
+    return b64decode_json(header)
 
 
 class PaymentError(Exception):
@@ -60,6 +66,74 @@ class PaymentAlreadyAttemptedError(PaymentError):
     pass
 
 
+def build_unsigned_header(
+    sender_address: str,
+    payment_requirements: PaymentRequirements,
+    x402_version: int,
+    valid_after: int,
+    valid_before: int,
+    nonce: str,
+) -> Dict[str, Any]:
+    """Build an unsigned exact-scheme payment header.
+
+    Args:
+        sender_address: Address of the paying account
+        payment_requirements: Requirements being paid
+        x402_version: x402 protocol version
+        valid_after: Unix time the authorization becomes valid
+        valid_before: Unix time the authorization expires
+        nonce: 32-byte nonce as 64 hex chars
+
+    Returns:
+        Header dict ready for `sign_payment_header`
+    """
+    return {
+        "x402Version": x402_version,
+        "scheme": payment_requirements.scheme,
+        "network": payment_requirements.network,
+        "payload": {
+            "signature": None,
+            "authorization": {
+                "from": sender_address,
+                "to": payment_requirements.pay_to,
+                "value": payment_requirements.max_amount_required,
+                "validAfter": str(valid_after),
+                "validBefore": str(valid_before),
+                "nonce": nonce,
+            },
+        },
+    }
+
+
+class PaymentHeaderResult(NamedTuple):
+    """Outcome of signing one item of a batch: a header or the error that prevented it."""
+
+    header: Optional[str]
+    error: Optional[PaymentError]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Account of a signing worker process, set once by its initializer
+_worker_account: Optional[Account] = None
+
+
+def _init_signing_worker(private_key: bytes) -> None:
+    """Process-pool initializer: rebuild the account once per worker."""
+    global _worker_account
+    _worker_account = Account.from_key(private_key)
+
+
+def _sign_in_worker(
+    payment_requirements: PaymentRequirements,
+    unsigned_header: Dict[str, Any],
+) -> str:
+    """Process-pool entry point: sign with the worker's account."""
+    return sign_payment_header(_worker_account, payment_requirements, unsigned_header)
+
+
 class x402Client:
     """Base client for handling x402 payments."""
 
@@ -68,6 +142,9 @@ class x402Client:
         account: Account,
         max_value: Optional[int] = None,
         payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+        authorization_pool: Optional["PaymentAuthorizationPool"] = None,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
+        signing_workers: Optional[int] = None,
     ):
         """Initialize the x402 client.
 
@@ -75,12 +152,36 @@ class x402Client:
             account: eth_account.Account instance for signing payments
             max_value: Optional maximum allowed payment amount in base units
             payment_requirements_selector: Optional custom selector for payment requirements
+            authorization_pool: Optional pool of pre-signed authorizations to
+                draw from before signing inline
+            requirements_cache: Optional memory of requirements per resource,
+                used to attach a payment on the first attempt
+            signing_workers: Worker processes used by `create_payment_headers`;
+                defaults to the CPU count
         """
         self.account = account
         self.max_value = max_value
+        self.authorization_pool = authorization_pool
+        self.requirements_cache = requirements_cache
+        self.signing_workers = signing_workers
         self._payment_requirements_selector = (
             payment_requirements_selector or self.default_payment_requirements_selector
         )
+        self._signing_pool: Optional[ProcessPoolExecutor] = None
+        self._signing_pool_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Shut down the signing worker processes, if any were started."""
+        with self._signing_pool_lock:
+            pool, self._signing_pool = self._signing_pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def __enter__(self) -> "x402Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     @staticmethod
     def default_payment_requirements_selector(
@@ -167,32 +268,168 @@ class x402Client:
         Returns:
             Signed payment header
         """
-        unsigned_header = {
-            "x402Version": x402_version,
-            "scheme": payment_requirements.scheme,
-            "network": payment_requirements.network,
-            "payload": {
-                "signature": None,
-                "authorization": {
-                    "from": self.account.address,
-                    "to": payment_requirements.pay_to,
-                    "value": payment_requirements.max_amount_required,
-                    "validAfter": str(int(time.time()) - 60),  # 60 seconds before
-                    "validBefore": str(
-                        int(time.time()) + payment_requirements.max_timeout_seconds
-                    ),
-                    "nonce": self.generate_nonce(),
-                },
-            },
-        }
+        if self.authorization_pool is not None:
+            pooled_header = self.authorization_pool.take(
+                payment_requirements, x402_version
+            )
+            if pooled_header is not None:
+                return pooled_header
 
         signed_header = sign_payment_header(
             self.account,
             payment_requirements,
-            unsigned_header,
+            self._unsigned_header(payment_requirements, x402_version),
         )
         return signed_header
 
+    def create_payment_headers(
+        self,
+        payment_requirements: List[PaymentRequirements],
+        x402_version: int = x402_VERSION,
+    ) -> List[PaymentHeaderResult]:
+        """Sign payment headers for several requirements in parallel.
+
+        Pre-signed headers from the authorization pool are used first. The
+        rest are prepared in this process and signed across the client's
+        signing processes, so the secp256k1 work is not serialized by the
+        GIL. A failure on one item does not affect the others.
+
+        The worker processes are started on first use, receive the key once
+        when they start, and live until `close`.
+
+        Args:
+            payment_requirements: Selected payment requirements, one per header
+            x402_version: x402 protocol version
+
+        Returns:
+            One PaymentHeaderResult per requirement, in the same order
+        """
+        results: List[Optional[PaymentHeaderResult]] = [None] * len(
+            payment_requirements
+        )
+        jobs = []
+        for i, requirements in enumerate(payment_requirements):
+            if self.max_value is not None:
+                amount = int(requirements.max_amount_required)
+                if amount > self.max_value:
+                    results[i] = PaymentHeaderResult(
+                        None,
+                        PaymentAmountExceededError(
+                            f"Payment amount {amount} exceeds maximum allowed value {self.max_value}"
+                        ),
+                    )
+                    continue
+            if self.authorization_pool is not None:
+                pooled_header = self.authorization_pool.take(requirements, x402_version)
+                if pooled_header is not None:
+                    results[i] = PaymentHeaderResult(pooled_header, None)
+                    continue
+            jobs.append(
+                (i, requirements, self._unsigned_header(requirements, x402_version))
+            )
+
+        signing_pool = self._get_signing_pool() if len(jobs) >= 2 else None
+        if signing_pool is None:
+            # Not worth a pool, or the account cannot be rebuilt in a worker
+            for i, requirements, unsigned_header in jobs:
+                results[i] = self._sign_result(
+                    partial(
+                        sign_payment_header, self.account, requirements, unsigned_header
+                    )
+                )
+            return results
+
+        futures = [
+            (i, signing_pool.submit(_sign_in_worker, requirements, unsigned_header))
+            for i, requirements, unsigned_header in jobs
+        ]
+        for i, future in futures:
+            results[i] = self._sign_result(future.result)
+        return results
+
+    def _get_signing_pool(self) -> Optional[ProcessPoolExecutor]:
+        private_key = getattr(self.account, "key", None)
+        if private_key is None:
+            return None
+        with self._signing_pool_lock:
+            if self._signing_pool is None:
+                self._signing_pool = ProcessPoolExecutor(
+                    max_workers=self.signing_workers or os.cpu_count() or 1,
+                    # Forking a process that runs threads (HTTP clients, the
+                    # presign pool) is unsafe, so workers start fresh
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_signing_worker,
+                    initargs=(bytes(private_key),),
+                )
+            return self._signing_pool
+
+    @staticmethod
+    def _sign_result(sign: Callable[[], str]) -> PaymentHeaderResult:
+        try:
+            return PaymentHeaderResult(sign(), None)
+        except PaymentError as e:
+            return PaymentHeaderResult(None, e)
+        except Exception as e:
+            error = PaymentError(f"Failed to sign payment header: {str(e)}")
+            error.__cause__ = e
+            return PaymentHeaderResult(None, error)
+
+    def _unsigned_header(
+        self, payment_requirements: PaymentRequirements, x402_version: int
+    ) -> Dict[str, Any]:
+        now = int(time.time())
+        return build_unsigned_header(
+            self.account.address,
+            payment_requirements,
+            x402_version,
+            valid_after=now - 60,  # 60 seconds before
+            valid_before=now + payment_requirements.max_timeout_seconds,
+            nonce=self.generate_nonce(),
+        )
+
+    def proactive_payment_header(self, method: str, url: str) -> Optional[str]:
+        """Create a payment header upfront from remembered requirements.
+
+        Args:
+            method: HTTP method of the request about to be sent
+            url: URL of the request about to be sent
+
+        Returns:
+            Signed payment header, or None if nothing fresh is remembered for
+            the resource or the proactive spend cap would be exceeded
+        """
+        if self.requirements_cache is None:
+            return None
+
+        remembered = self.requirements_cache.get(method, url)
+        if remembered is None:
+            return None
+
+        payment_requirements, x402_version = remembered
+        amount = int(payment_requirements.max_amount_required)
+        if self.max_value is not None and amount > self.max_value:
+            return None
+        if not self.requirements_cache.reserve(amount):
+            return None
+
+        return self.create_payment_header(payment_requirements, x402_version)
+
+    def remember_payment_requirements(
+        self,
+        method: str,
+        url: str,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+    ) -> None:
+        """Remember the requirements selected for a resource, if caching is enabled."""
+        if self.requirements_cache is not None:
+            self.requirements_cache.put(method, url, payment_requirements, x402_version)
+
+    def forget_payment_requirements(self, method: str, url: str) -> None:
+        """Drop remembered requirements for a resource, e.g. after a 402."""
+        if self.requirements_cache is not None:
+            self.requirements_cache.invalidate(method, url)
+
     def generate_nonce(self):
         # Generate a random nonce (32 bytes = 64 hex chars)
         nonce = secrets.token_hex(32)
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+from x402.types import PaymentRequirements
+
+
+def requirements_cache_key(method: str, url: str) -> Tuple[str, str]:
+    """Key requirements by method and URL, ignoring query string and fragment."""
+    parts = urlsplit(str(url))
+    return method.upper(), f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+class PaymentRequirementsCache:
+    """Remembers the requirements a resource asked for, so later calls can pay upfront.
+
+    Entries are kept per (method, URL without query) for `ttl_seconds` and
+    evicted least recently used beyond `max_entries`. Proactive payments draw
+    on an optional total budget, `max_proactive_spend`, in base units; once it
+    is exhausted clients fall back to waiting for a 402 before paying.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 256,
+        max_proactive_spend: Optional[int] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: How long remembered requirements stay usable
+            max_entries: Maximum number of remembered resources
+            max_proactive_spend: Optional cap, in base units, on the total value
+                attached proactively over the cache's lifetime
+        """
+        if ttl_seconds <= 0:
+            raise ValueError(f"ttl_seconds must be positive, got {ttl_seconds}")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.remaining_spend = max_proactive_spend
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, PaymentRequirements, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, method: str, url: str) -> Optional[Tuple[PaymentRequirements, int]]:
+        """Return the remembered (requirements, x402_version), if still fresh."""
+        key = requirements_cache_key(method, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payment_requirements, x402_version = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payment_requirements, x402_version
+
+    def put(
+        self,
+        method: str,
+        url: str,
+        payment_requirements: PaymentRequirements,
+        x402_version: int,
+    ) -> None:
+        """Remember the requirements selected for a resource."""
+        key = requirements_cache_key(method, url)
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.ttl_seconds,
+                payment_requirements,
+                x402_version,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, method: str, url: str) -> None:
+        """Forget a resource, e.g. after it answered with a 402."""
+        with self._lock:
+            self._entries.pop(requirements_cache_key(method, url), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def reserve(self, amount: int) -> bool:
+        """Take `amount` from the proactive spend budget; False if it does not fit."""
+        with self._lock:
+            if self.remaining_spend is None:
+                return True
+            if amount > self.remaining_spend:
+                return False
+            self.remaining_spend -= amount
+            return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -7,17 +7,42 @@ from x402.clients.base import (
     PaymentError,
     PaymentSelectorCallable,
 )
+from x402.clients.cache import PaymentRequirementsCache
 from x402.types import x402PaymentRequiredResponse
 
 
+# Request extension marking a paid retry, so retry state lives on the request
+# rather than on the (shared) hooks instance
+RETRY_EXTENSION = "x402_retry"
+
+
 class HttpxHooks:
-    def __init__(self, client: x402Client):
+    def __init__(self, client: x402Client, http_client: Optional[AsyncClient] = None):
+        """Initialize the hooks.
+
+        Args:
+            client: x402Client instance for handling payments
+            http_client: Optional AsyncClient the hooks are installed on. Paid
+                retries are sent through it to reuse its connection pool and
+                settings; otherwise a one-off AsyncClient is used.
+        """
         self.client = client
-        self._is_retry = False
+        self.http_client = http_client
 
     async def on_request(self, request: Request):
-        """Handle request before it is sent."""
-        pass
+        """Handle request before it is sent.
+
+        Pays upfront when the requirements for this resource are remembered.
+        """
+        if "X-Payment" in request.headers:
+            return
+
+        payment_header = self.client.proactive_payment_header(
+            request.method, str(request.url)
+        )
+        if payment_header is not None:
+            request.headers["X-Payment"] = payment_header
+            request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
 
     async def on_response(self, response: Response) -> Response:
         """Handle response after it is received."""
@@ -26,14 +51,18 @@ class HttpxHooks:
         if response.status_code != 402:
             return response
 
-        # If this is a retry response, just return it
-        if self._is_retry:
-            return response
-
         try:
             if not response.request:
                 raise MissingRequestConfigError("Missing request configuration")
 
+            # Whatever was remembered is stale; relearn from this 402
+            method, url = response.request.method, str(response.request.url)
+            self.client.forget_payment_requirements(method, url)
+
+            # If this is a retry response, just return it
+            if response.request.extensions.get(RETRY_EXTENSION):
+                return response
+
             # Read the response content before parsing
             await response.aread()
 
@@ -45,6 +74,9 @@ class HttpxHooks:
             selected_requirements = self.client.select_payment_requirements(
                 payment_response.accepts
             )
+            self.client.remember_payment_requirements(
+                method, url, selected_requirements, payment_response.x402_version
+            )
 
             # Create payment header
             payment_header = self.client.create_payment_header(
@@ -52,27 +84,28 @@ class HttpxHooks:
             )
 
             # Mark as retry and add payment header
-            self._is_retry = True
             request = response.request
+            request.extensions[RETRY_EXTENSION] = True
 
             request.headers["X-Payment"] = payment_header
             request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
 
             # Retry the request
-            async with AsyncClient() as client:
-                retry_response = await client.send(request)
-
-                # Copy the retry response data to the original response
-                response.status_code = retry_response.status_code
-                response.headers = retry_response.headers
-                response._content = retry_response._content
-                return response
+            if self.http_client is not None and not self.http_client.is_closed:
+                retry_response = await self.http_client.send(request)
+            else:
+                async with AsyncClient() as client:
+                    retry_response = await client.send(request)
+
+            # Copy the retry response data to the original response
+            response.status_code = retry_response.status_code
+            response.headers = retry_response.headers
+            response._content = retry_response._content
+            return response
 
         except PaymentError as e:
-            self._is_retry = False
             raise e
         except Exception as e:
-            self._is_retry = False
             raise PaymentError(f"Failed to handle payment: {str(e)}") from e
 
 
@@ -80,6 +113,8 @@ def x402_payment_hooks(
     account: Account,
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    http_client: Optional[AsyncClient] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
 ) -> Dict[str, List]:
     """Create httpx event hooks dictionary for handling 402 Payment Required responses.
 
@@ -89,6 +124,10 @@ def x402_payment_hooks(
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        http_client: Optional AsyncClient the hooks will be installed on, used to
+            send paid retries over its connection pool
+        requirements_cache: Optional PaymentRequirementsCache; when set, remembered
+            requirements are paid on the first attempt instead of after a 402
 
     Returns:
         Dictionary of event hooks that can be directly assigned to client.event_hooks
@@ -98,10 +137,11 @@ def x402_payment_hooks(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
     )
 
     # Create hooks
-    hooks = HttpxHooks(client)
+    hooks = HttpxHooks(client, http_client)
 
     # Return event hooks dictionary
     return {
@@ -118,6 +158,7 @@ class x402HttpxClient(AsyncClient):
         account: Account,
         max_value: Optional[int] = None,
         payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+        requirements_cache: Optional[PaymentRequirementsCache] = None,
         **kwargs,
     ):
         """Initialize an AsyncClient with x402 payment handling.
@@ -128,9 +169,15 @@ class x402HttpxClient(AsyncClient):
             payment_requirements_selector: Optional custom selector for payment requirements.
                 Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
                 and returns a PaymentRequirements object.
+            requirements_cache: Optional PaymentRequirementsCache; when set, remembered
+                requirements are paid on the first attempt instead of after a 402
             **kwargs: Additional arguments to pass to AsyncClient
         """
         super().__init__(**kwargs)
         self.event_hooks = x402_payment_hooks(
-            account, max_value, payment_requirements_selector
+            account,
+            max_value,
+            payment_requirements_selector,
+            http_client=self,
+            requirements_cache=requirements_cache,
         )
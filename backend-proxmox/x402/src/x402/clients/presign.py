@@ -0,0 +1,245 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Hashable, Iterable, Optional, Tuple
+
+from eth_account import Account
+
+from x402.clients.base import build_unsigned_header
+from x402.common import x402_VERSION
+from x402.exact import sign_payment_header
+from x402.types import PaymentRequirements
+
+
+def requirements_key(
+    payment_requirements: PaymentRequirements, x402_version: int = x402_VERSION
+) -> Tuple[Hashable, ...]:
+    """Fields that make two requirements interchangeable for a signed authorization."""
+    extra = payment_requirements.extra or {}
+    return (
+        x402_version,
+        payment_requirements.scheme,
+        payment_requirements.network,
+        payment_requirements.asset.lower(),
+        payment_requirements.pay_to.lower(),
+        payment_requirements.max_amount_required,
+        extra.get("name"),
+        extra.get("version"),
+    )
+
+
+class _Target:
+    __slots__ = ("requirements", "x402_version", "headers")
+
+    def __init__(self, requirements: PaymentRequirements, x402_version: int):
+        self.requirements = requirements
+        self.x402_version = x402_version
+        # (valid_before, encoded header), oldest first
+        self.headers: Deque[Tuple[int, str]] = deque()
+
+
+class PaymentAuthorizationPool:
+    """Rolling pool of pre-signed payment authorizations.
+
+    A background thread keeps up to `size` signed headers ready for each known
+    set of requirements, each with a random nonce and a validity window of at
+    most `validity_seconds`. `take` hands one out without signing on the
+    caller's thread, or returns None so the caller signs inline.
+
+    Every header is handed out at most once. Headers that are never used
+    simply expire; they move no funds until submitted to a facilitator.
+
+    Usage:
+        pool = PaymentAuthorizationPool(account)
+        client = x402Client(account, authorization_pool=pool)
+    """
+
+    def __init__(
+        self,
+        account: Account,
+        size: int = 8,
+        validity_seconds: int = 300,
+        min_remaining_seconds: int = 30,
+        max_targets: int = 8,
+        learn: bool = True,
+        requirements: Iterable[PaymentRequirements] = (),
+    ):
+        """Initialize the pool.
+
+        Args:
+            account: eth_account.Account used to sign; must be the paying account
+            size: Signed headers to keep ready per set of requirements
+            validity_seconds: Upper bound on each authorization's lifetime,
+                further capped by the requirements' max_timeout_seconds
+            min_remaining_seconds: Headers closer than this to expiry are
+                discarded rather than handed out
+            max_targets: Maximum number of distinct requirements kept warm;
+                the least recently used is dropped beyond this
+            learn: Start pre-signing for requirements first seen by `take`
+            requirements: Requirements to start pre-signing for immediately
+        """
+        if size < 1:
+            raise ValueError(f"size must be at least 1, got {size}")
+        if min_remaining_seconds >= validity_seconds:
+            raise ValueError(
+                "min_remaining_seconds must be smaller than validity_seconds"
+            )
+
+        self.account = account
+        self.size = size
+        self.validity_seconds = validity_seconds
+        self.min_remaining_seconds = min_remaining_seconds
+        self.max_targets = max_targets
+        self.learn = learn
+
+        self._targets: "OrderedDict[Tuple[Hashable, ...], _Target]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        for payment_requirements in requirements:
+            self.add(payment_requirements)
+
+    def add(
+        self,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+    ) -> None:
+        """Start keeping pre-signed headers for these requirements."""
+        window = min(self.validity_seconds, payment_requirements.max_timeout_seconds)
+        if window <= self.min_remaining_seconds:
+            # Headers would expire before they could be handed out
+            return
+
+        key = requirements_key(payment_requirements, x402_version)
+        with self._cond:
+            if key in self._targets:
+                self._targets.move_to_end(key)
+                return
+            self._targets[key] = _Target(payment_requirements, x402_version)
+            while len(self._targets) > self.max_targets:
+                self._targets.popitem(last=False)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def take(
+        self,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+    ) -> Optional[str]:
+        """Hand out a pre-signed header matching the requirements, if one is ready.
+
+        Returns:
+            Encoded X-PAYMENT header, or None if nothing usable is pooled
+        """
+        key = requirements_key(payment_requirements, x402_version)
+        with self._cond:
+            target = self._targets.get(key)
+            if target is None:
+                if self.learn and not self._closed:
+                    self.add(payment_requirements, x402_version)
+                return None
+
+            self._targets.move_to_end(key)
+            deadline = int(time.time()) + self.min_remaining_seconds
+            header = None
+            while target.headers:
+                valid_before, candidate = target.headers.popleft()
+                if valid_before > deadline:
+                    header = candidate
+                    break
+            self._cond.notify()
+            return header
+
+    def available(
+        self,
+        payment_requirements: PaymentRequirements,
+        x402_version: int = x402_VERSION,
+    ) -> int:
+        """Number of pooled headers currently held for the requirements."""
+        with self._cond:
+            target = self._targets.get(
+                requirements_key(payment_requirements, x402_version)
+            )
+            return len(target.headers) if target else 0
+
+    def close(self) -> None:
+        """Stop the background signer and drop all pooled headers."""
+        with self._cond:
+            self._closed = True
+            self._targets.clear()
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "PaymentAuthorizationPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(
+                target=self._run, name="x402-presign", daemon=True
+            )
+            self._thread.start()
+
+    def _sign(self, target: _Target) -> Tuple[int, str]:
+        now = int(time.time())
+        valid_before = now + min(
+            self.validity_seconds, target.requirements.max_timeout_seconds
+        )
+        unsigned_header = build_unsigned_header(
+            self.account.address,
+            target.requirements,
+            target.x402_version,
+            valid_after=now - 60,  # 60 seconds before
+            valid_before=valid_before,
+            nonce=secrets.token_hex(32),
+        )
+        return valid_before, sign_payment_header(
+            self.account, target.requirements, unsigned_header
+        )
+
+    def _next_job(self) -> Optional[_Target]:
+        """Pick a target needing a header, or wait until one might. Holds the lock."""
+        while not self._closed:
+            now = int(time.time())
+            deadline = now + self.min_remaining_seconds
+            next_expiry = None
+            for target in reversed(self._targets.values()):
+                while target.headers and target.headers[0][0] <= deadline:
+                    target.headers.popleft()
+                if len(target.headers) < self.size:
+                    return target
+                expiry = target.headers[0][0] - deadline
+                next_expiry = (
+                    expiry if next_expiry is None else min(next_expiry, expiry)
+                )
+            self._cond.wait(timeout=next_expiry)
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                target = self._next_job()
+            if target is None:
+                return
+
+            # Sign outside the lock so `take` never waits on secp256k1
+            try:
+                signed = self._sign(target)
+            except Exception:
+                # Unsignable requirements (e.g. missing EIP-712 domain) are
+                # dropped; callers fall back to inline signing and its error
+                with self._cond:
+                    for key, value in list(self._targets.items()):
+                        if value is target:
+                            del self._targets[key]
+                continue
+
+            with self._cond:
+                if not self._closed and len(target.headers) < self.size:
+                    target.headers.append(signed)
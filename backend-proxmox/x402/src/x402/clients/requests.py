@@ -1,6 +1,5 @@
 from typing import Optional
 import requests
-import json
 from requests.adapters import HTTPAdapter
 from eth_account import Account
 from x402.clients.base import (
@@ -8,12 +7,16 @@ from x402.clients.base import (
     PaymentError,
     PaymentSelectorCallable,
 )
+from x402.clients.cache import PaymentRequirementsCache
 from x402.types import x402PaymentRequiredResponse
-import copy
 
 
 class x402HTTPAdapter(HTTPAdapter):
-    """HTTP adapter for handling x402 payment required responses."""
+    """HTTP adapter for handling x402 payment required responses.
+
+    Retry state is kept per call, so a single adapter can be shared by a
+    Session used from many threads.
+    """
 
     def __init__(self, client: x402Client, **kwargs):
         """Initialize the adapter with an x402Client.
@@ -24,7 +27,6 @@ class x402HTTPAdapter(HTTPAdapter):
         """
         super().__init__(**kwargs)
         self.client = client
-        self._is_retry = False
 
     def send(self, request, **kwargs):
         """Send a request with payment handling for 402 responses.
@@ -36,39 +38,51 @@ class x402HTTPAdapter(HTTPAdapter):
         Returns:
             Response object
         """
-        if self._is_retry:
-            self._is_retry = False
-            return super().send(request, **kwargs)
+        # Pay upfront when the requirements for this resource are remembered
+        proactive_header = self.client.proactive_payment_header(
+            request.method, request.url
+        )
+        if proactive_header is not None:
+            request.headers["X-Payment"] = proactive_header
+            request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
 
         response = super().send(request, **kwargs)
 
         if response.status_code != 402:
             return response
 
-        try:
-            # Save the content before we parse it to avoid consuming it
-            content = copy.deepcopy(response.content)
+        # Whatever was remembered is stale; relearn from this 402
+        self.client.forget_payment_requirements(request.method, request.url)
 
-            # Parse the JSON content without using response.json() which consumes it
-            data = json.loads(content.decode("utf-8"))
-            payment_response = x402PaymentRequiredResponse(**data)
+        try:
+            # Validate straight from the (already buffered) response bytes
+            payment_response = x402PaymentRequiredResponse.model_validate_json(
+                response.content
+            )
 
             # Select payment requirements
             selected_requirements = self.client.select_payment_requirements(
                 payment_response.accepts
             )
+            self.client.remember_payment_requirements(
+                request.method,
+                request.url,
+                selected_requirements,
+                payment_response.x402_version,
+            )
 
             # Create payment header
             payment_header = self.client.create_payment_header(
                 selected_requirements, payment_response.x402_version
             )
 
-            # Mark as retry and add payment header
-            self._is_retry = True
+            # Add payment header and retry once; a 402 on the retry is returned as is
             request.headers["X-Payment"] = payment_header
             request.headers["Access-Control-Expose-Headers"] = "X-Payment-Response"
 
             retry_response = super().send(request, **kwargs)
+            if retry_response.status_code == 402:
+                self.client.forget_payment_requirements(request.method, request.url)
 
             # Copy the retry response data to the original response
             response.status_code = retry_response.status_code
@@ -77,10 +91,8 @@ class x402HTTPAdapter(HTTPAdapter):
             return response
 
         except PaymentError as e:
-            self._is_retry = False
             raise e
         except Exception as e:
-            self._is_retry = False
             raise PaymentError(f"Failed to handle payment: {str(e)}") from e
 
 
@@ -88,6 +100,7 @@ def x402_http_adapter(
     account: Account,
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
     **kwargs,
 ) -> x402HTTPAdapter:
     """Create an HTTP adapter that handles 402 Payment Required responses.
@@ -98,6 +111,8 @@ def x402_http_adapter(
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        requirements_cache: Optional PaymentRequirementsCache; when set, remembered
+            requirements are paid on the first attempt instead of after a 402
         **kwargs: Additional arguments to pass to HTTPAdapter
 
     Returns:
@@ -107,6 +122,7 @@ def x402_http_adapter(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
     )
     return x402HTTPAdapter(client, **kwargs)
 
@@ -115,6 +131,7 @@ def x402_requests(
     account: Account,
     max_value: Optional[int] = None,
     payment_requirements_selector: Optional[PaymentSelectorCallable] = None,
+    requirements_cache: Optional[PaymentRequirementsCache] = None,
     **kwargs,
 ) -> requests.Session:
     """Create a requests session with x402 payment handling.
@@ -125,6 +142,8 @@ def x402_requests(
         payment_requirements_selector: Optional custom selector for payment requirements.
             Should be a callable that takes (accepts, network_filter, scheme_filter, max_value)
             and returns a PaymentRequirements object.
+        requirements_cache: Optional PaymentRequirementsCache; when set, remembered
+            requirements are paid on the first attempt instead of after a 402
         **kwargs: Additional arguments to pass to HTTPAdapter
 
     Returns:
@@ -135,6 +154,7 @@ def x402_requests(
         account,
         max_value=max_value,
         payment_requirements_selector=payment_requirements_selector,
+        requirements_cache=requirements_cache,
         **kwargs,
     )
 
@@ -1,3 +1,5 @@
+import base64
+import binascii
 from decimal import Decimal
 from typing import List, Optional
 
@@ -8,7 +10,14 @@ from x402.chains import (
     get_token_version,
     get_default_token_address,
 )
-from x402.types import Price, TokenAmount, PaymentRequirements, PaymentPayload
+from x402.types import (
+    AnyPaymentPayload,
+    CompactPaymentPayload,
+    Price,
+    TokenAmount,
+    PaymentRequirements,
+    PaymentPayload,
+)
 
 
 def parse_money(amount: str | int, address: str, network: str) -> int:
@@ -93,7 +102,7 @@ def get_usdc_address(chain_id: int | str) -> str:
 
 def find_matching_payment_requirements(
     payment_requirements: List[PaymentRequirements],
-    payment: PaymentPayload,
+    payment: AnyPaymentPayload,
 ) -> Optional[PaymentRequirements]:
     """
     Finds the matching payment requirements for the given payment.
@@ -111,4 +120,61 @@ def find_matching_payment_requirements(
     return None
 
 
+def _payment_header_bytes(payment_header: str, max_length: Optional[int]) -> bytes:
+    if max_length is None:
+        max_length = MAX_PAYMENT_HEADER_LENGTH
+    if len(payment_header) > max_length:
+        raise ValueError(
+            f"X-PAYMENT header is {len(payment_header)} characters, max is {max_length}"
+        )
+    try:
+        # Non-alphabet characters are rejected rather than silently dropped
+        return base64.b64decode(payment_header, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"X-PAYMENT header is not valid base64: {e}") from e
+
+
+def decode_payment_header(
+    payment_header: str, max_length: Optional[int] = None
+) -> PaymentPayload:
+    """
+    Decodes a base64 X-PAYMENT header into a PaymentPayload in a single parse.
+
+    Args:
+        payment_header: The raw X-PAYMENT header value
+        max_length: Maximum accepted header length, checked before decoding.
+            Defaults to MAX_PAYMENT_HEADER_LENGTH.
+
+    Returns:
+        The decoded payment payload
+
+    Raises:
+        ValueError: If the header is too long, not valid base64 or not a valid payload
+    """
+    return PaymentPayload.model_validate_json(
+        _payment_header_bytes(payment_header, max_length)
+    )
+
+
+def decode_compact_payment_header(
+    payment_header: str, max_length: Optional[int] = None
+) -> CompactPaymentPayload:
+    """
+    Decodes a base64 X-PAYMENT header into a slotted CompactPaymentPayload.
+
+    Validation and wire format match `decode_payment_header`; the result is
+    smaller and immutable, which suits the per-request middleware path.
+
+    Raises:
+        ValueError: If the header is too long, not valid base64 or not a valid payload
+    """
+    return CompactPaymentPayload.model_validate_json(
+        _payment_header_bytes(payment_header, max_length)
+    )
+
+
 x402_VERSION = 1
+
+# Smart wallet signatures are ABI-encoded and can run to a few KB once base64
+# encoded; anything far beyond that is rejected before decoding.
+MAX_PAYMENT_HEADER_LENGTH = 16384
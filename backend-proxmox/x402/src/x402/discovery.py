@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from x402.types import (
+    DiscoveredResource,
+    ListDiscoveryResourcesRequest,
+    ListDiscoveryResourcesResponse,
+)
+
+DiscoveryCacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class _DiscoveryEntry:
+    __slots__ = ("expires_at", "etag", "last_modified", "response")
+
+    def __init__(
+        self,
+        expires_at: float,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        response: ListDiscoveryResourcesResponse,
+    ):
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.response = response
+
+
+class DiscoveryCache:
+    """TTL cache of discovery listings keyed by facilitator URL and query.
+
+    Fresh entries are served without a request. Once an entry is stale, its
+    ETag or Last-Modified validators are sent back to the facilitator, and a
+    304 renews the entry without downloading the listing again. Listings are
+    shared between callers, so treat them as read-only.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 128):
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a listing is served before it is revalidated
+            max_entries: Maximum number of cached queries
+        """
+        if ttl_seconds <= 0:
+            raise ValueError(f"ttl_seconds must be positive, got {ttl_seconds}")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[DiscoveryCacheKey, _DiscoveryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: Dict[str, str]) -> DiscoveryCacheKey:
+        return url, tuple(sorted(params.items()))
+
+    def lookup(
+        self, key: DiscoveryCacheKey
+    ) -> Tuple[Optional[ListDiscoveryResourcesResponse], Dict[str, str]]:
+        """Return a fresh listing, or None and the headers to revalidate with."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, {}
+            self._entries.move_to_end(key)
+            if entry.expires_at > time.monotonic():
+                return entry.response, {}
+            headers = {}
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            return None, headers
+
+    def revalidated(
+        self, key: DiscoveryCacheKey
+    ) -> Optional[ListDiscoveryResourcesResponse]:
+        """Renew a stale entry after a 304 and return its listing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = time.monotonic() + self.ttl_seconds
+            return entry.response
+
+    def put(
+        self,
+        key: DiscoveryCacheKey,
+        response: ListDiscoveryResourcesResponse,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._entries[key] = _DiscoveryEntry(
+                time.monotonic() + self.ttl_seconds, etag, last_modified, response
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+async def iter_discovery_resources(
+    facilitator: Any,
+    type: Optional[str] = None,
+    page_size: int = 100,
+    prefetch: bool = True,
+) -> AsyncIterator[DiscoveredResource]:
+    """Yield every discoverable resource, fetching pages as needed.
+
+    With `prefetch`, the next page is requested as soon as the current one
+    arrives, so it downloads while the caller works through the current items.
+
+    Args:
+        facilitator: Anything with an async `list(request)`, e.g. FacilitatorClient
+        type: Optional resource type filter
+        page_size: Resources requested per page
+        prefetch: Fetch the next page while the current one is consumed
+    """
+
+    def fetch(offset: int) -> "asyncio.Future[ListDiscoveryResourcesResponse]":
+        return asyncio.ensure_future(
+            facilitator.list(
+                ListDiscoveryResourcesRequest(type=type, limit=page_size, offset=offset)
+            )
+        )
+
+    next_page: Optional["asyncio.Future[ListDiscoveryResourcesResponse]"] = fetch(0)
+    try:
+        while next_page is not None:
+            page = await next_page
+            offset = page.pagination.offset + len(page.items)
+            more = bool(page.items) and offset < page.pagination.total
+            next_page = fetch(offset) if more and prefetch else None
+            for item in page.items:
+                yield item
+            if more and next_page is None:
+                next_page = fetch(offset)
+    finally:
+        # The caller stopped early; drop the prefetched page
+        if next_page is not None:
+            if next_page.done():
+                if not next_page.cancelled():
+                    next_page.exception()
+            else:
+                next_page.cancel()
@@ -1,5 +1,124 @@
 import base64
-from typing import Union
+import binascii
+import json
+from typing import Any, Callable, Optional, Protocol, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    orjson = None
+
+
+class JSONCodec(Protocol):
+    """Serializes JSON to and from bytes."""
+
+    name: str
+
+    def dumps(
+        self, obj: Any, default: Optional[Callable[[Any], Any]] = None
+    ) -> bytes: ...
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any: ...
+
+
+_COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+class StdlibJSONCodec:
+    """Compact UTF-8 JSON through the standard library."""
+
+    name = "json"
+
+    def __init__(self):
+        # Reused instances skip json.dumps/json.loads argument handling
+        self._encoder = json.JSONEncoder(**_COMPACT)
+        self._decoder = json.JSONDecoder()
+
+    def dumps(self, obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        encoder = (
+            self._encoder
+            if default is None
+            else json.JSONEncoder(default=default, **_COMPACT)
+        )
+        return encoder.encode(obj).encode("utf-8")
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if not isinstance(data, str):
+            data = str(data, "utf-8")
+        return self._decoder.decode(data)
+
+
+class OrjsonCodec:
+    """JSON through orjson, which reads and writes bytes natively.
+
+    orjson only handles integers that fit in 64 bits: larger ones are written
+    through the stdlib instead, and are read back as floats. Opt in with
+    ``set_json_codec(OrjsonCodec())`` where payloads keep big amounts in
+    strings, as x402 messages do.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError(
+                "orjson is not installed. Install it with `pip install x402[fast]`."
+            )
+        self._fallback = StdlibJSONCodec()
+
+    def dumps(self, obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        try:
+            return orjson.dumps(obj, default=default)
+        except orjson.JSONEncodeError as e:
+            if "64-bit" not in str(e):
+                raise
+            return self._fallback.dumps(obj, default)
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        return orjson.loads(data)
+
+
+# The stdlib handles integers of any size; orjson is opt-in
+_codec: JSONCodec = StdlibJSONCodec()
+
+
+def get_json_codec() -> JSONCodec:
+    """Return the JSON codec used for x402 headers and bodies."""
+    return _codec
+
+
+def set_json_codec(codec: JSONCodec) -> None:
+    """Replace the JSON codec, e.g. with OrjsonCodec() for faster headers."""
+    global _codec
+    _codec = codec
+
+
+def json_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes with the active codec."""
+    return _codec.dumps(obj, default)
+
+
+def json_loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse JSON from bytes or str with the active codec."""
+    return _codec.loads(data)
+
+
+def b64encode_json(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize to JSON and base64-encode it for use as a header value."""
+    return base64.b64encode(_codec.dumps(obj, default)).decode("ascii")
+
+
+def b64decode_json(data: Union[str, bytes]) -> Any:
+    """Decode a base64 header value and parse the JSON inside it.
+
+    Raises:
+        ValueError: If the value is not valid base64 or JSON
+    """
+    try:
+        raw = base64.b64decode(data)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64: {e}") from e
+    return _codec.loads(raw)
 
 
 def safe_base64_encode(data: Union[str, bytes]) -> str:
@@ -16,7 +135,7 @@ def safe_base64_encode(data: Union[str, bytes]) -> str:
     return base64.b64encode(data).decode("utf-8")
 
 
-def safe_base64_decode(data: str) -> str:
+def safe_base64_decode(data: Union[str, bytes]) -> str:
     """Safely decode base64 string to bytes and then to utf-8 string.
 
     Args:
@@ -1,16 +1,18 @@
 import time
 import secrets
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Union
 from typing_extensions import (
     TypedDict,
 )  # use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12
 from eth_account import Account
-from x402.encoding import safe_base64_encode, safe_base64_decode
+from eth_account.messages import SignableMessage
+from eth_utils import keccak, to_canonical_address
+from x402.encoding import b64decode_json, b64encode_json
 from x402.types import (
     PaymentRequirements,
 )
 from x402.chains import get_chain_id
-import json
 
 
 def create_nonce() -> bytes:
@@ -51,60 +53,126 @@ class PaymentHeader(TypedDict):
     payload: dict[str, Any]
 
 
+# EIP-3009 TransferWithAuthorization, hashed once at import
+EIP712_DOMAIN_TYPEHASH = keccak(
+    text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+)
+TRANSFER_WITH_AUTHORIZATION_TYPEHASH = keccak(
+    text="TransferWithAuthorization(address from,address to,uint256 value,"
+    "uint256 validAfter,uint256 validBefore,bytes32 nonce)"
+)
+
+
+def _encode_address(address: str) -> bytes:
+    return to_canonical_address(address).rjust(32, b"\x00")
+
+
+def _encode_uint256(value: int) -> bytes:
+    return int(value).to_bytes(32, "big")
+
+
+@lru_cache(maxsize=64)
+def domain_separator(
+    name: str, version: str, chain_id: int, verifying_contract: str
+) -> bytes:
+    """EIP-712 domain separator of a token contract, computed once per asset."""
+    return keccak(
+        EIP712_DOMAIN_TYPEHASH
+        + keccak(text=name)
+        + keccak(text=version)
+        + _encode_uint256(chain_id)
+        + _encode_address(verifying_contract)
+    )
+
+
+def payment_domain_separator(payment_requirements: PaymentRequirements) -> bytes:
+    """Domain separator for the asset named in the payment requirements."""
+    return domain_separator(
+        payment_requirements.extra["name"],
+        payment_requirements.extra["version"],
+        int(get_chain_id(payment_requirements.network)),
+        payment_requirements.asset,
+    )
+
+
+def normalize_nonce(nonce: Union[str, bytes]) -> str:
+    """Canonical form of an authorization nonce: 0x and 64 lowercase hex digits.
+
+    Accepts 32 raw bytes, or hex with or without the 0x prefix.
+    """
+    if isinstance(nonce, (bytes, bytearray)):
+        value = bytes(nonce)
+    else:
+        value = bytes.fromhex(nonce.removeprefix("0x"))
+    if len(value) != 32:
+        raise ValueError(f"Nonce must be 32 bytes, got {len(value)}")
+    return "0x" + value.hex()
+
+
+def authorization_struct_hash(authorization: Dict[str, Any]) -> bytes:
+    """hashStruct of a TransferWithAuthorization message.
+
+    Accepts the authorization dict of a payment header; see `normalize_nonce`
+    for the accepted nonce forms.
+    """
+    nonce = bytes.fromhex(normalize_nonce(authorization["nonce"])[2:])
+    return keccak(
+        TRANSFER_WITH_AUTHORIZATION_TYPEHASH
+        + _encode_address(authorization["from"])
+        + _encode_address(authorization["to"])
+        + _encode_uint256(authorization["value"])
+        + _encode_uint256(authorization["validAfter"])
+        + _encode_uint256(authorization["validBefore"])
+        + nonce
+    )
+
+
+def authorization_signable(
+    payment_requirements: PaymentRequirements, authorization: Dict[str, Any]
+) -> SignableMessage:
+    """EIP-712 signable message for an authorization, reusing the cached domain."""
+    return SignableMessage(
+        version=b"\x01",
+        header=payment_domain_separator(payment_requirements),
+        body=authorization_struct_hash(authorization),
+    )
+
+
+def recover_authorization_signer(
+    payment_requirements: PaymentRequirements,
+    authorization: Dict[str, Any],
+    signature: str,
+) -> str:
+    """Recover the address that signed an authorization, for local verification."""
+    return Account.recover_message(
+        authorization_signable(payment_requirements, authorization),
+        signature=signature,
+    )
+
+
 def sign_payment_header(
     account: Account, payment_requirements: PaymentRequirements, header: PaymentHeader
 ) -> str:
-    """Sign a payment header using the account's private key."""
-    try:
-        auth = header["payload"]["authorization"]
-
-        nonce_bytes = bytes.fromhex(auth["nonce"])
-
-        typed_data = {
-            "types": {
-                "TransferWithAuthorization": [
-                    {"name": "from", "type": "address"},
-                    {"name": "to", "type": "address"},
-                    {"name": "value", "type": "uint256"},
-                    {"name": "validAfter", "type": "uint256"},
-                    {"name": "validBefore", "type": "uint256"},
-                    {"name": "nonce", "type": "bytes32"},
-                ]
-            },
-            "primaryType": "TransferWithAuthorization",
-            "domain": {
-                "name": payment_requirements.extra["name"],
-                "version": payment_requirements.extra["version"],
-                "chainId": int(get_chain_id(payment_requirements.network)),
-                "verifyingContract": payment_requirements.asset,
-            },
-            "message": {
-                "from": auth["from"],
-                "to": auth["to"],
-                "value": int(auth["value"]),
-                "validAfter": int(auth["validAfter"]),
-                "validBefore": int(auth["validBefore"]),
-                "nonce": nonce_bytes,
-            },
-        }
+    """Sign a payment header using the account's private key.
 
-        signed_message = account.sign_typed_data(
-            domain_data=typed_data["domain"],
-            message_types=typed_data["types"],
-            message_data=typed_data["message"],
-        )
-        signature = signed_message.signature.hex()
-        if not signature.startswith("0x"):
-            signature = f"0x{signature}"
+    Only the message fields are hashed per call; the domain separator and
+    struct type hash are computed once per asset.
+    """
+    auth = header["payload"]["authorization"]
+    # Sign and send the same nonce, whatever form it was given in
+    auth["nonce"] = normalize_nonce(auth["nonce"])
 
-        header["payload"]["signature"] = signature
+    signed_message = account.sign_message(
+        authorization_signable(payment_requirements, auth)
+    )
+    signature = signed_message.signature.hex()
+    if not signature.startswith("0x"):
+        signature = f"0x{signature}"
 
-        header["payload"]["authorization"]["nonce"] = f"0x{auth['nonce']}"
+    header["payload"]["signature"] = signature
 
-        encoded = encode_payment(header)
-        return encoded
-    except Exception:
-        raise
+    encoded = encode_payment(header)
+    return encoded
 
 
 def encode_payment(payment_payload: Dict[str, Any]) -> str:
@@ -122,9 +190,9 @@ def encode_payment(payment_payload: Dict[str, Any]) -> str:
             f"Object of type {obj.__class__.__name__} is not JSON serializable"
         )
 
-    return safe_base64_encode(json.dumps(payment_payload, default=default))
+    return b64encode_json(payment_payload, default=default)
 
 
 def decode_payment(encoded_payment: str) -> Dict[str, Any]:
     """Decode a base64 encoded payment string back into a PaymentPayload object."""
-    return json.loads(safe_base64_decode(encoded_payment))
+    return b64decode_json(encoded_payment)
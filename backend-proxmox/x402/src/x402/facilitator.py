@@ -1,10 +1,31 @@
-from typing import Callable, Optional
+import asyncio
+import inspect
+import math
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Literal,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 from typing_extensions import (
     TypedDict,
 )  # use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12
 import httpx
+from x402.discovery import DiscoveryCache, iter_discovery_resources
 from x402.types import (
-    PaymentPayload,
+    AnyPaymentPayload,
+    DiscoveredResource,
     PaymentRequirements,
     VerifyResponse,
     SettleResponse,
@@ -13,89 +34,514 @@ from x402.types import (
 )
 
 
+class ResilienceConfig(TypedDict, total=False):
+    """Failure handling for calls to a facilitator.
+
+    Attributes:
+        timeout: Seconds allowed per attempt. httpx applies it to each phase of
+            the request (connect, write, read), so `deadline` bounds the total.
+            Defaults to 3.
+        deadline: Seconds allowed for a whole call, retries and hedges
+            included. Defaults to 5.
+        max_retries: Extra attempts after a failed call. /settle is only
+            retried when the request never reached the facilitator. Defaults to 1.
+        retry_budget_ratio: Retries and hedges earned per call, so they stay a
+            bounded fraction of traffic. Defaults to 0.2.
+        retry_budget_burst: Retries and hedges available up front and the cap
+            on saved-up budget. Defaults to 10.
+        hedge_verify: Send a duplicate /verify when the first is slower than
+            the hedge delay. Defaults to True.
+        hedge_quantile: Latency quantile used as the hedge delay. Defaults to 0.95.
+        hedge_min_samples: Observed /verify calls needed before hedging. Defaults to 20.
+        hedge_min_delay: Lower bound on the hedge delay in seconds. Defaults to 0.05.
+        failure_threshold: Consecutive failures that open the circuit. Defaults to 5.
+        reset_timeout: Seconds the circuit stays open before a probe call is
+            let through. Defaults to 30.
+    """
+
+    timeout: float
+    deadline: float
+    max_retries: int
+    retry_budget_ratio: float
+    retry_budget_burst: float
+    hedge_verify: bool
+    hedge_quantile: float
+    hedge_min_samples: int
+    hedge_min_delay: float
+    failure_threshold: int
+    reset_timeout: float
+
+
 class FacilitatorConfig(TypedDict, total=False):
     """Configuration for the X402 facilitator service.
 
     Attributes:
         url: The base URL for the facilitator service
         create_headers: Optional function to create authentication headers
+        resilience: Optional timeouts, retries, hedging and circuit breaking
+        urls: Several facilitator base URLs to balance across instead of `url`
+        routing: How a pool picks a member for /verify: "least_outstanding"
+            (default) or "latency"
+        health_check_interval: Seconds between background health checks of
+            pool members; 0 disables them. Defaults to 15.
+        health_check_path: Path probed by health checks, sent with the
+            `create_headers` entry named after it. Defaults to "/supported".
+        discovery_ttl: Seconds a discovery listing is served from cache before
+            it is revalidated; 0 disables caching. Defaults to 60.
+        headers_ttl: Seconds SyncFacilitatorClient reuses the headers of an
+            async `create_headers` before resolving it again. Defaults to 60.
     """
 
     url: str
     create_headers: Callable[[], dict[str, dict[str, str]]]
+    resilience: ResilienceConfig
+    urls: list[str]
+    routing: Literal["least_outstanding", "latency"]
+    health_check_interval: float
+    health_check_path: str
+    discovery_ttl: float
+    headers_ttl: float
+
+
+class FacilitatorUnavailableError(Exception):
+    """Raised when the facilitator cannot be reached or its circuit is open.
+
+    Middlewares answer this with a 503 rather than waiting on a facilitator
+    that is known to be failing.
+    """
+
+    def __init__(
+        self, message: str, endpoint: str, retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class LatencyTracker:
+    """Rolling window of call latencies for one endpoint."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency at quantile q (0-1) of the window, or None if it is empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+        return samples[index]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Closed: calls flow. After `failure_threshold` consecutive failures it opens
+    and rejects calls for `reset_timeout` seconds, then lets a single probe
+    through (half-open). The probe's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and self._clock() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may be made now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if (
+                self._state == self.OPEN
+                and self._clock() - self._opened_at >= self.reset_timeout
+            ):
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN:
+                # A probe that never reported back (e.g. a cancelled request)
+                # must not hold the circuit half-open forever
+                now = self._clock()
+                if (
+                    not self._probe_in_flight
+                    or now - self._probe_started >= self.reset_timeout
+                ):
+                    self._probe_in_flight = True
+                    self._probe_started = now
+                    return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+
+class RetryBudget:
+    """Caps retries and hedges to a fraction of calls.
+
+    Every call deposits `ratio` tokens, up to `burst`; every retry or hedge
+    withdraws one. A failing facilitator therefore sees at most
+    (1 + ratio) times the normal load instead of a retry storm.
+    """
+
+    def __init__(self, ratio: float = 0.2, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._balance = burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._balance = min(self.burst, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+
+class _FacilitatorServerError(Exception):
+    """A 5xx answer, treated like a transport failure."""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"Facilitator returned {response.status_code}")
+        self.response = response
+
+
+class FacilitatorResilience:
+    """Latency tracking, retry budget and circuit breaker for one facilitator."""
+
+    def __init__(self, config: Optional[ResilienceConfig] = None):
+        config = config or {}
+        self.timeout = config.get("timeout", 3.0)
+        self.deadline = config.get("deadline", 5.0)
+        self.max_retries = config.get("max_retries", 1)
+        self.hedge_verify = config.get("hedge_verify", True)
+        self.hedge_quantile = config.get("hedge_quantile", 0.95)
+        self.hedge_min_samples = config.get("hedge_min_samples", 20)
+        self.hedge_min_delay = config.get("hedge_min_delay", 0.05)
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.get("failure_threshold", 5),
+            reset_timeout=config.get("reset_timeout", 30.0),
+        )
+        self.budget = RetryBudget(
+            ratio=config.get("retry_budget_ratio", 0.2),
+            burst=config.get("retry_budget_burst", 10.0),
+        )
+        self.latencies: Dict[str, LatencyTracker] = {}
+
+    def latency(self, endpoint: str) -> LatencyTracker:
+        tracker = self.latencies.get(endpoint)
+        if tracker is None:
+            tracker = self.latencies.setdefault(endpoint, LatencyTracker())
+        return tracker
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Delay after which a duplicate call is sent, or None to not hedge."""
+        if endpoint != "verify" or not self.hedge_verify:
+            return None
+        tracker = self.latency(endpoint)
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        delay = tracker.quantile(self.hedge_quantile)
+        return max(self.hedge_min_delay, delay) if delay is not None else None
+
+    def admit(self, url: str, endpoint: str) -> None:
+        """Fail fast if the circuit is open; otherwise count the call."""
+        if not self.breaker.allow():
+            retry_after = self.breaker.retry_after()
+            raise FacilitatorUnavailableError(
+                f"Facilitator {url} is unavailable (circuit open, retry in "
+                f"{retry_after:.0f}s)",
+                endpoint,
+                retry_after,
+            )
+        self.budget.deposit()
+
+    def should_retry(
+        self, endpoint: str, error: Exception, attempt: int, idempotent: bool
+    ) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        # A non-idempotent call may only be repeated if it never left
+        if not idempotent and not isinstance(
+            error, (httpx.ConnectError, httpx.ConnectTimeout)
+        ):
+            return False
+        return self.breaker.allow() and self.budget.withdraw()
+
+    def deadline_exceeded(self, url: str, endpoint: str) -> FacilitatorUnavailableError:
+        self.breaker.record_failure()
+        return self.unavailable(
+            url, endpoint, TimeoutError(f"no answer within {self.deadline}s")
+        )
+
+    def unavailable(
+        self, url: str, endpoint: str, error: Exception
+    ) -> FacilitatorUnavailableError:
+        return FacilitatorUnavailableError(
+            f"Facilitator {url} /{endpoint} failed: {error}",
+            endpoint,
+            self.breaker.retry_after() or None,
+        )
+
+
+def _validate_config(config: Optional[FacilitatorConfig]) -> dict[str, Any]:
+    """Validate a facilitator config and normalize its URL."""
+    if config is None:
+        config = {"url": "https://x402.org/facilitator"}
+
+    # Validate URL format
+    url = config.get("url", "")
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"Invalid URL {url}, must start with http:// or https://")
+    if url.endswith("/"):
+        url = url[:-1]
+
+    return {
+        "url": url,
+        "create_headers": config.get("create_headers"),
+        "resilience": config.get("resilience"),
+        "discovery_ttl": config.get("discovery_ttl", 60.0),
+        "headers_ttl": config.get("headers_ttl", 60.0),
+    }
+
+
+def _payment_request_body(
+    payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+) -> dict[str, Any]:
+    """Build the JSON body shared by the /verify and /settle endpoints."""
+    return {
+        "x402Version": payment.x402_version,
+        "paymentPayload": payment.model_dump(by_alias=True),
+        "paymentRequirements": payment_requirements.model_dump(
+            by_alias=True, exclude_none=True
+        ),
+    }
 
 
 class FacilitatorClient:
-    def __init__(self, config: Optional[FacilitatorConfig] = None):
-        if config is None:
-            config = {"url": "https://x402.org/facilitator"}
+    """Async facilitator client.
 
-        # Validate URL format
-        url = config.get("url", "")
-        if not url.startswith(("http://", "https://")):
-            raise ValueError(f"Invalid URL {url}, must start with http:// or https://")
-        if url.endswith("/"):
-            url = url[:-1]
+    Calls share a pooled ``httpx.AsyncClient`` per event loop (or the one
+    passed in) and go through a FacilitatorResilience: per-attempt timeouts
+    within an overall deadline, budgeted retries, hedged /verify calls once
+    latency is known, and a circuit breaker that raises
+    FacilitatorUnavailableError while open.
+    """
 
-        self.config = {"url": url, "create_headers": config.get("create_headers")}
+    def __init__(
+        self,
+        config: Optional[FacilitatorConfig] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.config = _validate_config(config)
+        self.resilience = FacilitatorResilience(self.config["resilience"])
+        self.discovery_cache: Optional[DiscoveryCache] = (
+            DiscoveryCache(self.config["discovery_ttl"])
+            if self.config["discovery_ttl"] > 0
+            else None
+        )
+        self._http_client = http_client
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
 
-    async def verify(
-        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
-    ) -> VerifyResponse:
-        """Verify a payment header is valid and a request should be processed"""
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled client for the running event loop."""
+        if self._http_client is not None:
+            return self._http_client
+        # AsyncClient connections are bound to the loop that opened them
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(follow_redirects=True)
+            self._loop_clients[loop] = client
+        return client
+
+    async def _headers(self, endpoint: str) -> dict[str, str]:
         headers = {"Content-Type": "application/json"}
 
         if self.config.get("create_headers"):
             custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("verify", {}))
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.config['url']}/verify",
-                json={
-                    "x402Version": payment.x402_version,
-                    "paymentPayload": payment.model_dump(by_alias=True),
-                    "paymentRequirements": payment_requirements.model_dump(
-                        by_alias=True, exclude_none=True
-                    ),
-                },
-                headers=headers,
-                follow_redirects=True,
+            headers.update(custom_headers.get(endpoint, {}))
+
+        return headers
+
+    async def _attempt(
+        self, endpoint: str, body: dict[str, Any], headers: dict[str, str]
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.http_client.post(
+            f"{self.config['url']}/{endpoint}",
+            json=body,
+            headers=headers,
+            timeout=self.resilience.timeout,
+        )
+        self.resilience.latency(endpoint).record(time.perf_counter() - started)
+        if response.status_code >= 500:
+            raise _FacilitatorServerError(response)
+        return response
+
+    async def _hedged(
+        self, endpoint: str, attempt: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """Run an attempt, racing a duplicate if it outlives the hedge delay."""
+        delay = self.resilience.hedge_delay(endpoint)
+        if delay is None:
+            return await attempt()
+
+        tasks = {asyncio.ensure_future(attempt())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self.resilience.budget.withdraw():
+                tasks.add(asyncio.ensure_future(attempt()))
+
+            error: Optional[BaseException] = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _post(
+        self, endpoint: str, body: dict[str, Any], idempotent: bool
+    ) -> httpx.Response:
+        url = self.config["url"]
+        self.resilience.admit(url, endpoint)
+        try:
+            return await asyncio.wait_for(
+                self._post_with_retries(endpoint, body, idempotent),
+                self.resilience.deadline,
             )
+        except asyncio.TimeoutError:
+            raise self.resilience.deadline_exceeded(url, endpoint) from None
 
-            data = response.json()
-            return VerifyResponse(**data)
+    async def _post_with_retries(
+        self, endpoint: str, body: dict[str, Any], idempotent: bool
+    ) -> httpx.Response:
+        url = self.config["url"]
+        headers = await self._headers(endpoint)
 
-    async def settle(
-        self, payment: PaymentPayload, payment_requirements: PaymentRequirements
-    ) -> SettleResponse:
-        headers = {"Content-Type": "application/json"}
+        attempt = 0
+        while True:
+            try:
+                response = await self._hedged(
+                    endpoint, lambda: self._attempt(endpoint, body, headers)
+                )
+            except (httpx.TransportError, _FacilitatorServerError) as e:
+                self.resilience.breaker.record_failure()
+                if self.resilience.should_retry(endpoint, e, attempt, idempotent):
+                    attempt += 1
+                    continue
+                raise self.resilience.unavailable(url, endpoint, e) from e
+            self.resilience.breaker.record_success()
+            return response
 
-        if self.config.get("create_headers"):
-            custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("settle", {}))
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.config['url']}/settle",
-                json={
-                    "x402Version": payment.x402_version,
-                    "paymentPayload": payment.model_dump(by_alias=True),
-                    "paymentRequirements": payment_requirements.model_dump(
-                        by_alias=True, exclude_none=True
-                    ),
-                },
-                headers=headers,
-                follow_redirects=True,
+    async def check_health(self, path: str) -> bool:
+        """Probe `path` with the client's pooled connections and auth headers."""
+        try:
+            response = await self.http_client.get(
+                f"{self.config['url']}{path}",
+                headers=await self._headers(path.strip("/")),
+                timeout=self.resilience.timeout,
             )
-            data = response.json()
-            return SettleResponse(**data)
+        except httpx.HTTPError:
+            return False
+        return response.status_code < 500
+
+    async def verify(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment header is valid and a request should be processed"""
+        response = await self._post(
+            "verify",
+            _payment_request_body(payment, payment_requirements),
+            idempotent=True,
+        )
+        return VerifyResponse(**response.json())
+
+    async def settle(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        response = await self._post(
+            "settle",
+            _payment_request_body(payment, payment_requirements),
+            idempotent=False,
+        )
+        return SettleResponse(**response.json())
 
     async def list(
         self, request: Optional[ListDiscoveryResourcesRequest] = None
     ) -> ListDiscoveryResourcesResponse:
         """List discovery resources from the facilitator service.
 
+        Listings are cached per query for `discovery_ttl` seconds and then
+        revalidated with the facilitator's ETag or Last-Modified, if it sent one.
+
         Args:
             request: Optional parameters for filtering and pagination
 
@@ -105,31 +551,194 @@ class FacilitatorClient:
         if request is None:
             request = ListDiscoveryResourcesRequest()
 
-        headers = {"Content-Type": "application/json"}
-
-        if self.config.get("create_headers"):
-            custom_headers = await self.config["create_headers"]()
-            headers.update(custom_headers.get("list", {}))
-
         # Build query parameters, excluding None values
         params = {
             k: str(v)
             for k, v in request.model_dump(by_alias=True).items()
             if v is not None
         }
+        url = f"{self.config['url']}/discovery/resources"
+
+        key = DiscoveryCache.key(url, params)
+        conditional: dict[str, str] = {}
+        if self.discovery_cache is not None:
+            cached, conditional = self.discovery_cache.lookup(key)
+            if cached is not None:
+                return cached
+
+        headers = await self._headers("list")
+        headers.update(conditional)
+        response = await self.http_client.get(
+            url, params=params, headers=headers, timeout=self.resilience.timeout
+        )
+
+        if response.status_code == 304 and self.discovery_cache is not None:
+            cached = self.discovery_cache.revalidated(key)
+            if cached is not None:
+                return cached
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.config['url']}/discovery/resources",
-                params=params,
-                headers=headers,
-                follow_redirects=True,
+        if response.status_code != 200:
+            raise ValueError(
+                f"Failed to list discovery resources: {response.status_code} {response.text}"
             )
 
-            if response.status_code != 200:
-                raise ValueError(
-                    f"Failed to list discovery resources: {response.status_code} {response.text}"
+        listing = ListDiscoveryResourcesResponse.model_validate_json(response.content)
+        if self.discovery_cache is not None:
+            self.discovery_cache.put(
+                key,
+                listing,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return listing
+
+    def resources(
+        self, type: Optional[str] = None, page_size: int = 100, prefetch: bool = True
+    ) -> AsyncIterator[DiscoveredResource]:
+        """Iterate over every discovery resource, prefetching the next page.
+
+        Usage:
+            async for resource in facilitator.resources(type="http"):
+                ...
+        """
+        return iter_discovery_resources(self, type, page_size, prefetch)
+
+
+_shared_sync_client: Optional[httpx.Client] = None
+_shared_sync_client_lock = threading.Lock()
+
+
+def _get_shared_sync_client() -> httpx.Client:
+    """Return the process-wide pooled client used by SyncFacilitatorClient."""
+    global _shared_sync_client
+    if _shared_sync_client is None:
+        with _shared_sync_client_lock:
+            if _shared_sync_client is None:
+                _shared_sync_client = httpx.Client(follow_redirects=True)
+    return _shared_sync_client
+
+
+T = TypeVar("T")
+
+
+async def _awaited(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+class SyncFacilitatorClient:
+    """Blocking facilitator client for WSGI servers.
+
+    Requests go through a pooled ``httpx.Client`` (thread-safe and shared by
+    every instance unless one is passed in), so no event loop is created per
+    call and connections to the facilitator are reused across requests.
+    Timeouts, retries and the circuit breaker work as in FacilitatorClient;
+    /verify is not hedged since that would need a thread per call.
+    """
+
+    def __init__(
+        self,
+        config: Optional[FacilitatorConfig] = None,
+        http_client: Optional[httpx.Client] = None,
+    ):
+        self.config = _validate_config(config)
+        self.resilience = FacilitatorResilience(self.config["resilience"])
+        self._http_client = http_client
+        self._async_headers: Optional[Tuple[float, dict[str, dict[str, str]]]] = None
+
+    @property
+    def http_client(self) -> httpx.Client:
+        return self._http_client or _get_shared_sync_client()
+
+    def _headers(self, endpoint: str) -> dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+
+        if self.config.get("create_headers"):
+            headers.update(self._custom_headers().get(endpoint, {}))
+
+        return headers
+
+    def _custom_headers(self) -> dict[str, dict[str, str]]:
+        cached = self._async_headers
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        custom_headers = self.config["create_headers"]()
+        if not inspect.isawaitable(custom_headers):
+            return custom_headers
+        # Configs written for the async client return a coroutine. Resolve it
+        # on a thread of its own, since the caller may be inside an event
+        # loop, and reuse the headers instead of doing so on every call.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            custom_headers = executor.submit(
+                asyncio.run, _awaited(custom_headers)
+            ).result()
+        self._async_headers = (
+            time.monotonic() + self.config["headers_ttl"],
+            custom_headers,
+        )
+        return custom_headers
+
+    def _post(
+        self, endpoint: str, body: dict[str, Any], idempotent: bool
+    ) -> httpx.Response:
+        url = self.config["url"]
+        self.resilience.admit(url, endpoint)
+        headers = self._headers(endpoint)
+        deadline = time.monotonic() + self.resilience.deadline
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.http_client.post(
+                    f"{url}/{endpoint}",
+                    json=body,
+                    headers=headers,
+                    timeout=min(self.resilience.timeout, deadline - time.monotonic()),
                 )
+                self.resilience.latency(endpoint).record(time.perf_counter() - started)
+                if response.status_code >= 500:
+                    raise _FacilitatorServerError(response)
+            except (httpx.TransportError, _FacilitatorServerError) as e:
+                self.resilience.breaker.record_failure()
+                if time.monotonic() < deadline and self.resilience.should_retry(
+                    endpoint, e, attempt, idempotent
+                ):
+                    attempt += 1
+                    continue
+                raise self.resilience.unavailable(url, endpoint, e) from e
+            self.resilience.breaker.record_success()
+            return response
+
+    def check_health(self, path: str) -> bool:
+        """Probe `path` with the client's pooled connections and auth headers."""
+        try:
+            response = self.http_client.get(
+                f"{self.config['url']}{path}",
+                headers=self._headers(path.strip("/")),
+                timeout=self.resilience.timeout,
+            )
+        except httpx.HTTPError:
+            return False
+        return response.status_code < 500
 
-            data = response.json()
-            return ListDiscoveryResourcesResponse(**data)
+    def verify(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment header is valid and a request should be processed"""
+        response = self._post(
+            "verify",
+            _payment_request_body(payment, payment_requirements),
+            idempotent=True,
+        )
+        return VerifyResponse(**response.json())
+
+    def settle(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        response = self._post(
+            "settle",
+            _payment_request_body(payment, payment_requirements),
+            idempotent=False,
+        )
+        return SettleResponse(**response.json())
@@ -0,0 +1,381 @@
+import asyncio
+import concurrent.futures
+import json
+import random
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import httpx
+
+from x402.discovery import iter_discovery_resources
+from x402.facilitator import (
+    CircuitBreaker,
+    FacilitatorClient,
+    FacilitatorConfig,
+    FacilitatorUnavailableError,
+    SyncFacilitatorClient,
+)
+from x402.types import (
+    AnyPaymentPayload,
+    DiscoveredResource,
+    ListDiscoveryResourcesRequest,
+    ListDiscoveryResourcesResponse,
+    PaymentRequirements,
+    SettleResponse,
+    VerifyResponse,
+)
+
+# Verified payments remembered for settle pinning, per pool
+MAX_PINNED_PAYMENTS = 10_000
+# Latency assumed for members without samples, so new members get traffic
+DEFAULT_MEMBER_LATENCY = 0.1
+
+MemberClient = TypeVar("MemberClient", FacilitatorClient, SyncFacilitatorClient)
+
+
+def _member_configs(config: FacilitatorConfig) -> List[FacilitatorConfig]:
+    urls = config.get("urls") or []
+    if not urls:
+        raise ValueError("A facilitator pool needs at least one URL in 'urls'")
+    shared = {
+        key: config[key]
+        for key in ("create_headers", "resilience", "discovery_ttl", "headers_ttl")
+        if key in config
+    }
+    return [{"url": url, **shared} for url in urls]
+
+
+def _payment_key(payment: AnyPaymentPayload) -> Tuple[str, str]:
+    auth = payment.payload.authorization
+    return auth.from_.lower(), auth.nonce.lower()
+
+
+class PoolMember(Generic[MemberClient]):
+    """A facilitator in a pool, with its in-flight count and health."""
+
+    def __init__(self, client: MemberClient):
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+
+    @property
+    def url(self) -> str:
+        return self.client.config["url"]
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.client.resilience.breaker.state != (
+            CircuitBreaker.OPEN
+        )
+
+    def latency(self) -> float:
+        latency = self.client.resilience.latency("verify").quantile(0.5)
+        return DEFAULT_MEMBER_LATENCY if latency is None else latency
+
+
+class _PoolBase(Generic[MemberClient]):
+    """Member selection, settle pinning and health checks shared by both pools."""
+
+    def __init__(self, config: FacilitatorConfig, members: List[MemberClient]):
+        routing = config.get("routing", "least_outstanding")
+        if routing not in ("least_outstanding", "latency"):
+            raise ValueError(
+                f"Unsupported routing {routing!r}, must be 'least_outstanding' or 'latency'"
+            )
+        self.routing = routing
+        self.members: List[PoolMember[MemberClient]] = [PoolMember(m) for m in members]
+        self._pins: "OrderedDict[Tuple[str, str], PoolMember[MemberClient]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+        self.health_check_interval = config.get("health_check_interval", 15.0)
+        self.health_check_path = config.get("health_check_path", "/supported")
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if self.health_check_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="x402-facilitator-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def _score(self, member: PoolMember[MemberClient]) -> float:
+        if self.routing == "latency":
+            return (member.outstanding + 1) * member.latency()
+        return member.outstanding
+
+    def _candidates(
+        self, exclude: List[PoolMember[MemberClient]]
+    ) -> List[PoolMember[MemberClient]]:
+        remaining = [m for m in self.members if m not in exclude]
+        available = [m for m in remaining if m.available]
+        # With nothing known-good left, let circuit breakers decide
+        return available or remaining
+
+    def _acquire(
+        self, exclude: List[PoolMember[MemberClient]]
+    ) -> Optional[PoolMember[MemberClient]]:
+        """Pick the best member and count the call against it."""
+        with self._lock:
+            candidates = self._candidates(exclude)
+            if not candidates:
+                return None
+            best = min(self._score(m) for m in candidates)
+            member = random.choice([m for m in candidates if self._score(m) == best])
+            member.outstanding += 1
+            return member
+
+    def _acquire_pinned(
+        self, payment: AnyPaymentPayload
+    ) -> Optional[PoolMember[MemberClient]]:
+        """The member that verified the payment, unless it is known to be down."""
+        with self._lock:
+            member = self._pins.pop(_payment_key(payment), None)
+            if member is None or not member.available:
+                return None
+            member.outstanding += 1
+            return member
+
+    def _release(self, member: PoolMember[MemberClient]) -> None:
+        with self._lock:
+            member.outstanding -= 1
+
+    def _pin(self, payment: AnyPaymentPayload, member: PoolMember[MemberClient]):
+        with self._lock:
+            self._pins[_payment_key(payment)] = member
+            while len(self._pins) > MAX_PINNED_PAYMENTS:
+                self._pins.popitem(last=False)
+
+    def _unavailable(
+        self, endpoint: str, error: Optional[FacilitatorUnavailableError]
+    ) -> FacilitatorUnavailableError:
+        if error is not None:
+            return error
+        return FacilitatorUnavailableError("No facilitator available", endpoint)
+
+    def _run_health_check(self) -> None:
+        raise NotImplementedError
+
+    def _health_loop(self) -> None:
+        while not self._stop.wait(self.health_check_interval):
+            self._run_health_check()
+
+    def close(self) -> None:
+        """Stop background health checks."""
+        self._stop.set()
+
+
+class FacilitatorPool(_PoolBase[FacilitatorClient]):
+    """Async facilitator client spreading calls over several facilitators.
+
+    /verify goes to the member with the fewest outstanding requests (or the
+    lowest expected latency with routing="latency") and fails over to the
+    next member when one is unavailable. /settle is pinned to the member that
+    verified the payment. Members are health-checked in the background and
+    each keeps its own circuit breaker.
+
+    Usage:
+        pool = FacilitatorPool({"urls": ["https://a.example", "https://b.example"]})
+    """
+
+    def __init__(
+        self,
+        config: FacilitatorConfig,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        super().__init__(
+            config,
+            [FacilitatorClient(c, http_client) for c in _member_configs(config)],
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def check_health(self) -> None:
+        """Probe every member once and update its health."""
+        results = await asyncio.gather(
+            *(m.client.check_health(self.health_check_path) for m in self.members)
+        )
+        for member, healthy in zip(self.members, results):
+            member.healthy = healthy
+
+    def _run_health_check(self) -> None:
+        # Members' connections belong to the loop serving the pool, so probe
+        # on that loop; until the pool is used there is nothing to check.
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.check_health(), loop)
+            future.result(timeout=self.health_check_interval)
+        except (RuntimeError, concurrent.futures.TimeoutError):
+            # The loop stopped or is too busy to probe; try again next time
+            pass
+
+    async def verify(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment header is valid and a request should be processed"""
+        self._loop = asyncio.get_running_loop()
+        tried: List[PoolMember[FacilitatorClient]] = []
+        error: Optional[FacilitatorUnavailableError] = None
+        while (member := self._acquire(tried)) is not None:
+            tried.append(member)
+            try:
+                response = await member.client.verify(payment, payment_requirements)
+            except FacilitatorUnavailableError as e:
+                error = e
+                continue
+            finally:
+                self._release(member)
+            if response.is_valid:
+                self._pin(payment, member)
+            return response
+        raise self._unavailable("verify", error)
+
+    async def settle(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        self._loop = asyncio.get_running_loop()
+        member = self._acquire_pinned(payment) or self._acquire([])
+        if member is None:
+            raise self._unavailable("settle", None)
+        try:
+            return await member.client.settle(payment, payment_requirements)
+        finally:
+            self._release(member)
+
+    async def list(
+        self, request: Optional[ListDiscoveryResourcesRequest] = None
+    ) -> ListDiscoveryResourcesResponse:
+        """List discovery resources from the least loaded facilitator."""
+        self._loop = asyncio.get_running_loop()
+        member = self._acquire([])
+        if member is None:
+            raise self._unavailable("list", None)
+        try:
+            return await member.client.list(request)
+        finally:
+            self._release(member)
+
+    def resources(
+        self, type: Optional[str] = None, page_size: int = 100, prefetch: bool = True
+    ) -> AsyncIterator[DiscoveredResource]:
+        """Iterate over every discovery resource, prefetching the next page."""
+        return iter_discovery_resources(self, type, page_size, prefetch)
+
+
+class SyncFacilitatorPool(_PoolBase[SyncFacilitatorClient]):
+    """Blocking counterpart of FacilitatorPool for WSGI servers."""
+
+    def __init__(
+        self, config: FacilitatorConfig, http_client: Optional[httpx.Client] = None
+    ):
+        super().__init__(
+            config,
+            [SyncFacilitatorClient(c, http_client) for c in _member_configs(config)],
+        )
+
+    def check_health(self) -> None:
+        """Probe every member once and update its health."""
+        for member in self.members:
+            member.healthy = member.client.check_health(self.health_check_path)
+
+    def _run_health_check(self) -> None:
+        self.check_health()
+
+    def verify(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> VerifyResponse:
+        """Verify a payment header is valid and a request should be processed"""
+        tried: List[PoolMember[SyncFacilitatorClient]] = []
+        error: Optional[FacilitatorUnavailableError] = None
+        while (member := self._acquire(tried)) is not None:
+            tried.append(member)
+            try:
+                response = member.client.verify(payment, payment_requirements)
+            except FacilitatorUnavailableError as e:
+                error = e
+                continue
+            finally:
+                self._release(member)
+            if response.is_valid:
+                self._pin(payment, member)
+            return response
+        raise self._unavailable("verify", error)
+
+    def settle(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        member = self._acquire_pinned(payment) or self._acquire([])
+        if member is None:
+            raise self._unavailable("settle", None)
+        try:
+            return member.client.settle(payment, payment_requirements)
+        finally:
+            self._release(member)
+
+
+# Pools built by create_facilitator/create_sync_facilitator, one per config
+_shared_pools: Dict[str, _PoolBase[Any]] = {}
+_shared_pools_lock = threading.Lock()
+
+Pool = TypeVar("Pool", FacilitatorPool, SyncFacilitatorPool)
+
+
+def _shared_pool(pool_class: Type[Pool], config: FacilitatorConfig) -> Pool:
+    """The process-wide pool for a config, built on first use.
+
+    Middlewares never close their facilitator, so each building its own pool
+    would leave a health-check thread behind per middleware. Callables in the
+    config, such as create_headers, are compared by identity; the pool keeps
+    them alive, so their ids are not reused.
+    """
+    key = pool_class.__name__ + json.dumps(
+        config, sort_keys=True, default=lambda value: f"<{id(value)}>"
+    )
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = pool_class(config)
+        return pool
+
+
+def create_facilitator(
+    config: Optional[FacilitatorConfig] = None, **kwargs: Any
+) -> Union[FacilitatorClient, FacilitatorPool]:
+    """Build an async facilitator client, or a pool when `urls` is configured.
+
+    Pools are shared by every caller with the same config, unless an
+    `http_client` is passed, in which case the caller owns the pool and
+    closes it.
+    """
+    if config and config.get("urls"):
+        if kwargs:
+            return FacilitatorPool(config, **kwargs)
+        return _shared_pool(FacilitatorPool, config)
+    return FacilitatorClient(config, **kwargs)
+
+
+def create_sync_facilitator(
+    config: Optional[FacilitatorConfig] = None, **kwargs: Any
+) -> Union[SyncFacilitatorClient, SyncFacilitatorPool]:
+    """Build a blocking facilitator client, or a pool when `urls` is configured.
+
+    Pools are shared like those of `create_facilitator`.
+    """
+    if config and config.get("urls"):
+        if kwargs:
+            return SyncFacilitatorPool(config, **kwargs)
+        return _shared_pool(SyncFacilitatorPool, config)
+    return SyncFacilitatorClient(config, **kwargs)
@@ -1,37 +1,135 @@
 import base64
-import json
-import logging
-from typing import Any, Callable, Optional, get_args, cast
+import inspect
+import math
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union, get_args, cast
 
 from fastapi import Request
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from pydantic import validate_call
+from starlette.background import BackgroundTask
 
 from x402.common import (
+    decode_compact_payment_header,
     process_price_to_atomic_amount,
     x402_VERSION,
     find_matching_payment_requirements,
 )
-from x402.encoding import safe_base64_decode
-from x402.facilitator import FacilitatorClient, FacilitatorConfig
+from x402.encoding import json_dumps
+from x402.facilitator import FacilitatorConfig, FacilitatorUnavailableError
+from x402.facilitator_pool import create_facilitator
 from x402.path import path_is_match
+from x402.payment_log import payment_logger, describe_signature
 from x402.paywall import is_browser_request, get_paywall_html
+from x402.settlement import SettlementBatcher, SettlementConfig
 from x402.types import (
-    PaymentPayload,
+    CompactPaymentPayload,
     PaymentRequirements,
     Price,
-    x402PaymentRequiredResponse,
     PaywallConfig,
     SupportedNetworks,
     HTTPInputSchema,
+    TokenAmount,
 )
 
-logger = logging.getLogger(__name__)
+# Upper bound on distinct (method, resource, price) triples memoized per middleware
+REQUIREMENTS_CACHE_SIZE = 256
+# Upper bound on distinct prices memoized per middleware with a per-request price
+PRICE_CACHE_SIZE = 256
+# Upper bound on distinct serialized 402 bodies shared by all middlewares
+PAYMENT_REQUIRED_CACHE_SIZE = 512
+
+
+def _dump_json(content: Any) -> bytes:
+    """Serialize content as compact UTF-8 JSON, like Starlette's JSONResponse."""
+    return json_dumps(content)
+
+
+@lru_cache(maxsize=PAYMENT_REQUIRED_CACHE_SIZE)
+def _payment_required_body(accepts_json: bytes, error: str) -> bytes:
+    """Serialize a JSON 402 body for the given requirements and error.
+
+    Equivalent to ``x402PaymentRequiredResponse(...).model_dump(by_alias=True)``
+    rendered by JSONResponse, spliced from the pre-serialized requirements.
+    """
+    return b'{"x402Version":%d,"accepts":%s,"error":%s}' % (
+        x402_VERSION,
+        accepts_json,
+        _dump_json(error),
+    )
+
+
+def _price_key(price: Price) -> Union[str, int]:
+    """Hashable form of a price, for the caches keyed by price."""
+    return price.model_dump_json() if isinstance(price, TokenAmount) else price
+
+
+def _price_from_key(price_key: Union[str, int]) -> Price:
+    if isinstance(price_key, str) and price_key.startswith("{"):
+        return TokenAmount.model_validate_json(price_key)
+    return price_key
+
+
+def decode_request_payment(request: Request) -> Optional[CompactPaymentPayload]:
+    """Decode the request's X-PAYMENT header, at most once per request.
+
+    The result is cached on ``request.state`` (as ``payment_payload`` when
+    valid) so the middleware, dependencies and route handlers share one parse.
+
+    Returns:
+        The decoded payment payload, or None if no X-PAYMENT header was sent
+
+    Raises:
+        ValueError: If the header is oversized or malformed
+    """
+    cached = getattr(request.state, "x402_payment", None)
+    if cached is None:
+        payment_header = request.headers.get("X-PAYMENT", "")
+        try:
+            payment = (
+                decode_compact_payment_header(payment_header)
+                if payment_header
+                else None
+            )
+            cached = (payment, None)
+        except ValueError as e:
+            cached = (None, e)
+        request.state.x402_payment = cached
+        request.state.payment_payload = cached[0]
+
+    payment, error = cached
+    if error is not None:
+        raise error
+    return payment
+
+
+class PaymentRequiredResponse(Response):
+    """JSON 402 response served from a cached body."""
+
+    def __init__(self, accepts_json: bytes, error: str):
+        super().__init__(
+            content=_payment_required_body(accepts_json, error),
+            status_code=402,
+            media_type="application/json",
+        )
+
+
+def facilitator_unavailable_response(error: FacilitatorUnavailableError) -> Response:
+    """503 answered when the facilitator is failing or its circuit is open."""
+    headers = {}
+    if error.retry_after:
+        headers["Retry-After"] = str(math.ceil(error.retry_after))
+    return Response(
+        content=json_dumps({"x402Version": x402_VERSION, "error": str(error)}),
+        status_code=503,
+        headers=headers,
+        media_type="application/json",
+    )
 
 
 @validate_call
 def require_payment(
-    price: Price,
+    price: Union[Price, Callable[[Request], Any]],
     pay_to_address: str,
     path: str | list[str] = "*",
     description: str = "",
@@ -45,6 +143,7 @@ def require_payment(
     resource: Optional[str] = None,
     paywall_config: Optional[PaywallConfig] = None,
     custom_paywall_html: Optional[str] = None,
+    settlement_config: Optional[SettlementConfig] = None,
 ):
     """Generate a FastAPI middleware that gates payments for an endpoint.
 
@@ -52,6 +151,9 @@ def require_payment(
         price (Price): Payment price. Can be:
             - Money: USD amount as string/int (e.g., "$3.10", 0.10, "0.001") - defaults to USDC
             - TokenAmount: Custom token amount with asset information
+            - A callable taking the request and returning (or awaiting to) one of the above,
+              for prices that vary per request. The middleware, its facilitator client and
+              settlement batcher are then shared by all prices.
         pay_to_address (str): Ethereum address to receive the payment
         path (str | list[str], optional): Path to gate with payments. Defaults to "*" for all paths.
         description (str, optional): Description of what is being purchased. Defaults to "".
@@ -67,6 +169,10 @@ def require_payment(
         paywall_config (Optional[PaywallConfig], optional): Configuration for paywall UI customization.
             Includes options like cdp_client_key, app_name, app_logo, session_token_endpoint.
         custom_paywall_html (Optional[str], optional): Custom HTML to display for paywall instead of default.
+        settlement_config (Optional[SettlementConfig], optional): Batch settlements. With a journal_path,
+            a response whose payment cannot be settled because the facilitator is unreachable is still
+            served, and the payment is journaled to SQLite and settled afterwards. Defaults to None
+            (each request settles on its own).
 
     Returns:
         Callable: FastAPI middleware function that checks for valid payment before processing requests
@@ -79,14 +185,84 @@ def require_payment(
             f"Unsupported network: {network}. Must be one of: {supported_networks}"
         )
 
-    try:
-        max_amount_required, asset_address, eip712_domain = (
-            process_price_to_atomic_amount(price, network)
+    @lru_cache(maxsize=PRICE_CACHE_SIZE)
+    def requirements_template(price_key: Union[str, int]) -> PaymentRequirements:
+        """Requirements for a price, but for the resource URL and the HTTP method.
+
+        These vary between requests, so the rest of the requirements are
+        validated once per price and copied per request.
+        """
+        price = _price_from_key(price_key)
+        try:
+            max_amount_required, asset_address, eip712_domain = (
+                process_price_to_atomic_amount(price, network)
+            )
+        except Exception as e:
+            raise ValueError(f"Invalid price: {price}. Error: {e}")
+        return PaymentRequirements(
+            scheme="exact",
+            network=cast(SupportedNetworks, network),
+            asset=asset_address,
+            max_amount_required=max_amount_required,
+            resource=resource or "",
+            description=description,
+            mime_type=mime_type,
+            pay_to=pay_to_address,
+            max_timeout_seconds=max_deadline_seconds,
+            extra=eip712_domain,
         )
-    except Exception as e:
-        raise ValueError(f"Invalid price: {price}. Error: {e}")
 
-    facilitator = FacilitatorClient(facilitator_config)
+    dynamic_price = callable(price)
+    static_price_key = None if dynamic_price else _price_key(price)
+    if static_price_key is not None:
+        # Reject an invalid fixed price up front
+        requirements_template(static_price_key)
+
+    facilitator = create_facilitator(facilitator_config)
+    settler = (
+        SettlementBatcher(facilitator, settlement_config)
+        if settlement_config is not None
+        else facilitator
+    )
+    settles_later = (
+        isinstance(settler, SettlementBatcher) and settler.journal is not None
+    )
+
+    input_schema_fields = input_schema.model_dump() if input_schema else {}
+
+    @lru_cache(maxsize=REQUIREMENTS_CACHE_SIZE)
+    def build_payment_requirements(
+        method: str, resource_url: str, price_key: Union[str, int]
+    ) -> tuple[list[PaymentRequirements], bytes]:
+        """Build the payment requirements for a method/resource pair at a price.
+
+        Returns the requirements along with their serialized ``accepts`` JSON.
+        Results are memoized and shared between requests, so treat them as
+        read-only.
+        """
+        payment_requirements = [
+            requirements_template(price_key).model_copy(
+                update={
+                    "resource": resource_url,
+                    # TODO: Rename output_schema to request_structure
+                    "output_schema": {
+                        "input": {
+                            "type": "http",
+                            "method": method,
+                            "discoverable": discoverable
+                            if discoverable is not None
+                            else True,
+                            **input_schema_fields,
+                        },
+                        "output": output_schema,
+                    },
+                }
+            )
+        ]
+        accepts_json = _dump_json(
+            [req.model_dump(by_alias=True) for req in payment_requirements]
+        )
+        return payment_requirements, accepts_json
 
     async def middleware(request: Request, call_next: Callable):
         # Skip if the path is not the same as the path in the middleware
@@ -96,33 +272,17 @@ def require_payment(
         # Get resource URL if not explicitly provided
         resource_url = resource or str(request.url)
 
+        price_key = static_price_key
+        if dynamic_price:
+            request_price = price(request)
+            if inspect.isawaitable(request_price):
+                request_price = await request_price
+            price_key = _price_key(request_price)
+
         # Construct payment details
-        payment_requirements = [
-            PaymentRequirements(
-                scheme="exact",
-                network=cast(SupportedNetworks, network),
-                asset=asset_address,
-                max_amount_required=max_amount_required,
-                resource=resource_url,
-                description=description,
-                mime_type=mime_type,
-                pay_to=pay_to_address,
-                max_timeout_seconds=max_deadline_seconds,
-                # TODO: Rename output_schema to request_structure
-                output_schema={
-                    "input": {
-                        "type": "http",
-                        "method": request.method.upper(),
-                        "discoverable": discoverable
-                        if discoverable is not None
-                        else True,
-                        **(input_schema.model_dump() if input_schema else {}),
-                    },
-                    "output": output_schema,
-                },
-                extra=eip712_domain,
-            )
-        ]
+        payment_requirements, accepts_json = build_payment_requirements(
+            request.method.upper(), resource_url, price_key
+        )
 
         def x402_response(error: str):
             """Create a 402 response with payment requirements."""
@@ -141,104 +301,66 @@ def require_payment(
                     headers=headers,
                 )
             else:
-                response_data = x402PaymentRequiredResponse(
-                    x402_version=x402_VERSION,
-                    accepts=payment_requirements,
-                    error=error,
-                ).model_dump(by_alias=True)
-                headers = {"Content-Type": "application/json"}
-
-                return JSONResponse(
-                    content=response_data,
-                    status_code=status_code,
-                    headers=headers,
-                )
+                return PaymentRequiredResponse(accepts_json, error)
 
-        # Check for payment header
-        payment_header = request.headers.get("X-PAYMENT", "")
-
-        if payment_header == "":
-            return x402_response("No X-PAYMENT header provided")
+        event = payment_logger.start(
+            method=request.method, path=request.url.path, network=network
+        )
 
         # Decode payment header
         try:
-            logger.info(f"📨 Raw X-PAYMENT header (first 100 chars): {payment_header[:100]}...")
-            logger.info(f"📨 X-PAYMENT header length: {len(payment_header)}")
-            
-            payment_dict = json.loads(safe_base64_decode(payment_header))
-            logger.info(f"🔓 Decoded payment header: {json.dumps(payment_dict, indent=2)}")
-            
-            payment = PaymentPayload(**payment_dict)
-            
-            # Detailed signature analysis
-            sig = payment.payload.signature  # Pydantic model attribute
-            logger.info(f"🔍 Signature Analysis:")
-            logger.info(f"  - Raw signature: {sig}")
-            logger.info(f"  - Signature length: {len(sig)} chars (expected: 132 for EOA, >132 for Smart Wallet)")
-            logger.info(f"  - Signature type: {'EOA (65 bytes)' if len(sig) == 132 else 'Possibly Smart Wallet (ABI-encoded)' if len(sig) > 132 else 'INVALID - Too short'}")
-            
-            # Analyze signature structure
-            if len(sig) > 2:
-                sig_data = sig[2:]  # Remove 0x
-                logger.info(f"  - First 64 chars (r or offset): {sig_data[:64]}")
-                logger.info(f"  - Second 64 chars (s or length): {sig_data[64:128] if len(sig_data) > 64 else 'N/A'}")
-                logger.info(f"  - Remaining data: {sig_data[128:] if len(sig_data) > 128 else 'N/A'}")
-            
-            # Log authorization details
-            auth = payment.payload.authorization  # Pydantic model attribute
-            logger.info(f"💳 Authorization Details:")
-            logger.info(f"  - From: {auth.from_}")
-            logger.info(f"  - To: {auth.to}")
-            logger.info(f"  - Value: {auth.value}")
-            logger.info(f"  - ValidAfter: {auth.valid_after}")
-            logger.info(f"  - ValidBefore: {auth.valid_before}")
-            logger.info(f"  - Nonce: {auth.nonce}")
-            
-        except Exception as e:
-            logger.warning(
-                f"Invalid payment header format from {request.client.host if request.client else 'unknown'}: {str(e)}"
+            payment = decode_request_payment(request)
+        except ValueError as e:
+            payment_logger.emit(
+                event,
+                "invalid_header",
+                error=f"{type(e).__name__}: {e}",
+                client=request.client.host if request.client else None,
             )
-            logger.error(f"❌ Decoding error details: {type(e).__name__}: {str(e)}")
             return x402_response("Invalid payment header format")
 
+        if payment is None:
+            payment_logger.emit(event, "payment_required")
+            return x402_response("No X-PAYMENT header provided")
+
+        auth = payment.payload.authorization
+        event.update(payer=auth.from_, value=auth.value, scheme=payment.scheme)
+
         # Find matching payment requirements
         selected_payment_requirements = find_matching_payment_requirements(
             payment_requirements, payment
         )
+        payment_logger.debug_payment(payment, selected_payment_requirements)
 
         if not selected_payment_requirements:
-            logger.error("❌ No matching payment requirements found")
-            logger.error(f"  - Payment scheme: {payment.scheme}")
-            logger.error(f"  - Payment network: {payment.network}")
-            logger.error(f"  - Available requirements: {[req.scheme + '/' + req.network for req in payment_requirements]}")
+            payment_logger.emit(
+                event,
+                "no_matching_requirements",
+                error="No matching payment requirements found",
+                payment_network=payment.network,
+                available=[
+                    req.scheme + "/" + req.network for req in payment_requirements
+                ],
+            )
             return x402_response("No matching payment requirements found")
-        
-        logger.info(f"✅ Matched payment requirements: scheme={selected_payment_requirements.scheme}, network={selected_payment_requirements.network}")
-        logger.info(f"🔐 EIP-712 Domain (from backend):")
-        logger.info(f"  - name: {selected_payment_requirements.extra.get('name')}")
-        logger.info(f"  - version: {selected_payment_requirements.extra.get('version')}")
-        logger.info(f"  - chainId: {network}")
-        logger.info(f"  - verifyingContract: {selected_payment_requirements.asset}")
 
         # Verify payment
-        logger.info(f"📤 Sending verification request to facilitator...")
-        verify_response = await facilitator.verify(
-            payment, selected_payment_requirements
-        )
-        
-        logger.info(f"📥 Facilitator verification response:")
-        logger.info(f"  - isValid: {verify_response.is_valid}")
-        logger.info(f"  - invalidReason: {verify_response.invalid_reason}")
-        logger.info(f"  - payer: {verify_response.payer}")
+        try:
+            verify_response = await facilitator.verify(
+                payment, selected_payment_requirements
+            )
+        except FacilitatorUnavailableError as e:
+            payment_logger.emit(event, "facilitator_unavailable", error=str(e))
+            return facilitator_unavailable_response(e)
 
         if not verify_response.is_valid:
             error_reason = verify_response.invalid_reason or "Unknown error"
-            logger.error(f"❌ Payment verification FAILED: {error_reason}")
-            logger.error(f"📋 Debugging checklist:")
-            logger.error(f"  1. Check signature length (should be 132 for EOA, or properly encoded for Smart Wallet)")
-            logger.error(f"  2. Verify EIP-712 domain matches between frontend and backend")
-            logger.error(f"  3. Check if Smart Wallet signature needs special handling")
-            logger.error(f"  4. Validate nonce, validAfter, validBefore timestamps")
+            payment_logger.emit(
+                event,
+                "invalid",
+                error=error_reason,
+                signature=describe_signature(payment.payload.signature),
+            )
             return x402_response(f"Invalid payment: {error_reason}")
 
         request.state.payment_details = selected_payment_requirements
@@ -249,11 +371,12 @@ def require_payment(
 
         # Early return without settling if the response is not a 2xx
         if response.status_code < 200 or response.status_code >= 300:
+            payment_logger.emit(event, "not_settled", status_code=response.status_code)
             return response
 
         # Settle the payment
         try:
-            settle_response = await facilitator.settle(
+            settle_response = await settler.settle(
                 payment, selected_payment_requirements
             )
             if settle_response.success:
@@ -261,13 +384,26 @@ def require_payment(
                     settle_response.model_dump_json(by_alias=True).encode("utf-8")
                 ).decode("utf-8")
             else:
-                return x402_response(
-                    "Settle failed: "
-                    + (settle_response.error_reason or "Unknown error")
+                error_reason = settle_response.error_reason or "Unknown error"
+                payment_logger.emit(event, "settle_failed", error=error_reason)
+                return x402_response("Settle failed: " + error_reason)
+        except FacilitatorUnavailableError as e:
+            if settles_later:
+                # Serve the verified payment and settle it once the response is sent
+                payment_logger.emit(event, "settle_deferred", error=str(e))
+                response.background = BackgroundTask(
+                    settler.settle_later, payment, selected_payment_requirements
                 )
-        except Exception:
+                return response
+            payment_logger.emit(event, "facilitator_unavailable", error=str(e))
+            return facilitator_unavailable_response(e)
+        except Exception as e:
+            payment_logger.emit(
+                event, "settle_failed", error=f"{type(e).__name__}: {e}"
+            )
             return x402_response("Settle failed")
 
+        payment_logger.emit(event, "settled", transaction=settle_response.transaction)
         return response
 
     return middleware
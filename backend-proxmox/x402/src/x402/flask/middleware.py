@@ -1,11 +1,12 @@
 import base64
-import json
+import math
+from functools import lru_cache
 from typing import Any, Dict, Optional, Union, get_args, cast
 from flask import Flask, request, g
-from x402.path import path_is_match
+from x402.encoding import json_dumps
+from x402.path import RouteIndex
 from x402.types import (
     Price,
-    PaymentPayload,
     PaymentRequirements,
     x402PaymentRequiredResponse,
     PaywallConfig,
@@ -13,12 +14,14 @@ from x402.types import (
     HTTPInputSchema,
 )
 from x402.common import (
+    decode_compact_payment_header,
     process_price_to_atomic_amount,
     x402_VERSION,
     find_matching_payment_requirements,
 )
-from x402.encoding import safe_base64_decode
-from x402.facilitator import FacilitatorClient, FacilitatorConfig
+from x402.facilitator import FacilitatorConfig, FacilitatorUnavailableError
+from x402.facilitator_pool import create_sync_facilitator
+from x402.payment_log import payment_logger, describe_signature
 from x402.paywall import is_browser_request, get_paywall_html
 
 
@@ -46,6 +49,10 @@ class PaymentMiddleware:
     Flask middleware for x402 payment requirements.
     Allows multiple registrations with different path patterns and configurations.
 
+    All registrations share a single WSGI layer: request paths are resolved
+    through a compiled route index to the first matching registration, and only
+    matched requests open a request context.
+
     Usage:
         middleware = PaymentMiddleware(app)
         middleware.add(path="/weather", price="$0.001", pay_to_address="0x...")
@@ -55,6 +62,8 @@ class PaymentMiddleware:
     def __init__(self, app: Flask):
         self.app = app
         self.middleware_configs = []
+        self._routes: RouteIndex[Dict[str, Any]] = RouteIndex()
+        self._next_app = None
 
     def add(
         self,
@@ -108,24 +117,17 @@ class PaymentMiddleware:
             "paywall_config": paywall_config,
             "custom_paywall_html": custom_paywall_html,
         }
+        route = self._compile_route(config)
         self.middleware_configs.append(config)
+        self._routes.add(path, route)
 
-        # Apply the middleware to the app
-        self._apply_middleware()
-
-    def _apply_middleware(self):
-        """Apply all middleware configurations to the Flask app."""
-        # Create the middleware chain
-        current_wsgi_app = self.app.wsgi_app
-
-        for config in self.middleware_configs:
-            middleware = self._create_middleware(config, current_wsgi_app)
-            current_wsgi_app = middleware
-
-        self.app.wsgi_app = current_wsgi_app
+        # Install the dispatching WSGI layer once, on first registration
+        if self._next_app is None:
+            self._next_app = self.app.wsgi_app
+            self.app.wsgi_app = self._wsgi_app
 
-    def _create_middleware(self, config: Dict[str, Any], next_app):
-        """Create a WSGI middleware function for the given configuration."""
+    def _compile_route(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a configuration and precompute its per-request state."""
 
         # Validate network is supported
         supported_networks = get_args(SupportedNetworks)
@@ -142,165 +144,230 @@ class PaymentMiddleware:
         except Exception as e:
             raise ValueError(f"Invalid price: {config['price']}. Error: {e}")
 
-        facilitator = FacilitatorClient(config["facilitator_config"])
-
-        def middleware(environ, start_response):
-            # Create Flask request context
-            with self.app.request_context(environ):
-                # Skip if the path is not the same as the path in the middleware
-                if not path_is_match(config["path"], request.path):
-                    return next_app(environ, start_response)
-
-                # Get resource URL if not explicitly provided
-                original_uri = request.headers.get("X-Original-URI")
-                if original_uri:
-                    # Reconstruct the full URL using the original URI from the proxy
-                    resource_url = f"{request.scheme}://{request.host}{original_uri}"
-                else:
-                    # Fallback to request.url if the header is not present
-                    resource_url = config["resource"] or request.url
-
-                # Construct payment details
-                payment_requirements = [
-                    PaymentRequirements(
-                        scheme="exact",
-                        network=cast(SupportedNetworks, config["network"]),
-                        asset=asset_address,
-                        max_amount_required=max_amount_required,
-                        resource=resource_url,
-                        description=config["description"],
-                        mime_type=config["mime_type"],
-                        pay_to=config["pay_to_address"],
-                        max_timeout_seconds=config["max_deadline_seconds"],
+        # Only the resource URL and the HTTP method vary between requests
+        requirements_template = PaymentRequirements(
+            scheme="exact",
+            network=cast(SupportedNetworks, config["network"]),
+            asset=asset_address,
+            max_amount_required=max_amount_required,
+            resource=config["resource"] or "",
+            description=config["description"],
+            mime_type=config["mime_type"],
+            pay_to=config["pay_to_address"],
+            max_timeout_seconds=config["max_deadline_seconds"],
+            extra=eip712_domain,
+        )
+        input_schema_fields = (
+            config["input_schema"].model_dump() if config["input_schema"] else {}
+        )
+
+        @lru_cache(maxsize=256)
+        def build_payment_requirements(
+            method: str, resource_url: str
+        ) -> list[PaymentRequirements]:
+            """Build (and memoize) the payment requirements for a method/resource pair."""
+            return [
+                requirements_template.model_copy(
+                    update={
+                        "resource": resource_url,
                         # TODO: Rename output_schema to request_structure
-                        output_schema={
+                        "output_schema": {
                             "input": {
                                 "type": "http",
-                                "method": request.method.upper(),
+                                "method": method,
                                 "discoverable": config.get("discoverable", True),
-                                **(
-                                    config["input_schema"].model_dump()
-                                    if config["input_schema"]
-                                    else {}
-                                ),
+                                **input_schema_fields,
                             },
                             "output": config["output_schema"],
                         },
-                        extra=eip712_domain,
-                    )
-                ]
+                    }
+                )
+            ]
+
+        return {
+            **config,
+            "build_payment_requirements": build_payment_requirements,
+            "facilitator": create_sync_facilitator(config["facilitator_config"]),
+        }
 
-                def x402_response(error: str):
-                    """Create a 402 response with payment requirements."""
-                    request_headers = dict(request.headers)
-                    status = "402 Payment Required"
-
-                    if is_browser_request(request_headers):
-                        html_content = config[
-                            "custom_paywall_html"
-                        ] or get_paywall_html(
-                            error, payment_requirements, config["paywall_config"]
-                        )
-                        headers = [("Content-Type", "text/html; charset=utf-8")]
-
-                        start_response(status, headers)
-                        return [html_content.encode("utf-8")]
-                    else:
-                        response_data = x402PaymentRequiredResponse(
-                            x402_version=x402_VERSION,
-                            accepts=payment_requirements,
-                            error=error,
-                        ).model_dump(by_alias=True)
-
-                        headers = [
-                            ("Content-Type", "application/json"),
-                            ("Content-Length", str(len(json.dumps(response_data)))),
-                        ]
-
-                        start_response(status, headers)
-                        return [json.dumps(response_data).encode("utf-8")]
-
-                # Check for payment header
-                payment_header = request.headers.get("X-PAYMENT", "")
-
-                if payment_header == "":
-                    return x402_response("No X-PAYMENT header provided")
-
-                # Decode payment header
-                try:
-                    payment_dict = json.loads(safe_base64_decode(payment_header))
-                    payment = PaymentPayload(**payment_dict)
-                except Exception as e:
-                    return x402_response(f"Invalid payment header format: {str(e)}")
-
-                # Find matching payment requirements
-                selected_payment_requirements = find_matching_payment_requirements(
-                    payment_requirements, payment
+    def _wsgi_app(self, environ, start_response):
+        """Dispatch a request to the first matching registration, if any."""
+        # Same decoding Werkzeug applies for request.path, without building a request
+        request_path = "/" + (environ.get("PATH_INFO") or "").encode("latin1").decode(
+            errors="replace"
+        ).lstrip("/")
+        route = self._routes.match(request_path)
+        if route is None:
+            return self._next_app(environ, start_response)
+
+        # Create Flask request context
+        with self.app.request_context(environ):
+            return self._handle_payment(route, environ, start_response)
+
+    def _handle_payment(self, config: Dict[str, Any], environ, start_response):
+        """Require, verify and settle a payment for a matched request."""
+        facilitator = config["facilitator"]
+        next_app = self._next_app
+
+        # Get resource URL if not explicitly provided
+        original_uri = request.headers.get("X-Original-URI")
+        if original_uri:
+            # Reconstruct the full URL using the original URI from the proxy
+            resource_url = f"{request.scheme}://{request.host}{original_uri}"
+        else:
+            # Fallback to request.url if the header is not present
+            resource_url = config["resource"] or request.url
+
+        # Construct payment details
+        payment_requirements = config["build_payment_requirements"](
+            request.method.upper(), resource_url
+        )
+
+        def x402_response(error: str):
+            """Create a 402 response with payment requirements."""
+            request_headers = dict(request.headers)
+            status = "402 Payment Required"
+
+            if is_browser_request(request_headers):
+                html_content = config["custom_paywall_html"] or get_paywall_html(
+                    error, payment_requirements, config["paywall_config"]
                 )
+                headers = [("Content-Type", "text/html; charset=utf-8")]
+
+                start_response(status, headers)
+                return [html_content.encode("utf-8")]
+            else:
+                response_data = x402PaymentRequiredResponse(
+                    x402_version=x402_VERSION,
+                    accepts=payment_requirements,
+                    error=error,
+                ).model_dump(by_alias=True)
+
+                body = json_dumps(response_data)
+                headers = [
+                    ("Content-Type", "application/json"),
+                    ("Content-Length", str(len(body))),
+                ]
+
+                start_response(status, headers)
+                return [body]
+
+        event = payment_logger.start(
+            method=request.method, path=request.path, network=config["network"]
+        )
+
+        # Check for payment header
+        payment_header = request.headers.get("X-PAYMENT", "")
+
+        if payment_header == "":
+            payment_logger.emit(event, "payment_required")
+            return x402_response("No X-PAYMENT header provided")
+
+        # Decode payment header
+        try:
+            payment = decode_compact_payment_header(payment_header)
+        except Exception as e:
+            payment_logger.emit(
+                event,
+                "invalid_header",
+                error=f"{type(e).__name__}: {e}",
+                client=request.remote_addr,
+            )
+            return x402_response(f"Invalid payment header format: {str(e)}")
+
+        auth = payment.payload.authorization
+        event.update(payer=auth.from_, value=auth.value, scheme=payment.scheme)
+
+        # Find matching payment requirements
+        selected_payment_requirements = find_matching_payment_requirements(
+            payment_requirements, payment
+        )
+        payment_logger.debug_payment(payment, selected_payment_requirements)
+
+        if not selected_payment_requirements:
+            payment_logger.emit(
+                event,
+                "no_matching_requirements",
+                error="No matching payment requirements found",
+                payment_network=payment.network,
+                available=[
+                    req.scheme + "/" + req.network for req in payment_requirements
+                ],
+            )
+            return x402_response("No matching payment requirements found")
+
+        # Verify payment
+        try:
+            verify_response = facilitator.verify(payment, selected_payment_requirements)
+        except FacilitatorUnavailableError as e:
+            payment_logger.emit(event, "facilitator_unavailable", error=str(e))
+            body = json_dumps({"x402Version": x402_VERSION, "error": str(e)})
+            headers = [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(body))),
+            ]
+            if e.retry_after:
+                headers.append(("Retry-After", str(math.ceil(e.retry_after))))
+            start_response("503 Service Unavailable", headers)
+            return [body]
+
+        if not verify_response.is_valid:
+            error_reason = verify_response.invalid_reason or "Unknown error"
+            payment_logger.emit(
+                event,
+                "invalid",
+                error=error_reason,
+                signature=describe_signature(payment.payload.signature),
+            )
+            return x402_response(f"Invalid payment: {error_reason}")
+
+        # Store payment details in Flask g object
+        g.payment_details = selected_payment_requirements
+        g.verify_response = verify_response
+
+        # Create response wrapper to capture status and headers
+        response_wrapper = ResponseWrapper(start_response)
+
+        # Process the request
+        response = next_app(environ, response_wrapper)
+
+        # Check if response is successful (2xx status code)
+        if (
+            response_wrapper.status_code is None
+            or response_wrapper.status_code < 200
+            or response_wrapper.status_code >= 300
+        ):
+            payment_logger.emit(
+                event, "not_settled", status_code=response_wrapper.status_code
+            )
+            return response
+
+        # Settle the payment for successful responses
+        try:
+            settle_response = facilitator.settle(payment, selected_payment_requirements)
+        except Exception as e:
+            # Log the error but don't try to return a new response
+            payment_logger.emit(
+                event, "settle_failed", error=f"{type(e).__name__}: {e}"
+            )
+            return response
+
+        if settle_response.success:
+            # Add settlement response header
+            settlement_header = base64.b64encode(
+                settle_response.model_dump_json(by_alias=True).encode("utf-8")
+            ).decode("utf-8")
+            response_wrapper.add_header("X-PAYMENT-RESPONSE", settlement_header)
+            payment_logger.emit(
+                event, "settled", transaction=settle_response.transaction
+            )
+        else:
+            # If settlement fails, we can't return a new response since headers are already sent
+            # Just log the error and continue with the original response
+            payment_logger.emit(
+                event,
+                "settle_failed",
+                error=settle_response.error_reason or "Unknown error",
+            )
 
-                if not selected_payment_requirements:
-                    return x402_response("No matching payment requirements found")
-
-                # Verify payment (async call in sync context)
-                import asyncio
-
-                try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    verify_response = loop.run_until_complete(
-                        facilitator.verify(payment, selected_payment_requirements)
-                    )
-                finally:
-                    loop.close()
-
-                if not verify_response.is_valid:
-                    error_reason = verify_response.invalid_reason or "Unknown error"
-                    return x402_response(f"Invalid payment: {error_reason}")
-
-                # Store payment details in Flask g object
-                g.payment_details = selected_payment_requirements
-                g.verify_response = verify_response
-
-                # Create response wrapper to capture status and headers
-                response_wrapper = ResponseWrapper(start_response)
-
-                # Process the request
-                response = next_app(environ, response_wrapper)
-
-                # Check if response is successful (2xx status code)
-                if (
-                    response_wrapper.status_code is not None
-                    and response_wrapper.status_code >= 200
-                    and response_wrapper.status_code < 300
-                ):
-                    # Settle the payment for successful responses
-                    try:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        settle_response = loop.run_until_complete(
-                            facilitator.settle(payment, selected_payment_requirements)
-                        )
-
-                        if settle_response.success:
-                            # Add settlement response header
-                            settlement_header = base64.b64encode(
-                                settle_response.model_dump_json(by_alias=True).encode(
-                                    "utf-8"
-                                )
-                            ).decode("utf-8")
-                            response_wrapper.add_header(
-                                "X-PAYMENT-RESPONSE", settlement_header
-                            )
-                        else:
-                            # If settlement fails, we can't return a new response since headers are already sent
-                            # Just log the error and continue with the original response
-                            print(f"Settle failed: {settle_response.error_reason}")
-                    except Exception as e:
-                        # Log the error but don't try to return a new response
-                        print(f"Settle failed: {str(e)}")
-                    finally:
-                        loop.close()
-
-                return response
-
-        return middleware
+        return response
@@ -1,6 +1,9 @@
 import fnmatch
 import re
-from typing import Union
+from functools import lru_cache
+from typing import Callable, Generic, Optional, TypeVar, Union
+
+T = TypeVar("T")
 
 
 def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
@@ -41,3 +44,77 @@ def path_is_match(path: Union[str, list[str]], request_path: str) -> bool:
         return any(single_path_match(p) for p in path)
 
     return False
+
+
+def compile_path_pattern(pattern: str) -> Callable[[str], bool]:
+    """
+    Compile a single path pattern into a matcher with the same semantics as
+    `path_is_match`, so the pattern is parsed once instead of per request.
+
+    Args:
+        pattern: Exact path, glob pattern or 'regex:' prefixed pattern.
+
+    Returns:
+        Callable[[str], bool]: Returns True if a request path matches the pattern.
+    """
+    if pattern.startswith("regex:"):
+        regex = re.compile(pattern[6:])
+        return lambda request_path: regex.match(request_path) is not None
+
+    if "*" in pattern or "?" in pattern:
+        glob = re.compile(fnmatch.translate(pattern))
+        return lambda request_path: glob.match(request_path) is not None
+
+    return lambda request_path: pattern == request_path
+
+
+class RouteIndex(Generic[T]):
+    """
+    Compiled index of path patterns that resolves a request path to the value
+    of the first registration matching it.
+
+    Exact paths are looked up in a dict, glob and regex patterns are compiled
+    once, and resolved paths are memoized, so repeated lookups cost the same
+    regardless of how many routes are registered.
+
+    Usage:
+        index = RouteIndex()
+        index.add(["/weather", "/premium/*"], config)
+        index.match("/premium/report")  # -> config
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self._values: list[T] = []
+        self._exact: dict[str, int] = {}
+        self._patterns: list[tuple[int, Callable[[str], bool]]] = []
+        self._lookup = lru_cache(maxsize=cache_size)(self._lookup_uncached)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, path: Union[str, list[str]], value: T) -> None:
+        """Register a value for path pattern(s); earlier registrations win."""
+        position = len(self._values)
+        self._values.append(value)
+
+        for pattern in [path] if isinstance(path, str) else path:
+            if pattern.startswith("regex:") or "*" in pattern or "?" in pattern:
+                self._patterns.append((position, compile_path_pattern(pattern)))
+            else:
+                self._exact.setdefault(pattern, position)
+
+        self._lookup.cache_clear()
+
+    def match(self, request_path: str) -> Optional[T]:
+        """Return the value of the first registration matching the path, if any."""
+        position = self._lookup(request_path)
+        return None if position is None else self._values[position]
+
+    def _lookup_uncached(self, request_path: str) -> Optional[int]:
+        best = self._exact.get(request_path)
+        for position, matcher in self._patterns:
+            if best is not None and position > best:
+                break
+            if matcher(request_path):
+                return position
+        return best
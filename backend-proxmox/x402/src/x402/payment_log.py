@@ -0,0 +1,147 @@
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+from x402.types import AnyPaymentPayload, PaymentRequirements
+
+
+class _LazyJSON:
+    """Defers JSON formatting of a record until a handler actually emits it."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return json.dumps(self.fields, default=str)
+
+
+def describe_signature(signature: str) -> Dict[str, Any]:
+    """Summarize the shape of a payment signature for diagnostics."""
+    length = len(signature)
+    if length == 132:
+        kind = "eoa"
+    elif length > 132:
+        kind = "smart-wallet"
+    else:
+        kind = "invalid"
+    return {"length": length, "kind": kind}
+
+
+class PaymentEvent:
+    """Fields collected for a single paid request, emitted as one record."""
+
+    __slots__ = ("fields", "started_at")
+
+    def __init__(self, **fields: Any):
+        self.fields: Dict[str, Any] = fields
+        self.started_at = time.perf_counter()
+
+    def update(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+
+class PaymentEventLogger:
+    """Structured, level-gated logger for x402 payment events.
+
+    Every paid request produces at most one record. Successful outcomes are
+    logged at INFO and subject to sampling; failures are logged at WARNING and
+    never sampled. Diagnostic dumps of the decoded payment are only built when
+    debug mode is on and the logger is enabled for DEBUG, so production pays
+    nothing for them. Both settings can be changed at runtime.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_rate: float = 1.0,
+        debug: bool = False,
+    ):
+        self.logger = logger
+        self.set_sample_rate(sample_rate)
+        self.debug = debug
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        """Set the fraction (0.0 - 1.0) of successful events that are logged."""
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        self.sample_rate = sample_rate
+
+    def set_debug(self, enabled: bool) -> None:
+        """Toggle diagnostic payment dumps."""
+        self.debug = enabled
+
+    @property
+    def debug_enabled(self) -> bool:
+        return self.debug and self.logger.isEnabledFor(logging.DEBUG)
+
+    def start(self, **fields: Any) -> PaymentEvent:
+        """Begin collecting fields for a paid request."""
+        return PaymentEvent(**fields)
+
+    def debug_payment(
+        self,
+        payment: AnyPaymentPayload,
+        payment_requirements: Optional[PaymentRequirements] = None,
+    ) -> None:
+        """Dump the decoded payment and EIP-712 domain when debug mode is on."""
+        if not self.debug_enabled:
+            return
+
+        details: Dict[str, Any] = {
+            "payment": payment.model_dump(by_alias=True),
+            "signature": describe_signature(payment.payload.signature),
+        }
+        if payment_requirements is not None:
+            details["domain"] = {
+                "name": (payment_requirements.extra or {}).get("name"),
+                "version": (payment_requirements.extra or {}).get("version"),
+                "network": payment_requirements.network,
+                "verifyingContract": payment_requirements.asset,
+            }
+        self.logger.debug("x402 payment debug %s", _LazyJSON(details))
+
+    def emit(self, event: PaymentEvent, outcome: str, **fields: Any) -> None:
+        """Emit the single record for a request.
+
+        Args:
+            event: Event started with `start`
+            outcome: Short outcome label, e.g. "settled" or "invalid"
+            **fields: Extra fields to attach; an "error" field marks a failure
+        """
+        failed = "error" in fields
+        level = logging.WARNING if failed else logging.INFO
+        if not self.logger.isEnabledFor(level):
+            return
+        if (
+            not failed
+            and self.sample_rate < 1.0
+            and random.random() >= self.sample_rate
+        ):
+            return
+
+        record = event.fields
+        record.update(fields)
+        record["outcome"] = outcome
+        record["duration_ms"] = round(
+            (time.perf_counter() - event.started_at) * 1000, 2
+        )
+        self.logger.log(
+            level, "x402 payment %s", _LazyJSON(record), extra={"x402_payment": record}
+        )
+
+
+payment_logger = PaymentEventLogger(logging.getLogger("x402.payments"))
+
+
+def set_payment_debug(enabled: bool) -> None:
+    """Toggle diagnostic payment dumps on the default payment logger."""
+    payment_logger.set_debug(enabled)
+
+
+def set_payment_log_sample_rate(sample_rate: float) -> None:
+    """Set the sampling rate of successful events on the default payment logger."""
+    payment_logger.set_sample_rate(sample_rate)
@@ -0,0 +1,375 @@
+import base64
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union, get_args, cast
+
+try:
+    from quart import Quart, Response, g, request
+except ImportError as e:
+    raise ImportError(
+        "The x402 Quart middleware requires quart. Install it with `pip install x402[quart]`."
+    ) from e
+
+from x402.encoding import json_dumps
+from x402.path import RouteIndex
+from x402.types import (
+    Price,
+    PaymentRequirements,
+    x402PaymentRequiredResponse,
+    PaywallConfig,
+    SupportedNetworks,
+    HTTPInputSchema,
+)
+from x402.common import (
+    decode_compact_payment_header,
+    process_price_to_atomic_amount,
+    x402_VERSION,
+    find_matching_payment_requirements,
+)
+from x402.facilitator import FacilitatorConfig, FacilitatorUnavailableError
+from x402.facilitator_pool import create_facilitator
+from x402.payment_log import payment_logger, describe_signature
+from x402.paywall import is_browser_request, get_paywall_html
+from x402.settlement import SettlementBatcher, SettlementConfig
+
+
+class _SettleAfterSend:
+    """Response body that starts a deferred settlement once it has been sent."""
+
+    def __init__(
+        self, body: Any, settler: SettlementBatcher, payment: Any, requirements: Any
+    ):
+        self._body = body
+        self._settle = (settler, payment, requirements)
+
+    async def __aenter__(self) -> Any:
+        return await self._body.__aenter__()
+
+    async def __aexit__(self, exc_type, exc_value, tb) -> None:
+        await self._body.__aexit__(exc_type, exc_value, tb)
+        if exc_type is None and self._settle is not None:
+            settler, payment, requirements = self._settle
+            self._settle = None
+            await settler.settle_later(payment, requirements)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._body, name)
+
+
+class PaymentMiddleware:
+    """
+    Quart (ASGI) middleware for x402 payment requirements.
+    Mirrors the Flask PaymentMiddleware API, but verifies and settles payments
+    natively on the app's event loop.
+
+    Usage:
+        middleware = PaymentMiddleware(app)
+        middleware.add(path="/weather", price="$0.001", pay_to_address="0x...")
+        middleware.add(path="/premium/*", price=TokenAmount(...), pay_to_address="0x...")
+    """
+
+    def __init__(self, app: Quart):
+        self.app = app
+        self.middleware_configs = []
+        self._routes: RouteIndex[Dict[str, Any]] = RouteIndex()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def add(
+        self,
+        price: Price,
+        pay_to_address: str,
+        path: Union[str, list[str]] = "*",
+        description: str = "",
+        mime_type: str = "",
+        max_deadline_seconds: int = 60,
+        input_schema: Optional[HTTPInputSchema] = None,
+        output_schema: Optional[Any] = None,
+        discoverable: Optional[bool] = True,
+        facilitator_config: Optional[FacilitatorConfig] = None,
+        network: str = "base-sepolia",
+        resource: Optional[str] = None,
+        paywall_config: Optional[PaywallConfig] = None,
+        custom_paywall_html: Optional[str] = None,
+        settlement_config: Optional[SettlementConfig] = None,
+    ):
+        """
+        Add a payment middleware configuration.
+
+        Args:
+            price (Price): Payment price (USD or TokenAmount)
+            pay_to_address (str): Ethereum address to receive payment
+            path (str | list[str], optional): Path(s) to protect. Defaults to "*".
+            description (str, optional): Description of the resource
+            mime_type (str, optional): MIME type of the resource
+            max_deadline_seconds (int, optional): Max time for payment
+            input_schema (Optional[HTTPInputSchema], optional): Schema for the request structure. Defaults to None.
+            output_schema (Optional[Any], optional): Schema for the response. Defaults to None.
+            discoverable (bool, optional): Whether the route is discoverable. Defaults to True.
+            facilitator_config (dict, optional): Facilitator config
+            network (str, optional): Network ID
+            resource (str, optional): Resource URL
+            paywall_config (PaywallConfig, optional): Paywall UI customization config
+            custom_paywall_html (str, optional): Custom HTML to display for paywall instead of default
+            settlement_config (SettlementConfig, optional): Batch settlements. With a journal_path, a
+                response whose payment cannot be settled because the facilitator is unreachable is
+                still served, and the payment is settled after the response is sent
+        """
+        # Validate network is supported
+        supported_networks = get_args(SupportedNetworks)
+        if network not in supported_networks:
+            raise ValueError(
+                f"Unsupported network: {network}. Must be one of: {supported_networks}"
+            )
+
+        try:
+            max_amount_required, asset_address, eip712_domain = (
+                process_price_to_atomic_amount(price, network)
+            )
+        except Exception as e:
+            raise ValueError(f"Invalid price: {price}. Error: {e}")
+
+        # Only the resource URL and the HTTP method vary between requests
+        requirements_template = PaymentRequirements(
+            scheme="exact",
+            network=cast(SupportedNetworks, network),
+            asset=asset_address,
+            max_amount_required=max_amount_required,
+            resource=resource or "",
+            description=description,
+            mime_type=mime_type,
+            pay_to=pay_to_address,
+            max_timeout_seconds=max_deadline_seconds,
+            extra=eip712_domain,
+        )
+        input_schema_fields = input_schema.model_dump() if input_schema else {}
+
+        @lru_cache(maxsize=256)
+        def build_payment_requirements(
+            method: str, resource_url: str
+        ) -> list[PaymentRequirements]:
+            """Build (and memoize) the payment requirements for a method/resource pair."""
+            return [
+                requirements_template.model_copy(
+                    update={
+                        "resource": resource_url,
+                        "output_schema": {
+                            "input": {
+                                "type": "http",
+                                "method": method,
+                                "discoverable": discoverable
+                                if discoverable is not None
+                                else True,
+                                **input_schema_fields,
+                            },
+                            "output": output_schema,
+                        },
+                    }
+                )
+            ]
+
+        facilitator = create_facilitator(facilitator_config)
+        config = {
+            "pay_to_address": pay_to_address,
+            "path": path,
+            "description": description,
+            "mime_type": mime_type,
+            "max_deadline_seconds": max_deadline_seconds,
+            "input_schema": input_schema,
+            "output_schema": output_schema,
+            "discoverable": discoverable,
+            "network": network,
+            "resource": resource,
+            "paywall_config": paywall_config,
+            "custom_paywall_html": custom_paywall_html,
+            "max_amount_required": max_amount_required,
+            "asset_address": asset_address,
+            "eip712_domain": eip712_domain,
+            "build_payment_requirements": build_payment_requirements,
+            "facilitator": facilitator,
+            "settler": (
+                SettlementBatcher(facilitator, settlement_config)
+                if settlement_config is not None
+                else facilitator
+            ),
+        }
+        self.middleware_configs.append(config)
+        self._routes.add(path, config)
+
+    def _payment_requirements(
+        self, config: Dict[str, Any]
+    ) -> list[PaymentRequirements]:
+        # Get resource URL if not explicitly provided
+        original_uri = request.headers.get("X-Original-URI")
+        if original_uri:
+            # Reconstruct the full URL using the original URI from the proxy
+            resource_url = f"{request.scheme}://{request.host}{original_uri}"
+        else:
+            resource_url = config["resource"] or request.url
+
+        return config["build_payment_requirements"](
+            request.method.upper(), resource_url
+        )
+
+    def _x402_response(
+        self,
+        config: Dict[str, Any],
+        payment_requirements: list[PaymentRequirements],
+        error: str,
+    ) -> Response:
+        """Create a 402 response with payment requirements."""
+        if is_browser_request(dict(request.headers)):
+            html_content = config["custom_paywall_html"] or get_paywall_html(
+                error, payment_requirements, config["paywall_config"]
+            )
+            return Response(
+                html_content, status=402, content_type="text/html; charset=utf-8"
+            )
+
+        response_data = x402PaymentRequiredResponse(
+            x402_version=x402_VERSION,
+            accepts=payment_requirements,
+            error=error,
+        ).model_dump(by_alias=True)
+        return Response(
+            json_dumps(response_data), status=402, content_type="application/json"
+        )
+
+    def _unavailable_response(self, error: FacilitatorUnavailableError) -> Response:
+        """Create a 503 response while the facilitator is failing."""
+        response = Response(
+            json_dumps({"x402Version": x402_VERSION, "error": str(error)}),
+            status=503,
+            content_type="application/json",
+        )
+        if error.retry_after:
+            response.headers["Retry-After"] = str(math.ceil(error.retry_after))
+        return response
+
+    async def _before_request(self) -> Optional[Response]:
+        config = self._routes.match(request.path)
+        if config is None:
+            return None
+
+        payment_requirements = self._payment_requirements(config)
+
+        event = payment_logger.start(
+            method=request.method, path=request.path, network=config["network"]
+        )
+
+        # Check for payment header
+        payment_header = request.headers.get("X-PAYMENT", "")
+
+        if payment_header == "":
+            payment_logger.emit(event, "payment_required")
+            return self._x402_response(
+                config, payment_requirements, "No X-PAYMENT header provided"
+            )
+
+        # Decode payment header
+        try:
+            payment = decode_compact_payment_header(payment_header)
+        except Exception as e:
+            payment_logger.emit(
+                event,
+                "invalid_header",
+                error=f"{type(e).__name__}: {e}",
+                client=request.remote_addr,
+            )
+            return self._x402_response(
+                config, payment_requirements, f"Invalid payment header format: {str(e)}"
+            )
+
+        auth = payment.payload.authorization
+        event.update(payer=auth.from_, value=auth.value, scheme=payment.scheme)
+
+        # Find matching payment requirements
+        selected_payment_requirements = find_matching_payment_requirements(
+            payment_requirements, payment
+        )
+        payment_logger.debug_payment(payment, selected_payment_requirements)
+
+        if not selected_payment_requirements:
+            payment_logger.emit(
+                event,
+                "no_matching_requirements",
+                error="No matching payment requirements found",
+                payment_network=payment.network,
+                available=[
+                    req.scheme + "/" + req.network for req in payment_requirements
+                ],
+            )
+            return self._x402_response(
+                config, payment_requirements, "No matching payment requirements found"
+            )
+
+        # Verify payment
+        try:
+            verify_response = await config["facilitator"].verify(
+                payment, selected_payment_requirements
+            )
+        except FacilitatorUnavailableError as e:
+            payment_logger.emit(event, "facilitator_unavailable", error=str(e))
+            return self._unavailable_response(e)
+
+        if not verify_response.is_valid:
+            error_reason = verify_response.invalid_reason or "Unknown error"
+            payment_logger.emit(
+                event,
+                "invalid",
+                error=error_reason,
+                signature=describe_signature(payment.payload.signature),
+            )
+            return self._x402_response(
+                config, payment_requirements, f"Invalid payment: {error_reason}"
+            )
+
+        # Store payment details in Quart g object
+        g.payment_details = selected_payment_requirements
+        g.verify_response = verify_response
+        g.x402_pending_settlement = (config, payment_requirements, payment, event)
+        return None
+
+    async def _after_request(self, response: Response) -> Response:
+        pending = g.pop("x402_pending_settlement", None)
+        if pending is None:
+            return response
+
+        config, payment_requirements, payment, event = pending
+
+        # Skip settling if the response is not a 2xx
+        if response.status_code < 200 or response.status_code >= 300:
+            payment_logger.emit(event, "not_settled", status_code=response.status_code)
+            return response
+
+        try:
+            settle_response = await config["settler"].settle(payment, g.payment_details)
+        except FacilitatorUnavailableError as e:
+            settler = config["settler"]
+            if isinstance(settler, SettlementBatcher) and settler.journal is not None:
+                # Serve the verified payment and settle it once the response is sent
+                payment_logger.emit(event, "settle_deferred", error=str(e))
+                response.response = _SettleAfterSend(
+                    response.response, settler, payment, g.payment_details
+                )
+                return response
+            payment_logger.emit(event, "facilitator_unavailable", error=str(e))
+            return self._unavailable_response(e)
+        except Exception as e:
+            payment_logger.emit(
+                event, "settle_failed", error=f"{type(e).__name__}: {e}"
+            )
+            return self._x402_response(config, payment_requirements, "Settle failed")
+
+        if not settle_response.success:
+            error_reason = settle_response.error_reason or "Unknown error"
+            payment_logger.emit(event, "settle_failed", error=error_reason)
+            return self._x402_response(
+                config, payment_requirements, "Settle failed: " + error_reason
+            )
+
+        response.headers["X-PAYMENT-RESPONSE"] = base64.b64encode(
+            settle_response.model_dump_json(by_alias=True).encode("utf-8")
+        ).decode("utf-8")
+        payment_logger.emit(event, "settled", transaction=settle_response.transaction)
+        return response
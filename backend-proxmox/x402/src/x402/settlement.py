@@ -0,0 +1,420 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional, Set, Tuple, Union
+from typing_extensions import (
+    TypedDict,
+)  # use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12
+
+from x402.types import (
+    AnyPaymentPayload,
+    CompactPaymentPayload,
+    PaymentRequirements,
+    SettleResponse,
+)
+
+# A journaled settlement is given up after this many submissions
+DEFAULT_MAX_ATTEMPTS = 5
+# Seconds between submissions of a journaled settlement the facilitator did not answer
+DEFAULT_RETRY_INTERVAL = 30.0
+# Seconds settled and failed journal rows are kept
+DEFAULT_RETENTION = 7 * 24 * 3600.0
+# Seconds between prunes of old journal rows
+PRUNE_INTERVAL = 3600.0
+
+
+class SettlementConfig(TypedDict, total=False):
+    """Batching of /settle calls.
+
+    Attributes:
+        max_batch: Pending settlements that trigger an immediate flush. Defaults to 32.
+        window: Seconds to wait for more settlements before flushing. Defaults to 0.01.
+        journal_path: SQLite file for payments whose response was delivered
+            before they could be settled; unset rejects such requests instead
+        max_attempts: Submissions before a journaled settlement is marked failed.
+            Defaults to 5.
+        retry_interval: Seconds between submissions of a journaled settlement.
+            Defaults to 30.
+        retention: Seconds settled and failed journal rows are kept. Defaults to
+            7 days.
+    """
+
+    max_batch: int
+    window: float
+    journal_path: Union[str, Path]
+    max_attempts: int
+    retry_interval: float
+    retention: float
+
+
+class SettlementJournal:
+    """SQLite record of settlements owed for delivered responses.
+
+    Only payments whose response already reached the client are written, as
+    pending, and they are marked settled or failed once the facilitator
+    answers. A payer is never charged for a response they did not get.
+    Pending settlements survive a restart and are returned by `pending`.
+    Resubmitting is safe: an EIP-3009 nonce can be used only once, so a
+    duplicate settlement is rejected instead of paid twice.
+
+    Calls block on SQLite; SettlementBatcher runs them in a worker thread.
+    """
+
+    PENDING = "pending"
+    SETTLED = "settled"
+    FAILED = "failed"
+
+    def __init__(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute("PRAGMA synchronous=NORMAL;")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS x402_settlements (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payment TEXT NOT NULL,
+                    requirements TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS x402_settlements_status "
+                "ON x402_settlements (status);"
+            )
+
+    def add(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> int:
+        """Record a settlement as pending and return its id."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO x402_settlements "
+                "(payment, requirements, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?);",
+                (
+                    payment.model_dump_json(by_alias=True),
+                    payment_requirements.model_dump_json(by_alias=True),
+                    self.PENDING,
+                    now,
+                    now,
+                ),
+            )
+            return cursor.lastrowid
+
+    def attempted(self, ids: List[int]) -> None:
+        """Count a submission of the given settlements."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE x402_settlements SET attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?;",
+                [(time.time(), settlement_id) for settlement_id in ids],
+            )
+
+    def complete(self, settlement_id: int, response: SettleResponse) -> None:
+        """Store the facilitator's answer for a settlement."""
+        self._finish(
+            settlement_id,
+            self.SETTLED if response.success else self.FAILED,
+            response.model_dump_json(by_alias=True),
+        )
+
+    def fail(self, settlement_id: int, error: str) -> None:
+        """Give up on a settlement."""
+        self._finish(settlement_id, self.FAILED, error)
+
+    def _finish(self, settlement_id: int, status: str, result: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                # A late duplicate submission must not undo a settlement
+                "UPDATE x402_settlements SET status = ?, result = ?, updated_at = ? "
+                "WHERE id = ? AND status != ?;",
+                (status, result, time.time(), settlement_id, self.SETTLED),
+            )
+
+    def pending(
+        self,
+    ) -> List[Tuple[int, CompactPaymentPayload, PaymentRequirements, int]]:
+        """Pending settlements as (id, payment, requirements, attempts), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payment, requirements, attempts FROM x402_settlements "
+                "WHERE status = ? ORDER BY id;",
+                (self.PENDING,),
+            ).fetchall()
+        return [
+            (
+                settlement_id,
+                CompactPaymentPayload.model_validate_json(payment),
+                PaymentRequirements.model_validate_json(requirements),
+                attempts,
+            )
+            for settlement_id, payment, requirements, attempts in rows
+        ]
+
+    def prune(self, older_than: float) -> int:
+        """Delete settled and failed rows last updated before `older_than`.
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM x402_settlements WHERE status IN (?, ?) AND updated_at < ?;",
+                (self.SETTLED, self.FAILED, older_than),
+            )
+            return cursor.rowcount
+
+    def status(self, settlement_id: int) -> Optional[Tuple[str, Optional[str]]]:
+        """The (status, result) recorded for a settlement."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result FROM x402_settlements WHERE id = ?;",
+                (settlement_id,),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _PendingSettlement:
+    __slots__ = ("journal_id", "payment", "requirements", "future", "attempts")
+
+    def __init__(
+        self,
+        journal_id: Optional[int],
+        payment: AnyPaymentPayload,
+        requirements: PaymentRequirements,
+        future: Optional["asyncio.Future[SettleResponse]"],
+        attempts: int = 0,
+    ):
+        self.journal_id = journal_id
+        self.payment = payment
+        self.requirements = requirements
+        self.future = future
+        self.attempts = attempts
+
+
+class SettlementBatcher:
+    """Collects settlements and submits them together.
+
+    Settlements wait up to `window` seconds, or until `max_batch` are pending,
+    and are then sent to the facilitator concurrently over its pooled
+    connections. Each caller of `settle` awaits its own SettleResponse, and
+    nothing is written to disk for it: if the settlement fails, the caller
+    rejects the response and the payer is not charged.
+
+    With a journal, a payment whose response was delivered before it could be
+    settled is handed to `settle_later`. It is journaled, then retried every
+    `retry_interval` seconds until the facilitator answers, and after a
+    restart on first use.
+
+    Usage:
+        batcher = SettlementBatcher(facilitator, {"journal_path": "data/settlements.db"})
+        settle_response = await batcher.settle(payment, payment_requirements)
+    """
+
+    def __init__(self, facilitator: Any, config: Optional[SettlementConfig] = None):
+        """Initialize the batcher.
+
+        Args:
+            facilitator: FacilitatorClient or FacilitatorPool used for /settle
+            config: Optional batching and journal settings
+        """
+        config = config or {}
+        self.facilitator = facilitator
+        self.max_batch = config.get("max_batch", 32)
+        self.window = config.get("window", 0.01)
+        self.max_attempts = config.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        self.retry_interval = config.get("retry_interval", DEFAULT_RETRY_INTERVAL)
+        self.retention = config.get("retention", DEFAULT_RETENTION)
+        if self.max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1, got {self.max_batch}")
+        journal_path = config.get("journal_path")
+        self.journal = SettlementJournal(journal_path) if journal_path else None
+
+        self._pending: List[_PendingSettlement] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._retry_handles: Set[asyncio.TimerHandle] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._recovery: Optional["asyncio.Future[List[_PendingSettlement]]"] = None
+        self._pruned_at = 0.0
+
+    async def settle(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> SettleResponse:
+        """Queue a settlement and wait for the facilitator's answer."""
+        self._start_recovery()
+        future: "asyncio.Future[SettleResponse]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._queue(_PendingSettlement(None, payment, payment_requirements, future))
+        # The settlement goes ahead even if the caller stops waiting
+        return await asyncio.shield(future)
+
+    async def settle_later(
+        self, payment: AnyPaymentPayload, payment_requirements: PaymentRequirements
+    ) -> None:
+        """Journal and settle a payment whose response was already delivered.
+
+        Call this only once the response has reached the client. It returns
+        when the payment is journaled; submission happens in the background.
+        """
+        if self.journal is None:
+            raise ValueError("settle_later requires a journal_path")
+        # Read the journal before adding to it, so the new row is not recovered too
+        await self._start_recovery()
+        journal_id = await asyncio.to_thread(
+            self.journal.add, payment, payment_requirements
+        )
+        self._queue(_PendingSettlement(journal_id, payment, payment_requirements, None))
+
+    def flush(self) -> None:
+        """Submit everything pending now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._spawn(self._submit(batch))
+
+    async def recover(self) -> int:
+        """Resubmit journaled settlements left pending, e.g. by a restart.
+
+        Runs automatically on first use; call it at startup to recover
+        without waiting for traffic.
+
+        Returns:
+            Number of settlements resubmitted
+        """
+        if self._recovery is None:
+            # Nothing is left for the automatic recovery on first use
+            self._recovery = asyncio.get_running_loop().create_future()
+            self._recovery.set_result([])
+        recovered = await self._recoverable()
+        await self._submit_all(recovered)
+        return len(recovered)
+
+    def _queue(self, item: _PendingSettlement) -> None:
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.window, self.flush
+            )
+
+    def _start_recovery(self) -> "asyncio.Future[List[_PendingSettlement]]":
+        if self._recovery is None:
+            self._recovery = asyncio.get_running_loop().create_task(self._recoverable())
+            self._recovery.add_done_callback(self._recovered)
+        return self._recovery
+
+    def _recovered(self, task: "asyncio.Future[List[_PendingSettlement]]") -> None:
+        if not task.cancelled() and task.exception() is None and task.result():
+            self._spawn(self._submit_all(task.result()))
+
+    async def _recoverable(self) -> List[_PendingSettlement]:
+        if self.journal is None:
+            return []
+        await self._prune()
+        recovered = []
+        rows = await asyncio.to_thread(self.journal.pending)
+        for journal_id, payment, requirements, attempts in rows:
+            if attempts >= self.max_attempts:
+                await asyncio.to_thread(
+                    self.journal.fail, journal_id, "Too many settlement attempts"
+                )
+            else:
+                recovered.append(
+                    _PendingSettlement(
+                        journal_id, payment, requirements, None, attempts
+                    )
+                )
+        return recovered
+
+    async def _prune(self) -> None:
+        now = time.time()
+        if self.journal is not None and now - self._pruned_at >= PRUNE_INTERVAL:
+            self._pruned_at = now
+            await asyncio.to_thread(self.journal.prune, now - self.retention)
+
+    async def _submit_all(self, items: List[_PendingSettlement]) -> None:
+        for start in range(0, len(items), self.max_batch):
+            await self._submit(items[start : start + self.max_batch])
+
+    async def aclose(self) -> None:
+        """Flush pending settlements and wait for submissions to finish.
+
+        Scheduled retries are dropped; their journal rows stay pending and are
+        recovered on the next start.
+        """
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        self.flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _retry_later(self, item: _PendingSettlement) -> None:
+        def retry() -> None:
+            self._retry_handles.discard(handle)
+            self._queue(item)
+
+        handle = asyncio.get_running_loop().call_later(self.retry_interval, retry)
+        self._retry_handles.add(handle)
+
+    async def _submit(self, batch: List[_PendingSettlement]) -> None:
+        journaled = [item for item in batch if item.journal_id is not None]
+        for item in journaled:
+            item.attempts += 1
+        if journaled:
+            await asyncio.to_thread(
+                self.journal.attempted, [item.journal_id for item in journaled]
+            )
+        results = await asyncio.gather(
+            *(
+                self.facilitator.settle(item.payment, item.requirements)
+                for item in batch
+            ),
+            return_exceptions=True,
+        )
+        for item, result in zip(batch, results):
+            if item.future is not None:
+                if item.future.done():
+                    continue
+                if isinstance(result, SettleResponse):
+                    item.future.set_result(result)
+                else:
+                    item.future.set_exception(result)
+            elif isinstance(result, SettleResponse):
+                await asyncio.to_thread(self.journal.complete, item.journal_id, result)
+            elif item.attempts >= self.max_attempts:
+                await asyncio.to_thread(
+                    self.journal.fail,
+                    item.journal_id,
+                    f"Too many settlement attempts: {type(result).__name__}: {result}",
+                )
+            else:
+                # The facilitator did not answer; try again while the row stays pending
+                self._retry_later(item)
+        if journaled:
+            await self._prune()
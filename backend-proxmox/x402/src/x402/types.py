@@ -4,10 +4,12 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Optional, Union, Dict, Literal, List
 from typing_extensions import (
+    Annotated,
     TypedDict,
 )  # use `typing_extensions.TypedDict` instead of `typing.TypedDict` on Python < 3.12
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from pydantic.dataclasses import dataclass as pydantic_dataclass
 from pydantic.alias_generators import to_camel
 
 from x402.networks import SupportedNetworks
@@ -207,6 +209,69 @@ class PaymentPayload(BaseModel):
     )
 
 
+# Compact, slotted counterparts of the payment payload models for the
+# middleware hot path. They are validated by the same pydantic-core machinery
+# and serialize to the same wire format, but carry no per-instance __dict__ or
+# field-tracking state.
+_compact_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+
+@pydantic_dataclass(slots=True, frozen=True, config=_compact_config)
+class CompactEIP3009Authorization:
+    from_: Annotated[str, Field(alias="from")]
+    to: str
+    value: str
+    valid_after: str
+    valid_before: str
+    nonce: str
+
+    @field_validator("value")
+    def validate_value(cls, v):
+        try:
+            int(v)
+        except ValueError:
+            raise ValueError("value must be an integer encoded as a string")
+        return v
+
+
+@pydantic_dataclass(slots=True, frozen=True, config=_compact_config)
+class CompactExactPaymentPayload:
+    signature: str
+    authorization: CompactEIP3009Authorization
+
+
+@pydantic_dataclass(slots=True, frozen=True, config=_compact_config)
+class CompactPaymentPayload:
+    """Slotted, immutable PaymentPayload with the same attributes and wire format."""
+
+    x402_version: int
+    scheme: str
+    network: str
+    payload: CompactExactPaymentPayload
+
+    @classmethod
+    def model_validate_json(cls, data: Union[str, bytes]) -> CompactPaymentPayload:
+        return _compact_payment_adapter.validate_json(data)
+
+    def model_dump(self, by_alias: bool = False, **kwargs: Any) -> Dict[str, Any]:
+        return _compact_payment_adapter.dump_python(self, by_alias=by_alias, **kwargs)
+
+    def model_dump_json(self, by_alias: bool = False, **kwargs: Any) -> str:
+        return _compact_payment_adapter.dump_json(
+            self, by_alias=by_alias, **kwargs
+        ).decode("utf-8")
+
+    def to_model(self) -> PaymentPayload:
+        """Convert to the full PaymentPayload model."""
+        return PaymentPayload.model_validate(self.model_dump(by_alias=True))
+
+
+_compact_payment_adapter = TypeAdapter(CompactPaymentPayload)
+
+# Either representation is accepted where a payment payload is only read
+AnyPaymentPayload = Union[PaymentPayload, CompactPaymentPayload]
+
+
 class X402Headers(BaseModel):
     x_payment: str
 
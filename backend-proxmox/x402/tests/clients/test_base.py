@@ -5,11 +5,12 @@ from eth_account import Account
 from x402.clients.base import (
     x402Client,
     PaymentAmountExceededError,
+    PaymentError,
     UnsupportedSchemeException,
     decode_x_payment_response,
 )
 from x402.types import PaymentRequirements
-from x402.exact import decode_payment
+from x402.exact import decode_payment, recover_authorization_signer
 
 
 @pytest.fixture
@@ -192,3 +193,49 @@ def test_payment_requirements_sorting(client):
     # Test both networks are equal
     selected = client.select_payment_requirements([other_req, base_req])
     assert selected.network == "base-sepolia"
+
+
+def test_create_payment_headers_in_order(account, payment_requirements):
+    client = x402Client(account, max_value=15000, signing_workers=2)
+    too_expensive = payment_requirements.model_copy(
+        update={"max_amount_required": "20000"}
+    )
+    unsignable = payment_requirements.model_copy(update={"extra": {}})
+    other_payee = payment_requirements.model_copy(
+        update={"pay_to": "0x1111111111111111111111111111111111111111"}
+    )
+
+    with client:
+        results = client.create_payment_headers(
+            [payment_requirements, too_expensive, unsignable, other_payee]
+        )
+
+    assert [r.ok for r in results] == [True, False, False, True]
+    assert isinstance(results[1].error, PaymentAmountExceededError)
+    assert isinstance(results[2].error, PaymentError)
+
+    first = decode_payment(results[0].header)["payload"]["authorization"]
+    last = decode_payment(results[3].header)["payload"]["authorization"]
+    assert first["to"] == payment_requirements.pay_to
+    assert last["to"] == other_payee.pay_to
+    assert first["nonce"] != last["nonce"]
+
+
+def test_create_payment_headers_process_pool(account, payment_requirements):
+    with x402Client(account, signing_workers=2) as client:
+        results = client.create_payment_headers([payment_requirements] * 2)
+        # The workers are started once and kept for later batches
+        signing_pool = client._signing_pool
+        client.create_payment_headers([payment_requirements] * 2)
+        assert client._signing_pool is signing_pool
+    assert client._signing_pool is None
+
+    assert all(r.ok for r in results)
+    for result in results:
+        payload = decode_payment(result.header)["payload"]
+        assert (
+            recover_authorization_signer(
+                payment_requirements, payload["authorization"], payload["signature"]
+            )
+            == account.address
+        )
@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+import pytest
+
+from x402.clients.cache import PaymentRequirementsCache, requirements_cache_key
+from x402.types import PaymentRequirements
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+def test_key_ignores_query_and_fragment():
+    assert requirements_cache_key("get", "https://example.com/a?x=1#top") == (
+        "GET",
+        "https://example.com/a",
+    )
+    assert requirements_cache_key("GET", "https://example.com/a") != (
+        requirements_cache_key("POST", "https://example.com/a")
+    )
+
+
+def test_put_get_invalidate(payment_requirements):
+    cache = PaymentRequirementsCache()
+    assert cache.get("GET", "https://example.com/a") is None
+
+    cache.put("GET", "https://example.com/a", payment_requirements, 1)
+    assert cache.get("GET", "https://example.com/a?page=2") == (
+        payment_requirements,
+        1,
+    )
+
+    cache.invalidate("GET", "https://example.com/a")
+    assert cache.get("GET", "https://example.com/a") is None
+
+
+def test_entries_expire(payment_requirements):
+    cache = PaymentRequirementsCache(ttl_seconds=10)
+    with patch("x402.clients.cache.time.monotonic", return_value=100.0):
+        cache.put("GET", "https://example.com/a", payment_requirements, 1)
+    with patch("x402.clients.cache.time.monotonic", return_value=109.0):
+        assert cache.get("GET", "https://example.com/a") is not None
+    with patch("x402.clients.cache.time.monotonic", return_value=110.0):
+        assert cache.get("GET", "https://example.com/a") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(payment_requirements):
+    cache = PaymentRequirementsCache(max_entries=2)
+    cache.put("GET", "https://example.com/a", payment_requirements, 1)
+    cache.put("GET", "https://example.com/b", payment_requirements, 1)
+    cache.get("GET", "https://example.com/a")
+    cache.put("GET", "https://example.com/c", payment_requirements, 1)
+
+    assert cache.get("GET", "https://example.com/a") is not None
+    assert cache.get("GET", "https://example.com/b") is None
+    assert cache.get("GET", "https://example.com/c") is not None
+
+
+def test_proactive_spend_cap():
+    assert PaymentRequirementsCache().reserve(10**30)
+
+    cache = PaymentRequirementsCache(max_proactive_spend=100)
+    assert cache.reserve(60)
+    assert not cache.reserve(60)
+    assert cache.reserve(40)
+    assert cache.remaining_spend == 0
+
+
+def test_invalid_ttl():
+    with pytest.raises(ValueError):
+        PaymentRequirementsCache(ttl_seconds=0)
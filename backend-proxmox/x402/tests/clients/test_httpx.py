@@ -4,10 +4,18 @@ import base64
 from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import Request, Response
 from eth_account import Account
-from x402.clients.httpx import HttpxHooks, x402_payment_hooks, x402HttpxClient
+import asyncio
+import httpx
+from x402.clients.httpx import (
+    RETRY_EXTENSION,
+    HttpxHooks,
+    x402_payment_hooks,
+    x402HttpxClient,
+)
 from x402.clients.base import (
     PaymentError,
 )
+from x402.clients.cache import PaymentRequirementsCache
 from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 
 
@@ -59,7 +67,9 @@ async def test_on_response_non_402(hooks):
 async def test_on_response_retry(hooks):
     # Test retry response
     response = Response(402)
-    hooks._is_retry = True
+    response.request = Request(
+        "GET", "https://example.com", extensions={RETRY_EXTENSION: True}
+    )
     result = await hooks.on_response(response)
     assert result == response
 
@@ -156,8 +166,8 @@ async def test_on_response_payment_error(hooks, payment_requirements):
     with pytest.raises(PaymentError):
         await hooks.on_response(response)
 
-    # Verify retry flag is reset
-    assert not hooks._is_retry
+    # Verify the request was not marked as retried
+    assert RETRY_EXTENSION not in response.request.extensions
 
 
 async def test_on_response_general_error(hooks):
@@ -170,8 +180,94 @@ async def test_on_response_general_error(hooks):
     with pytest.raises(PaymentError):
         await hooks.on_response(response)
 
-    # Verify retry flag is reset
-    assert not hooks._is_retry
+    # Verify the request was not marked as retried
+    assert RETRY_EXTENSION not in response.request.extensions
+
+
+async def test_retry_uses_originating_client(account, payment_requirements):
+    payment_required = json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1,
+            accepts=[payment_requirements],
+            error="Payment Required",
+        ).model_dump(by_alias=True)
+    ).encode()
+    sent = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        if "X-Payment" not in request.headers:
+            return httpx.Response(402, content=payment_required)
+        # Let concurrent paid retries interleave
+        await asyncio.sleep(0)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    async with x402HttpxClient(
+        account=account,
+        base_url="https://example.com",
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        hooks_instance = client.event_hooks["response"][0].__self__
+        assert hooks_instance.http_client is client
+        hooks_instance.client.create_payment_header = MagicMock(
+            side_effect=lambda requirements, version: "header"
+        )
+
+        with patch("x402.clients.httpx.AsyncClient") as throwaway_client:
+            responses = await asyncio.gather(
+                *(client.get(f"/item/{i}") for i in range(10))
+            )
+        throwaway_client.assert_not_called()
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert [r.json()["path"] for r in responses] == [f"/item/{i}" for i in range(10)]
+    assert len(sent) == 20
+
+
+async def test_remembered_requirements_pay_on_first_attempt(
+    account, payment_requirements
+):
+    payment_required = json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1,
+            accepts=[payment_requirements],
+            error="Payment Required",
+        ).model_dump(by_alias=True)
+    ).encode()
+    sent = []
+    reject_next_payment = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal reject_next_payment
+        sent.append("X-Payment" in request.headers)
+        if "X-Payment" not in request.headers or reject_next_payment:
+            reject_next_payment = False
+            return httpx.Response(402, content=payment_required)
+        return httpx.Response(200)
+
+    cache = PaymentRequirementsCache()
+    async with x402HttpxClient(
+        account=account,
+        base_url="https://example.com",
+        transport=httpx.MockTransport(handler),
+        requirements_cache=cache,
+    ) as client:
+        hooks_instance = client.event_hooks["response"][0].__self__
+        hooks_instance.client.create_payment_header = MagicMock(return_value="header")
+
+        # First call learns the requirements from the 402
+        assert (await client.get("/item?page=1")).status_code == 200
+        assert sent == [False, True]
+
+        # Later calls to the same resource pay upfront, whatever the query
+        assert (await client.get("/item?page=2")).status_code == 200
+        assert sent == [False, True, True]
+
+        # A 402 on a proactive payment invalidates and falls back to the 402 flow
+        reject_next_payment = True
+        assert (await client.get("/item")).status_code == 200
+        assert sent == [False, True, True, True, True]
+        assert cache.get("GET", "https://example.com/item") is not None
 
 
 def test_x402_payment_hooks(account):
@@ -0,0 +1,150 @@
+import time
+
+import pytest
+from eth_account import Account
+
+from x402.clients.base import x402Client
+from x402.clients.presign import PaymentAuthorizationPool
+from x402.exact import decode_payment
+from x402.types import PaymentRequirements
+
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+def wait_for(pool, payment_requirements, count, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while pool.available(payment_requirements) < count:
+        assert time.monotonic() < deadline, "pool did not fill in time"
+        time.sleep(0.01)
+
+
+def test_pool_prefills_and_hands_out_unique_headers(account, payment_requirements):
+    with PaymentAuthorizationPool(
+        account, size=3, requirements=[payment_requirements]
+    ) as pool:
+        wait_for(pool, payment_requirements, 3)
+
+        headers = [pool.take(payment_requirements) for _ in range(3)]
+        assert all(headers)
+
+        payloads = [decode_payment(h) for h in headers]
+        nonces = {p["payload"]["authorization"]["nonce"] for p in payloads}
+        assert len(nonces) == 3
+
+        auth = payloads[0]["payload"]["authorization"]
+        assert auth["from"] == account.address
+        assert auth["to"] == payment_requirements.pay_to
+        assert auth["value"] == payment_requirements.max_amount_required
+        # Validity window is bounded by validity_seconds
+        assert int(auth["validBefore"]) - int(time.time()) <= 300
+
+        # The pool refills after handing headers out
+        wait_for(pool, payment_requirements, 3)
+
+
+def test_pool_validity_capped_by_requirements(account, payment_requirements):
+    payment_requirements.max_timeout_seconds = 60
+    with PaymentAuthorizationPool(
+        account, size=1, requirements=[payment_requirements]
+    ) as pool:
+        wait_for(pool, payment_requirements, 1)
+        auth = decode_payment(pool.take(payment_requirements))["payload"][
+            "authorization"
+        ]
+        assert int(auth["validBefore"]) <= int(time.time()) + 60
+
+
+def test_pool_miss_learns_requirements(account, payment_requirements):
+    with PaymentAuthorizationPool(account, size=1) as pool:
+        assert pool.take(payment_requirements) is None
+        wait_for(pool, payment_requirements, 1)
+        assert pool.take(payment_requirements) is not None
+
+
+def test_pool_does_not_match_other_amount(account, payment_requirements):
+    other = payment_requirements.model_copy(update={"max_amount_required": "20000"})
+    with PaymentAuthorizationPool(
+        account, size=1, learn=False, requirements=[payment_requirements]
+    ) as pool:
+        wait_for(pool, payment_requirements, 1)
+        assert pool.take(other) is None
+        assert pool.available(other) == 0
+
+
+def test_pool_discards_near_expiry_headers(account, payment_requirements):
+    with PaymentAuthorizationPool(
+        account, size=1, requirements=[payment_requirements]
+    ) as pool:
+        wait_for(pool, payment_requirements, 1)
+        pool.min_remaining_seconds = 10_000
+        assert pool.take(payment_requirements) is None
+
+
+def test_client_uses_pool_then_falls_back(account, payment_requirements):
+    with PaymentAuthorizationPool(
+        account, size=1, learn=False, requirements=[payment_requirements]
+    ) as pool:
+        client = x402Client(account, authorization_pool=pool)
+        wait_for(pool, payment_requirements, 1)
+
+        pooled = client.create_payment_header(payment_requirements, 1)
+        assert pooled is not None
+        assert pool.available(payment_requirements) == 0
+
+        other = payment_requirements.model_copy(
+            update={"pay_to": "0x1111111111111111111111111111111111111111"}
+        )
+        inline = decode_payment(client.create_payment_header(other, 1))
+        assert inline["payload"]["authorization"]["to"] == other.pay_to
+
+
+def test_create_payment_headers_takes_pooled_first(account, payment_requirements):
+    with PaymentAuthorizationPool(
+        account, size=1, learn=False, requirements=[payment_requirements]
+    ) as pool:
+        wait_for(pool, payment_requirements, 1)
+        pooled = pool._targets[next(iter(pool._targets))].headers[0][1]
+
+        client = x402Client(account, authorization_pool=pool)
+        results = client.create_payment_headers([payment_requirements] * 2)
+
+        assert [r.header == pooled for r in results] == [True, False]
+        assert all(r.ok for r in results)
+
+
+def test_pool_skips_requirements_with_short_timeout(account, payment_requirements):
+    payment_requirements.max_timeout_seconds = 10
+    with PaymentAuthorizationPool(account, size=1) as pool:
+        assert pool.take(payment_requirements) is None
+        assert pool.available(payment_requirements) == 0
+        assert pool._thread is None
+
+
+def test_pool_rejects_invalid_settings(account):
+    with pytest.raises(ValueError):
+        PaymentAuthorizationPool(account, size=0)
+    with pytest.raises(ValueError):
+        PaymentAuthorizationPool(account, validity_seconds=30, min_remaining_seconds=30)
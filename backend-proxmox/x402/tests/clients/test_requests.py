@@ -12,6 +12,7 @@ from x402.clients.requests import (
 from x402.clients.base import (
     PaymentError,
 )
+from x402.clients.cache import PaymentRequirementsCache
 from x402.types import PaymentRequirements, x402PaymentRequiredResponse
 
 
@@ -108,25 +109,32 @@ def test_adapter_send_non_402(adapter):
         assert response.content == b"not found"
 
 
-def test_adapter_retry(adapter):
-    # Test retry handling in adapter
+def test_adapter_retry(adapter, payment_requirements):
+    # A 402 on the paid retry is returned without paying again
+    payment_response = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[payment_requirements],
+        error="Payment Required",
+    )
     mock_response = Response()
     mock_response.status_code = 402
-    mock_response._content = b"payment required"
+    mock_response._content = json.dumps(
+        payment_response.model_dump(by_alias=True)
+    ).encode()
 
     # Create a prepared request
     request = PreparedRequest()
     request.prepare("GET", "https://example.com")
 
-    # Set retry flag to true
-    adapter._is_retry = True
+    adapter.client.create_payment_header = MagicMock(return_value="mock_header")
 
-    with patch("requests.adapters.HTTPAdapter.send", return_value=mock_response):
+    with patch(
+        "requests.adapters.HTTPAdapter.send", return_value=mock_response
+    ) as mock_send:
         response = adapter.send(request)
         assert response.status_code == 402
-        assert response.content == b"payment required"
-        # Verify retry flag is reset after call
-        assert not adapter._is_retry
+        assert mock_send.call_count == 2
+        adapter.client.create_payment_header.assert_called_once()
 
 
 def test_adapter_payment_flow(adapter, payment_requirements):
@@ -174,7 +182,7 @@ def test_adapter_payment_flow(adapter, payment_requirements):
 
     # Mock the send method to return different responses
     def mock_send_impl(req, **kwargs):
-        if adapter._is_retry:
+        if "X-Payment" in req.headers:
             return retry_response
         return initial_response
 
@@ -230,8 +238,8 @@ def test_adapter_payment_error(adapter, payment_requirements):
         with pytest.raises(PaymentError):
             adapter.send(request)
 
-        # Verify retry flag is reset
-        assert not adapter._is_retry
+        # Verify no paid retry was attempted
+        assert "X-Payment" not in request.headers
 
 
 def test_adapter_general_error(adapter):
@@ -248,8 +256,112 @@ def test_adapter_general_error(adapter):
         with pytest.raises(PaymentError):
             adapter.send(request)
 
-        # Verify retry flag is reset
-        assert not adapter._is_retry
+        # Verify no paid retry was attempted
+        assert "X-Payment" not in request.headers
+
+
+def test_adapter_concurrent_payment_flows(adapter, payment_requirements):
+    # One adapter shared by many threads keeps retry state per call
+    from concurrent.futures import ThreadPoolExecutor
+
+    payment_required = json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1,
+            accepts=[payment_requirements],
+            error="Payment Required",
+        ).model_dump(by_alias=True)
+    ).encode()
+
+    def mock_send_impl(req, **kwargs):
+        response = Response()
+        if "X-Payment" in req.headers:
+            response.status_code = 200
+            response._content = req.url.encode()
+        else:
+            response.status_code = 402
+            response._content = payment_required
+        return response
+
+    adapter.client.create_payment_header = MagicMock(return_value="mock_header")
+
+    def call(i):
+        request = PreparedRequest()
+        request.prepare("GET", f"https://example.com/{i}")
+        return adapter.send(request)
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=mock_send_impl):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(call, range(50)))
+
+    assert [r.status_code for r in responses] == [200] * 50
+    assert [r.content for r in responses] == [
+        f"https://example.com/{i}".encode() for i in range(50)
+    ]
+
+
+def test_adapter_proactive_payment(account, payment_requirements):
+    payment_required = json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1,
+            accepts=[payment_requirements],
+            error="Payment Required",
+        ).model_dump(by_alias=True)
+    ).encode()
+    sent = []
+
+    def mock_send_impl(req, **kwargs):
+        sent.append("X-Payment" in req.headers)
+        response = Response()
+        if "X-Payment" in req.headers:
+            response.status_code = 200
+            response._content = b"ok"
+        else:
+            response.status_code = 402
+            response._content = payment_required
+        return response
+
+    # The cap only covers one proactive payment of 10000
+    cache = PaymentRequirementsCache(max_proactive_spend=15000)
+    adapter = x402_http_adapter(account, requirements_cache=cache)
+    adapter.client.create_payment_header = MagicMock(return_value="mock_header")
+
+    def call():
+        request = PreparedRequest()
+        request.prepare("GET", "https://example.com/item")
+        return adapter.send(request)
+
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=mock_send_impl):
+        assert call().status_code == 200
+        assert sent == [False, True]
+
+        assert call().status_code == 200
+        assert sent == [False, True, True]
+
+        # Spend cap reached: back to waiting for the 402
+        assert call().status_code == 200
+        assert sent == [False, True, True, False, True]
+
+
+def test_adapter_paid_402_forgets_requirements(account, payment_requirements):
+    cache = PaymentRequirementsCache()
+    adapter = x402_http_adapter(account, requirements_cache=cache)
+    adapter.client.create_payment_header = MagicMock(return_value="mock_header")
+
+    mock_response = Response()
+    mock_response.status_code = 402
+    mock_response._content = json.dumps(
+        x402PaymentRequiredResponse(
+            x402_version=1,
+            accepts=[payment_requirements],
+            error="Payment Required",
+        ).model_dump(by_alias=True)
+    ).encode()
+
+    request = PreparedRequest()
+    request.prepare("GET", "https://example.com/item")
+    with patch("requests.adapters.HTTPAdapter.send", return_value=mock_response):
+        assert adapter.send(request).status_code == 402
+    assert len(cache) == 0
 
 
 def test_x402_http_adapter(account):
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 from x402.fastapi.middleware import require_payment
-from x402.types import PaywallConfig
+from x402.types import PaywallConfig, PaymentRequirements, x402PaymentRequiredResponse
 
 
 async def test_endpoint():
@@ -28,6 +28,41 @@ def test_middleware_invalid_payment():
     assert "Invalid payment header format" in response.json()["error"]
 
 
+def test_payment_required_body_matches_model():
+    app_with_middleware = FastAPI()
+    app_with_middleware.get("/test")(test_endpoint)
+    app_with_middleware.post("/test")(test_endpoint)
+    app_with_middleware.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+            description="Test payment",
+        )
+    )
+
+    client = TestClient(app_with_middleware)
+    first = client.get("/test")
+    second = client.get("/test")
+    posted = client.post("/test")
+
+    assert first.status_code == 402
+    assert first.content == second.content
+    assert int(first.headers["content-length"]) == len(first.content)
+
+    requirements = PaymentRequirements(**first.json()["accepts"][0])
+    assert requirements.resource == "http://testserver/test"
+    assert requirements.output_schema["input"]["method"] == "GET"
+    assert posted.json()["accepts"][0]["outputSchema"]["input"]["method"] == "POST"
+
+    expected = x402PaymentRequiredResponse(
+        x402_version=1,
+        accepts=[requirements],
+        error="No X-PAYMENT header provided",
+    ).model_dump(by_alias=True)
+    assert first.json() == expected
+
+
 def test_app_middleware_path_matching():
     app_with_middleware = FastAPI()
     app_with_middleware.get("/test")(test_endpoint)
@@ -529,3 +564,171 @@ def test_payment_amount_conversion():
     html_content = response.text
     # $0.001 should be converted to 0.001 in the display
     assert '"amount": 0.001' in html_content
+
+
+def test_per_request_price():
+    """A callable price is resolved per request by one shared middleware."""
+
+    async def price(request: Request):
+        return "$" + request.query_params.get("price", "0.01")
+
+    app = FastAPI()
+    app.get("/protected")(test_endpoint)
+    app.middleware("http")(
+        require_payment(
+            price=price,
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+        )
+    )
+
+    client = TestClient(app)
+    cheap = client.get("/protected", params={"price": "0.01"}).json()["accepts"][0]
+    dear = client.get("/protected", params={"price": "2"}).json()["accepts"][0]
+    assert cheap["maxAmountRequired"] == "10000"
+    assert dear["maxAmountRequired"] == "2000000"
+
+
+def test_payment_required_response_cache_is_not_mutated():
+    from x402.fastapi.middleware import PaymentRequiredResponse
+
+    accepts_json = b"[]"
+    first = PaymentRequiredResponse(accepts_json, "No X-PAYMENT header provided")
+    first.headers["X-Extra"] = "1"
+
+    second = PaymentRequiredResponse(accepts_json, "No X-PAYMENT header provided")
+    assert second.body is first.body
+    assert "x-extra" not in second.headers
+    assert second.headers["content-length"] == str(len(second.body))
+    assert second.status_code == 402
+
+
+def test_decode_request_payment_caches_on_state():
+    from unittest.mock import patch
+    from x402.fastapi.middleware import decode_request_payment
+
+    app = FastAPI()
+
+    @app.get("/free")
+    async def free(request: Request):
+        try:
+            first = decode_request_payment(request)
+        except ValueError:
+            return {"error": True, "cached": request.state.x402_payment[1] is not None}
+        second = decode_request_payment(request)
+        return {"same": first is second, "payment": first is not None}
+
+    client = TestClient(app)
+    assert client.get("/free").json() == {"same": True, "payment": False}
+
+    with patch("x402.fastapi.middleware.decode_compact_payment_header") as decode:
+        decode.side_effect = ValueError("bad header")
+        response = client.get("/free", headers={"X-PAYMENT": "garbage"})
+        assert response.json() == {"error": True, "cached": True}
+        assert decode.call_count == 1
+
+
+def test_facilitator_unavailable_returns_503():
+    from unittest.mock import patch
+
+    from x402.encoding import b64encode_json
+    from x402.facilitator import FacilitatorClient, FacilitatorUnavailableError
+
+    app = FastAPI()
+    app.get("/test")(test_endpoint)
+    app.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+        )
+    )
+    header = b64encode_json(
+        {
+            "x402Version": 1,
+            "scheme": "exact",
+            "network": "base-sepolia",
+            "payload": {
+                "signature": "0x1234",
+                "authorization": {
+                    "from": "0x0000000000000000000000000000000000000001",
+                    "to": "0x1111111111111111111111111111111111111111",
+                    "value": "1000000",
+                    "validAfter": "0",
+                    "validBefore": "9999999999",
+                    "nonce": "0x" + "00" * 32,
+                },
+            },
+        }
+    )
+
+    with patch.object(
+        FacilitatorClient,
+        "verify",
+        side_effect=FacilitatorUnavailableError(
+            "Facilitator is unavailable (circuit open)", "verify", retry_after=12.5
+        ),
+    ):
+        response = TestClient(app).get("/test", headers={"X-PAYMENT": header})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "13"
+    assert "circuit open" in response.json()["error"]
+
+
+def test_unreachable_settlement_is_served_and_journaled(tmp_path):
+    from unittest.mock import AsyncMock, patch
+
+    from x402.encoding import b64encode_json
+    from x402.facilitator import FacilitatorClient, FacilitatorUnavailableError
+    from x402.settlement import SettlementJournal
+    from x402.types import VerifyResponse
+
+    journal_path = tmp_path / "settlements.db"
+    app = FastAPI()
+    app.get("/test")(test_endpoint)
+    app.middleware("http")(
+        require_payment(
+            price="$1.00",
+            pay_to_address="0x1111111111111111111111111111111111111111",
+            network="base-sepolia",
+            settlement_config={"window": 0, "journal_path": journal_path},
+        )
+    )
+    header = b64encode_json(
+        {
+            "x402Version": 1,
+            "scheme": "exact",
+            "network": "base-sepolia",
+            "payload": {
+                "signature": "0x1234",
+                "authorization": {
+                    "from": "0x0000000000000000000000000000000000000001",
+                    "to": "0x1111111111111111111111111111111111111111",
+                    "value": "1000000",
+                    "validAfter": "0",
+                    "validBefore": "9999999999",
+                    "nonce": "0x" + "00" * 32,
+                },
+            },
+        }
+    )
+
+    with (
+        patch.object(
+            FacilitatorClient,
+            "verify",
+            AsyncMock(return_value=VerifyResponse(is_valid=True, payer="0x01")),
+        ),
+        patch.object(
+            FacilitatorClient,
+            "settle",
+            AsyncMock(side_effect=FacilitatorUnavailableError("down", "settle")),
+        ),
+    ):
+        response = TestClient(app).get("/test", headers={"X-PAYMENT": header})
+
+    # The response is served, and the payment is journaled once it was sent
+    assert response.status_code == 200
+    assert "X-PAYMENT-RESPONSE" not in response.headers
+    assert len(SettlementJournal(journal_path).pending()) == 1
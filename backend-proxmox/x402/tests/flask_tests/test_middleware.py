@@ -1,5 +1,11 @@
+import base64
+import json
+import logging
+from unittest.mock import patch
+
 from flask import Flask, g
 from x402.flask.middleware import PaymentMiddleware
+from x402.types import SettleResponse, VerifyResponse
 
 
 def create_app_with_middleware(configs):
@@ -133,6 +139,44 @@ def test_multiple_middleware_configs():
         assert client.get("/c").status_code == 200
 
 
+def test_single_wsgi_layer_for_multiple_configs():
+    app = Flask(__name__)
+    original_wsgi_app = app.wsgi_app
+
+    middleware = PaymentMiddleware(app)
+    for i in range(5):
+        middleware.add(
+            price="$1.00", pay_to_address="0x1", path=f"/r{i}", network="base-sepolia"
+        )
+
+    assert app.wsgi_app == middleware._wsgi_app
+    assert middleware._next_app == original_wsgi_app
+    assert len(middleware.middleware_configs) == 5
+
+
+def test_first_matching_config_wins():
+    app = Flask(__name__)
+
+    @app.route("/premium/report")
+    def report():
+        return {"report": True}
+
+    middleware = PaymentMiddleware(app)
+    middleware.add(
+        price="$1.00", pay_to_address="0x1", path="/premium/*", network="base-sepolia"
+    )
+    middleware.add(
+        price="$2.00", pay_to_address="0x2", path="*", network="base-sepolia"
+    )
+    with app.test_client() as client:
+        resp = client.get("/premium/report")
+        assert resp.status_code == 402
+        assert len(resp.json["accepts"]) == 1
+        assert resp.json["accepts"][0]["payTo"] == "0x1"
+        assert resp.json["accepts"][0]["maxAmountRequired"] == "1000000"
+        assert int(resp.headers["Content-Length"]) == len(resp.data)
+
+
 def test_payment_details_in_g():
     app = Flask(__name__)
 
@@ -152,6 +196,110 @@ def test_payment_details_in_g():
         assert resp.status_code == 402
 
 
+def test_paid_request_is_verified_and_settled_without_event_loop():
+    app = Flask(__name__)
+
+    @app.route("/protected")
+    def protected():
+        return {"payer": g.verify_response.payer}
+
+    middleware = PaymentMiddleware(app)
+    middleware.add(
+        price="$1.00", pay_to_address="0x1", path="/protected", network="base-sepolia"
+    )
+
+    payment = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {
+            "signature": "0x1234",
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x1",
+                "value": "1000000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "00" * 32,
+            },
+        },
+    }
+    header = base64.b64encode(json.dumps(payment).encode()).decode()
+
+    with (
+        patch(
+            "x402.facilitator.SyncFacilitatorClient.verify",
+            return_value=VerifyResponse(isValid=True, payer="0xabc"),
+        ) as verify,
+        patch(
+            "x402.facilitator.SyncFacilitatorClient.settle",
+            return_value=SettleResponse(success=True, transaction="0x1234"),
+        ) as settle,
+        patch("asyncio.new_event_loop") as new_event_loop,
+    ):
+        with app.test_client() as client:
+            resp = client.get("/protected", headers={"X-PAYMENT": header})
+
+    assert resp.status_code == 200
+    assert resp.json == {"payer": "0xabc"}
+    verify.assert_called_once()
+    settle.assert_called_once()
+    new_event_loop.assert_not_called()
+
+
+def test_failed_settlement_is_logged(caplog):
+    app = create_app_with_middleware(
+        [
+            {
+                "price": "$1.00",
+                "pay_to_address": "0x1",
+                "path": "/protected",
+                "network": "base-sepolia",
+            }
+        ]
+    )
+    payment = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base-sepolia",
+        "payload": {
+            "signature": "0x1234",
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x1",
+                "value": "1000000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "00" * 32,
+            },
+        },
+    }
+    header = base64.b64encode(json.dumps(payment).encode()).decode()
+    caplog.set_level(logging.INFO, logger="x402.payments")
+
+    with (
+        patch(
+            "x402.facilitator.SyncFacilitatorClient.verify",
+            return_value=VerifyResponse(isValid=True, payer="0xabc"),
+        ),
+        patch(
+            "x402.facilitator.SyncFacilitatorClient.settle",
+            return_value=SettleResponse(
+                success=False, error_reason="insufficient_funds"
+            ),
+        ),
+    ):
+        with app.test_client() as client:
+            resp = client.get("/protected", headers={"X-PAYMENT": header})
+
+    # Headers are already sent, so the response goes out and the failure is logged
+    assert resp.status_code == 200
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.x402_payment["outcome"] == "settle_failed"
+    assert record.x402_payment["error"] == "insufficient_funds"
+
+
 def test_browser_request_returns_html():
     """Test that browser requests return HTML paywall instead of JSON."""
     app = create_app_with_middleware(
@@ -0,0 +1,190 @@
+import base64
+import json
+import logging
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+pytest.importorskip("quart")
+
+from quart import Quart, g
+from x402.quart.middleware import PaymentMiddleware
+from x402.types import SettleResponse, VerifyResponse
+
+
+def create_app_with_middleware(configs):
+    app = Quart(__name__)
+
+    @app.route("/protected")
+    async def protected():
+        return {
+            "message": "protected",
+            "payer": g.verify_response.payer if "verify_response" in g else None,
+        }
+
+    @app.route("/unprotected")
+    async def unprotected():
+        return {"message": "unprotected"}
+
+    middleware = PaymentMiddleware(app)
+    for cfg in configs:
+        middleware.add(**cfg)
+    return app
+
+
+def payment_header(network="base-sepolia"):
+    payload = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": network,
+        "payload": {
+            "signature": "0x" + "ab" * 65,
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x0000000000000000000000000000000000000002",
+                "value": "1000000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "00" * 32,
+            },
+        },
+    }
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+PROTECTED = {
+    "price": "$1.00",
+    "pay_to_address": "0x1",
+    "path": "/protected",
+    "network": "base-sepolia",
+}
+
+
+async def test_payment_required_for_protected_route():
+    app = create_app_with_middleware([PROTECTED])
+    client = app.test_client()
+
+    resp = await client.get("/protected")
+    assert resp.status_code == 402
+    data = await resp.get_json()
+    assert "accepts" in data
+    assert data["error"].startswith("No X-PAYMENT header provided")
+
+
+async def test_unprotected_route():
+    app = create_app_with_middleware([PROTECTED])
+    client = app.test_client()
+
+    resp = await client.get("/unprotected")
+    assert resp.status_code == 200
+    assert await resp.get_json() == {"message": "unprotected"}
+
+
+async def test_invalid_payment_header():
+    app = create_app_with_middleware([PROTECTED])
+    client = app.test_client()
+
+    resp = await client.get("/protected", headers={"X-PAYMENT": "not_base64"})
+    assert resp.status_code == 402
+    assert "Invalid payment header format" in (await resp.get_json())["error"]
+
+
+async def test_paid_request_is_verified_and_settled():
+    app = create_app_with_middleware([PROTECTED])
+    client = app.test_client()
+
+    verify = AsyncMock(
+        return_value=VerifyResponse(isValid=True, invalidReason=None, payer="0xabc")
+    )
+    settle = AsyncMock(
+        return_value=SettleResponse(
+            success=True, transaction="0x1234", network="base-sepolia", payer="0xabc"
+        )
+    )
+    with (
+        patch("x402.facilitator.FacilitatorClient.verify", verify),
+        patch("x402.facilitator.FacilitatorClient.settle", settle),
+    ):
+        resp = await client.get("/protected", headers={"X-PAYMENT": payment_header()})
+
+    assert resp.status_code == 200
+    assert (await resp.get_json())["payer"] == "0xabc"
+    assert "X-PAYMENT-RESPONSE" in resp.headers
+    verify.assert_awaited_once()
+    settle.assert_awaited_once()
+
+
+async def test_failed_settlement_returns_402(caplog):
+    app = create_app_with_middleware([PROTECTED])
+    client = app.test_client()
+    caplog.set_level(logging.INFO, logger="x402.payments")
+
+    verify = AsyncMock(
+        return_value=VerifyResponse(isValid=True, invalidReason=None, payer="0xabc")
+    )
+    settle = AsyncMock(
+        return_value=SettleResponse(success=False, error_reason="insufficient_funds")
+    )
+    with (
+        patch("x402.facilitator.FacilitatorClient.verify", verify),
+        patch("x402.facilitator.FacilitatorClient.settle", settle),
+    ):
+        resp = await client.get("/protected", headers={"X-PAYMENT": payment_header()})
+
+    assert resp.status_code == 402
+    assert (await resp.get_json())["error"] == "Settle failed: insufficient_funds"
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.x402_payment["outcome"] == "settle_failed"
+    assert record.x402_payment["error"] == "insufficient_funds"
+
+
+async def test_payment_requirements_are_memoized():
+    app = Quart(__name__)
+
+    @app.route("/protected")
+    async def protected():
+        return {"message": "protected"}
+
+    middleware = PaymentMiddleware(app)
+    middleware.add(**PROTECTED)
+    client = app.test_client()
+
+    first = await (await client.get("/protected")).get_json()
+    second = await (await client.get("/protected")).get_json()
+    assert first["accepts"] == second["accepts"]
+    assert first["accepts"][0]["outputSchema"]["input"]["method"] == "GET"
+
+    [config] = middleware.middleware_configs
+    cache = config["build_payment_requirements"].cache_info()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_unreachable_settlement_is_served_and_journaled(tmp_path):
+    from x402.facilitator import FacilitatorUnavailableError
+    from x402.settlement import SettlementJournal
+
+    journal_path = tmp_path / "settlements.db"
+    app = create_app_with_middleware(
+        [
+            {
+                **PROTECTED,
+                "settlement_config": {"window": 0, "journal_path": journal_path},
+            }
+        ]
+    )
+    client = app.test_client()
+
+    verify = AsyncMock(
+        return_value=VerifyResponse(isValid=True, invalidReason=None, payer="0xabc")
+    )
+    settle = AsyncMock(side_effect=FacilitatorUnavailableError("down", "settle"))
+    with (
+        patch("x402.facilitator.FacilitatorClient.verify", verify),
+        patch("x402.facilitator.FacilitatorClient.settle", settle),
+    ):
+        resp = await client.get("/protected", headers={"X-PAYMENT": payment_header()})
+
+    assert resp.status_code == 200
+    assert "X-PAYMENT-RESPONSE" not in resp.headers
+    assert len(SettlementJournal(journal_path).pending()) == 1
@@ -1,4 +1,11 @@
+import base64
+import json
+
+import pytest
 from x402.common import (
+    MAX_PAYMENT_HEADER_LENGTH,
+    decode_compact_payment_header,
+    decode_payment_header,
     parse_money,
     process_price_to_atomic_amount,
     get_usdc_address,
@@ -9,6 +16,7 @@ from x402.types import (
     TokenAsset,
     EIP712Domain,
     PaymentRequirements,
+    CompactPaymentPayload,
     PaymentPayload,
     ExactPaymentPayload,
     EIP3009Authorization,
@@ -173,3 +181,76 @@ def test_find_matching_payment_requirements():
     payment.scheme = "different"  # No matching scheme
     match = find_matching_payment_requirements(requirements, payment)
     assert match is None
+
+
+def _encode_header(payload: dict) -> str:
+    return base64.b64encode(json.dumps(payload).encode("utf-8")).decode("utf-8")
+
+
+def test_decode_payment_header():
+    header = _encode_header(
+        {
+            "x402Version": 1,
+            "scheme": "exact",
+            "network": "base-sepolia",
+            "payload": {
+                "signature": "0x1234",
+                "authorization": {
+                    "from": "0x0000000000000000000000000000000000000001",
+                    "to": "0x0000000000000000000000000000000000000002",
+                    "value": "10000",
+                    "validAfter": "0",
+                    "validBefore": "9999999999",
+                    "nonce": "0x" + "00" * 32,
+                },
+            },
+        }
+    )
+
+    payment = decode_payment_header(header)
+    assert isinstance(payment, PaymentPayload)
+    assert payment.network == "base-sepolia"
+    assert payment.payload.authorization.from_ == (
+        "0x0000000000000000000000000000000000000001"
+    )
+
+    compact = decode_compact_payment_header(header)
+    assert isinstance(compact, CompactPaymentPayload)
+    assert compact.model_dump(by_alias=True) == payment.model_dump(by_alias=True)
+
+
+def test_decode_payment_header_invalid():
+    with pytest.raises(ValueError):
+        decode_payment_header("not_base64!")
+
+    with pytest.raises(ValueError):
+        decode_payment_header(_encode_header({"x402Version": 1}))
+
+
+def test_decode_compact_payment_header_invalid():
+    with pytest.raises(ValueError):
+        decode_compact_payment_header("not_base64!")
+
+    with pytest.raises(ValueError):
+        decode_compact_payment_header(_encode_header({"x402Version": 1}))
+
+    with pytest.raises(ValueError):
+        decode_compact_payment_header("A" * 12, max_length=8)
+
+
+def test_decode_payment_header_rejects_non_base64_characters():
+    header = _encode_header({"x402Version": 1})
+    # Without validation the stray characters would be dropped and decoded
+    for mangled in (header[:4] + "*" + header[4:], header + "\n"):
+        with pytest.raises(ValueError, match="not valid base64") as error:
+            decode_payment_header(mangled)
+        assert type(error.value) is ValueError
+
+
+def test_decode_payment_header_oversized():
+    oversized = "A" * (MAX_PAYMENT_HEADER_LENGTH + 4)
+    with pytest.raises(ValueError, match="max is"):
+        decode_payment_header(oversized)
+
+    with pytest.raises(ValueError, match="max is 8"):
+        decode_payment_header("A" * 12, max_length=8)
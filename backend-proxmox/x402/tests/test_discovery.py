@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+from x402.facilitator import FacilitatorClient
+from x402.types import ListDiscoveryResourcesRequest
+
+TOTAL = 5
+
+
+def resource(index: int) -> dict:
+    return {
+        "resource": f"https://api.example.com/r/{index}",
+        "type": "http",
+        "x402Version": 1,
+        "accepts": [],
+        "lastUpdated": "2025-08-09T01:07:04.005Z",
+        "metadata": {},
+    }
+
+
+class DiscoveryStub:
+    """Serves TOTAL resources in pages, honouring If-None-Match."""
+
+    def __init__(self, etag: str = '"v1"'):
+        self.etag = etag
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params.get("limit", 100))
+        return httpx.Response(
+            200,
+            headers={"ETag": self.etag},
+            json={
+                "x402Version": 1,
+                "items": [
+                    resource(i) for i in range(offset, min(offset + limit, TOTAL))
+                ],
+                "pagination": {"limit": limit, "offset": offset, "total": TOTAL},
+            },
+        )
+
+
+def make_client(stub: DiscoveryStub, **config) -> FacilitatorClient:
+    return FacilitatorClient(
+        {"url": "https://facilitator.test", **config},
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(stub)),
+    )
+
+
+async def test_resources_streams_every_page():
+    stub = DiscoveryStub()
+    client = make_client(stub)
+
+    resources = [r.resource async for r in client.resources(page_size=2)]
+
+    assert resources == [f"https://api.example.com/r/{i}" for i in range(TOTAL)]
+    assert [r.url.params["offset"] for r in stub.requests] == ["0", "2", "4"]
+
+
+async def test_resources_prefetches_next_page():
+    stub = DiscoveryStub()
+    client = make_client(stub)
+
+    iterator = client.resources(page_size=2)
+    await iterator.__anext__()
+    await asyncio.sleep(0)
+    # The second page was requested before the first one was consumed
+    assert len(stub.requests) == 2
+    await iterator.aclose()
+
+
+async def test_resources_without_prefetch_fetches_lazily():
+    stub = DiscoveryStub()
+    client = make_client(stub)
+
+    iterator = client.resources(page_size=2, prefetch=False)
+    await iterator.__anext__()
+    await asyncio.sleep(0)
+    assert len(stub.requests) == 1
+    await iterator.aclose()
+
+
+async def test_list_is_cached_per_query():
+    stub = DiscoveryStub()
+    client = make_client(stub)
+
+    first = await client.list(ListDiscoveryResourcesRequest(limit=2))
+    second = await client.list(ListDiscoveryResourcesRequest(limit=2))
+    await client.list(ListDiscoveryResourcesRequest(limit=3))
+
+    assert second is first
+    assert len(stub.requests) == 2
+
+
+async def test_stale_listing_is_revalidated():
+    stub = DiscoveryStub()
+    client = make_client(stub, discovery_ttl=0.01)
+
+    first = await client.list()
+    await asyncio.sleep(0.02)
+    second = await client.list()
+
+    assert second is first
+    assert stub.requests[1].headers["If-None-Match"] == '"v1"'
+
+    # A changed listing replaces the cached one
+    stub.etag = '"v2"'
+    await asyncio.sleep(0.02)
+    third = await client.list()
+    assert third is not first
+
+
+async def test_discovery_cache_can_be_disabled():
+    stub = DiscoveryStub()
+    client = make_client(stub, discovery_ttl=0)
+
+    await client.list()
+    await client.list()
+
+    assert client.discovery_cache is None
+    assert len(stub.requests) == 2
+    assert "If-None-Match" not in stub.requests[1].headers
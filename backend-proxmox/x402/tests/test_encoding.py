@@ -1,5 +1,19 @@
+import json
+
 import pytest
-from x402.encoding import safe_base64_encode, safe_base64_decode
+from x402.encoding import (
+    OrjsonCodec,
+    StdlibJSONCodec,
+    b64decode_json,
+    b64encode_json,
+    get_json_codec,
+    json_dumps,
+    json_loads,
+    orjson,
+    safe_base64_encode,
+    safe_base64_decode,
+    set_json_codec,
+)
 
 
 def test_safe_base64_encode():
@@ -79,3 +93,69 @@ def test_encode_decode_roundtrip():
         assert decoded == test_bytes.decode("utf-8"), (
             f"Roundtrip failed for bytes: {test_bytes}"
         )
+
+
+CODECS = [StdlibJSONCodec]
+if orjson is not None:
+    CODECS.append(OrjsonCodec)
+
+
+@pytest.fixture(params=CODECS, ids=lambda codec: codec.name)
+def codec(request):
+    previous = get_json_codec()
+    set_json_codec(request.param())
+    yield get_json_codec()
+    set_json_codec(previous)
+
+
+def test_json_roundtrip(codec):
+    data = {"x402Version": 1, "payload": {"nonce": "0xab", "note": "世界"}}
+    encoded = json_dumps(data)
+    assert isinstance(encoded, bytes)
+    assert b" " not in encoded
+    assert json_loads(encoded) == data
+    assert json_loads(encoded.decode("utf-8")) == data
+    assert json_loads(memoryview(encoded)) == data
+
+
+def test_json_dumps_default(codec):
+    class Custom:
+        def hex(self):
+            return "0x01"
+
+    assert json_loads(json_dumps({"value": Custom()}, default=lambda o: o.hex())) == {
+        "value": "0x01"
+    }
+
+
+def test_b64_json_roundtrip(codec):
+    data = {"success": True, "transaction": "0x1234"}
+    header = b64encode_json(data)
+    assert isinstance(header, str)
+    assert b64decode_json(header) == data
+    assert b64decode_json(header.encode("ascii")) == data
+
+
+def test_b64decode_json_invalid(codec):
+    with pytest.raises(ValueError):
+        b64decode_json("not base64!")
+    with pytest.raises(ValueError):
+        b64decode_json(safe_base64_encode("not json"))
+
+
+def test_codecs_agree_with_stdlib_json(codec):
+    data = {"accepts": [{"maxAmountRequired": "10000", "extra": None}], "error": ""}
+    assert json.loads(json_dumps(data)) == data
+
+
+def test_stdlib_codec_is_the_default():
+    # orjson is only used once a caller opts in with set_json_codec
+    assert get_json_codec().name == "json"
+
+
+def test_integers_beyond_64_bits(codec):
+    data = {"value": 2**256 - 1, "negative": -(2**64)}
+    encoded = json_dumps(data)
+    assert json.loads(encoded) == data
+    if codec.name == "json":
+        assert json_loads(encoded) == data
@@ -3,9 +3,13 @@ import time
 import base64
 from eth_account import Account
 from hexbytes import HexBytes
+from x402.chains import get_chain_id
 from x402.exact import (
     create_nonce,
+    domain_separator,
+    normalize_nonce,
     prepare_payment_header,
+    recover_authorization_signer,
     sign_payment_header,
     encode_payment,
     decode_payment,
@@ -104,6 +108,105 @@ def test_sign_payment_header(account, payment_requirements):
     assert int(auth["validBefore"]) > int(time.time())
 
 
+def test_sign_payment_header_matches_typed_data(account, payment_requirements):
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    auth = unsigned_header["payload"]["authorization"]
+    nonce = auth["nonce"]
+    auth["nonce"] = nonce.hex()
+
+    decoded = decode_payment(
+        sign_payment_header(account, payment_requirements, unsigned_header)
+    )
+
+    # Reference signature through eth_account's generic EIP-712 encoder
+    expected = account.sign_typed_data(
+        domain_data={
+            "name": payment_requirements.extra["name"],
+            "version": payment_requirements.extra["version"],
+            "chainId": int(get_chain_id(payment_requirements.network)),
+            "verifyingContract": payment_requirements.asset,
+        },
+        message_types={
+            "TransferWithAuthorization": [
+                {"name": "from", "type": "address"},
+                {"name": "to", "type": "address"},
+                {"name": "value", "type": "uint256"},
+                {"name": "validAfter", "type": "uint256"},
+                {"name": "validBefore", "type": "uint256"},
+                {"name": "nonce", "type": "bytes32"},
+            ]
+        },
+        message_data={
+            "from": auth["from"],
+            "to": auth["to"],
+            "value": int(auth["value"]),
+            "validAfter": int(auth["validAfter"]),
+            "validBefore": int(auth["validBefore"]),
+            "nonce": nonce,
+        },
+    )
+    assert HexBytes(decoded["payload"]["signature"]) == HexBytes(expected.signature)
+
+
+@pytest.mark.parametrize("form", ["bytes", "hex", "0x"])
+def test_sign_payment_header_normalizes_nonce(account, payment_requirements, form):
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    auth = unsigned_header["payload"]["authorization"]
+    nonce = auth["nonce"]
+    auth["nonce"] = {"bytes": nonce, "hex": nonce.hex(), "0x": "0x" + nonce.hex()}[form]
+
+    payload = decode_payment(
+        sign_payment_header(account, payment_requirements, unsigned_header)
+    )["payload"]
+
+    # The header carries the nonce that was signed
+    assert payload["authorization"]["nonce"] == "0x" + nonce.hex()
+    assert (
+        recover_authorization_signer(
+            payment_requirements, payload["authorization"], payload["signature"]
+        )
+        == account.address
+    )
+
+
+def test_normalize_nonce_rejects_wrong_length():
+    with pytest.raises(ValueError):
+        normalize_nonce("0x1234")
+
+
+def test_recover_authorization_signer(account, payment_requirements):
+    unsigned_header = prepare_payment_header(account.address, 1, payment_requirements)
+    auth = unsigned_header["payload"]["authorization"]
+    auth["nonce"] = auth["nonce"].hex()
+
+    payload = decode_payment(
+        sign_payment_header(account, payment_requirements, unsigned_header)
+    )["payload"]
+
+    assert (
+        recover_authorization_signer(
+            payment_requirements, payload["authorization"], payload["signature"]
+        )
+        == account.address
+    )
+
+    # Tampering with the message changes the recovered signer
+    payload["authorization"]["value"] = "1"
+    assert (
+        recover_authorization_signer(
+            payment_requirements, payload["authorization"], payload["signature"]
+        )
+        != account.address
+    )
+
+
+def test_domain_separator_cached(payment_requirements):
+    domain_separator.cache_clear()
+    args = ("USD Coin", "2", 84532, payment_requirements.asset)
+    assert domain_separator(*args) == domain_separator(*args)
+    assert domain_separator.cache_info().hits == 1
+
+
 def test_sign_payment_header_no_account(payment_requirements):
     unsigned_header = prepare_payment_header(
         "0x0000000000000000000000000000000000000000", 1, payment_requirements
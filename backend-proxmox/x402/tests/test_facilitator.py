@@ -0,0 +1,383 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from x402.facilitator import (
+    CircuitBreaker,
+    FacilitatorClient,
+    FacilitatorUnavailableError,
+    LatencyTracker,
+    RetryBudget,
+    SyncFacilitatorClient,
+)
+from x402.types import PaymentPayload, PaymentRequirements
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={
+            "name": "USD Coin",
+            "version": "2",
+        },
+    )
+
+
+@pytest.fixture
+def payment():
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0x1234",
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x0000000000000000000000000000000000000000",
+                "value": "10000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "00" * 32,
+            },
+        },
+    )
+
+
+def test_invalid_url():
+    with pytest.raises(ValueError):
+        FacilitatorClient({"url": "ftp://example.com"})
+    with pytest.raises(ValueError):
+        SyncFacilitatorClient({"url": "example.com"})
+
+
+def test_trailing_slash_is_stripped():
+    client = SyncFacilitatorClient({"url": "https://example.com/facilitator/"})
+    assert client.config["url"] == "https://example.com/facilitator"
+
+
+def test_sync_verify_and_settle(payment, payment_requirements):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.path, json.loads(request.content), request.headers))
+        if request.url.path.endswith("/verify"):
+            return httpx.Response(200, json={"isValid": True, "payer": "0x1"})
+        return httpx.Response(
+            200,
+            json={"success": True, "transaction": "0xabc", "network": "base-sepolia"},
+        )
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = SyncFacilitatorClient(
+        {
+            "url": "https://facilitator.test",
+            "create_headers": lambda: {"settle": {"Authorization": "Bearer t"}},
+        },
+        http_client=http_client,
+    )
+
+    verify_response = client.verify(payment, payment_requirements)
+    settle_response = client.settle(payment, payment_requirements)
+
+    assert verify_response.is_valid
+    assert verify_response.payer == "0x1"
+    assert settle_response.success
+    assert settle_response.transaction == "0xabc"
+
+    assert [path for path, _, _ in seen] == ["/verify", "/settle"]
+    body = seen[0][1]
+    assert body["x402Version"] == 1
+    assert body["paymentPayload"]["payload"]["authorization"]["from"] == (
+        "0x0000000000000000000000000000000000000001"
+    )
+    assert "outputSchema" not in body["paymentRequirements"]
+    assert "authorization" not in seen[0][2]
+    assert seen[1][2]["authorization"] == "Bearer t"
+
+
+def test_sync_clients_share_connection_pool():
+    first = SyncFacilitatorClient({"url": "https://a.test"})
+    second = SyncFacilitatorClient({"url": "https://b.test"})
+    assert first.http_client is second.http_client
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_transitions():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 10
+
+    # After the reset timeout a single probe is let through
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A failed probe re-opens the circuit
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_retry_budget_is_bounded():
+    budget = RetryBudget(ratio=0.5, burst=2)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_latency_tracker_quantile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.quantile(0.95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.quantile(0.95) == pytest.approx(0.095)
+    assert tracker.quantile(0.5) == pytest.approx(0.05)
+
+
+def stub_facilitator(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def test_async_verify_is_hedged_past_p95(payment, payment_requirements):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            # The first attempt stalls; the hedge answers
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"isValid": True, "payer": "0x1"})
+
+    client = FacilitatorClient(
+        {
+            "url": "https://facilitator.test",
+            "resilience": {"hedge_min_samples": 5, "hedge_min_delay": 0.01},
+        },
+        http_client=stub_facilitator(handler),
+    )
+    for _ in range(5):
+        client.resilience.latency("verify").record(0.02)
+
+    started = time.perf_counter()
+    response = await client.verify(payment, payment_requirements)
+
+    assert response.is_valid
+    assert calls == 2
+    assert time.perf_counter() - started < 1
+
+
+async def test_async_verify_not_hedged_without_samples(payment, payment_requirements):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json={"isValid": True, "payer": "0x1"})
+
+    client = FacilitatorClient(
+        {"url": "https://facilitator.test"}, http_client=stub_facilitator(handler)
+    )
+    await client.verify(payment, payment_requirements)
+    assert calls == 1
+    assert len(client.resilience.latency("verify")) == 1
+
+
+async def test_async_verify_retries_but_settle_does_not(payment, payment_requirements):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(502, text="bad gateway")
+
+    client = FacilitatorClient(
+        {"url": "https://facilitator.test", "resilience": {"max_retries": 1}},
+        http_client=stub_facilitator(handler),
+    )
+
+    with pytest.raises(FacilitatorUnavailableError) as verify_error:
+        await client.verify(payment, payment_requirements)
+    assert verify_error.value.endpoint == "verify"
+    assert seen == ["/verify", "/verify"]
+
+    seen.clear()
+    with pytest.raises(FacilitatorUnavailableError):
+        await client.settle(payment, payment_requirements)
+    assert seen == ["/settle"]
+
+
+async def test_async_circuit_opens_and_fails_fast(payment, payment_requirements):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = FacilitatorClient(
+        {
+            "url": "https://facilitator.test",
+            "resilience": {
+                "max_retries": 0,
+                "failure_threshold": 2,
+                "reset_timeout": 60,
+            },
+        },
+        http_client=stub_facilitator(handler),
+    )
+
+    for _ in range(2):
+        with pytest.raises(FacilitatorUnavailableError):
+            await client.verify(payment, payment_requirements)
+    assert len(seen) == 2
+
+    with pytest.raises(FacilitatorUnavailableError) as error:
+        await client.verify(payment, payment_requirements)
+    assert "circuit open" in str(error.value)
+    assert error.value.retry_after == pytest.approx(60, abs=1)
+    assert len(seen) == 2
+
+
+def test_sync_settle_retried_only_when_never_sent(payment, payment_requirements):
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"success": True, "transaction": "0xabc"})
+
+    client = SyncFacilitatorClient(
+        {"url": "https://facilitator.test"},
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+    assert client.settle(payment, payment_requirements).success
+    assert attempts == 2
+
+    def timing_out(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    client = SyncFacilitatorClient(
+        {"url": "https://facilitator.test"},
+        http_client=httpx.Client(transport=httpx.MockTransport(timing_out)),
+    )
+    with pytest.raises(FacilitatorUnavailableError):
+        client.settle(payment, payment_requirements)
+
+
+async def test_async_verify_bounded_by_deadline(payment, payment_requirements):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        # Stalls past every per-attempt timeout
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"isValid": True, "payer": "0x1"})
+
+    client = FacilitatorClient(
+        {
+            "url": "https://facilitator.test",
+            "resilience": {"timeout": 3.0, "deadline": 0.2, "max_retries": 3},
+        },
+        http_client=stub_facilitator(handler),
+    )
+
+    started = time.perf_counter()
+    with pytest.raises(FacilitatorUnavailableError) as error:
+        await client.verify(payment, payment_requirements)
+    assert time.perf_counter() - started < 1
+    assert "within 0.2s" in str(error.value)
+    assert calls == 1
+
+
+def test_sync_retries_stop_at_deadline(payment, payment_requirements):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        time.sleep(0.15)
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    client = SyncFacilitatorClient(
+        {
+            "url": "https://facilitator.test",
+            "resilience": {"deadline": 0.2, "max_retries": 5},
+        },
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+
+    started = time.perf_counter()
+    with pytest.raises(FacilitatorUnavailableError):
+        client.verify(payment, payment_requirements)
+    assert time.perf_counter() - started < 1
+    assert calls == 2
+
+
+async def test_sync_client_caches_async_headers(payment, payment_requirements):
+    created = 0
+
+    async def create_headers():
+        nonlocal created
+        created += 1
+        return {"verify": {"Authorization": f"Bearer {created}"}}
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("authorization"))
+        return httpx.Response(200, json={"isValid": True, "payer": "0x1"})
+
+    client = SyncFacilitatorClient(
+        {"url": "https://facilitator.test", "create_headers": create_headers},
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+    # Called from inside a running event loop
+    for _ in range(3):
+        assert client.verify(payment, payment_requirements).is_valid
+    assert created == 1
+    assert seen == ["Bearer 1"] * 3
+
+    # Resolved again once the cached headers expire
+    client.config["headers_ttl"] = 0
+    client._async_headers = None
+    client.verify(payment, payment_requirements)
+    client.verify(payment, payment_requirements)
+    assert created == 3
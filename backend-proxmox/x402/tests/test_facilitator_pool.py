@@ -0,0 +1,293 @@
+import asyncio
+
+import httpx
+import pytest
+from x402.facilitator import (
+    CircuitBreaker,
+    FacilitatorClient,
+    FacilitatorUnavailableError,
+    SyncFacilitatorClient,
+)
+from x402.facilitator_pool import (
+    FacilitatorPool,
+    SyncFacilitatorPool,
+    create_facilitator,
+    create_sync_facilitator,
+)
+from x402.types import PaymentPayload, PaymentRequirements
+
+URLS = ["https://a.facilitator.test", "https://b.facilitator.test"]
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={"name": "USD Coin", "version": "2"},
+    )
+
+
+def make_payment(nonce_byte: int = 0) -> PaymentPayload:
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0x1234",
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x0000000000000000000000000000000000000000",
+                "value": "10000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + f"{nonce_byte:02x}" * 32,
+            },
+        },
+    )
+
+
+def facilitator_handler(calls, down=()):
+    def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        calls.append((host, request.url.path))
+        if host in down:
+            return httpx.Response(503)
+        if request.url.path.endswith("/verify"):
+            return httpx.Response(200, json={"isValid": True, "payer": host})
+        return httpx.Response(
+            200,
+            json={"success": True, "transaction": host, "network": "base-sepolia"},
+        )
+
+    return handler
+
+
+def test_factories_return_pool_only_with_urls():
+    assert isinstance(create_facilitator(), FacilitatorClient)
+    assert isinstance(
+        create_sync_facilitator({"url": "https://x.test"}), SyncFacilitatorClient
+    )
+    pool = create_facilitator({"urls": URLS, "health_check_interval": 0})
+    assert isinstance(pool, FacilitatorPool)
+    assert [m.url for m in pool.members] == URLS
+
+
+def test_factories_share_one_pool_per_config():
+    config = {"urls": URLS, "health_check_interval": 60}
+    pool = create_sync_facilitator(config)
+    assert create_sync_facilitator(dict(config)) is pool
+    assert create_facilitator(config) is not pool
+    assert create_sync_facilitator({**config, "routing": "latency"}) is not pool
+
+    # A pool on the caller's own HTTP client belongs to the caller
+    with httpx.Client() as http_client:
+        owned = create_sync_facilitator(config, http_client=http_client)
+        assert owned is not pool
+        owned.close()
+
+
+def test_invalid_routing():
+    with pytest.raises(ValueError):
+        SyncFacilitatorPool({"urls": URLS, "routing": "random"})
+
+
+def test_least_outstanding_routing():
+    pool = SyncFacilitatorPool({"urls": URLS, "health_check_interval": 0})
+    first = pool._acquire([])
+    second = pool._acquire([])
+    assert first is not second
+    pool._release(first)
+    assert pool._acquire([]) is first
+
+
+def test_latency_routing_prefers_faster_member():
+    pool = SyncFacilitatorPool(
+        {"urls": URLS, "routing": "latency", "health_check_interval": 0}
+    )
+    slow, fast = pool.members
+    for _ in range(5):
+        slow.client.resilience.latency("verify").record(0.5)
+        fast.client.resilience.latency("verify").record(0.05)
+    assert pool._acquire([]) is fast
+    # Load shifts traffic once the fast member is busy enough
+    for _ in range(10):
+        fast.outstanding += 1
+    assert pool._acquire([]) is slow
+
+
+def test_sync_verify_fails_over_and_settle_is_pinned(payment_requirements):
+    calls = []
+    http_client = httpx.Client(
+        transport=httpx.MockTransport(
+            facilitator_handler(calls, down={"a.facilitator.test"})
+        )
+    )
+    pool = SyncFacilitatorPool(
+        {
+            "urls": URLS,
+            "health_check_interval": 0,
+            "resilience": {"max_retries": 0},
+        },
+        http_client=http_client,
+    )
+    # Make the failing member the first choice
+    pool.members[1].outstanding += 1
+    payment = make_payment()
+
+    verify = pool.verify(payment, payment_requirements)
+    assert verify.is_valid and verify.payer == "b.facilitator.test"
+    pool.members[1].outstanding -= 1
+
+    # Even with "a" recovered and less loaded, settle goes to the verifier
+    pool.members[0].healthy = True
+    pool.members[1].outstanding += 5
+    settle = pool.settle(payment, payment_requirements)
+    assert settle.transaction == "b.facilitator.test"
+    assert pool.members[1].outstanding == 5
+
+
+def test_sync_verify_raises_when_all_members_fail(payment_requirements):
+    calls = []
+    http_client = httpx.Client(
+        transport=httpx.MockTransport(
+            facilitator_handler(
+                calls, down={"a.facilitator.test", "b.facilitator.test"}
+            )
+        )
+    )
+    pool = SyncFacilitatorPool(
+        {
+            "urls": URLS,
+            "health_check_interval": 0,
+            "resilience": {"max_retries": 0},
+        },
+        http_client=http_client,
+    )
+    with pytest.raises(FacilitatorUnavailableError):
+        pool.verify(make_payment(), payment_requirements)
+    assert sorted(host for host, _ in calls) == [
+        "a.facilitator.test",
+        "b.facilitator.test",
+    ]
+    assert all(m.outstanding == 0 for m in pool.members)
+
+
+def test_open_circuit_takes_member_out_of_rotation():
+    pool = SyncFacilitatorPool(
+        {
+            "urls": URLS,
+            "health_check_interval": 0,
+            "resilience": {"failure_threshold": 1, "reset_timeout": 60},
+        }
+    )
+    pool.members[0].client.resilience.breaker.record_failure()
+    assert pool.members[0].client.resilience.breaker.state == CircuitBreaker.OPEN
+    for _ in range(3):
+        member = pool._acquire([])
+        assert member is pool.members[1]
+
+
+def health_handler(probes):
+    def handler(request: httpx.Request) -> httpx.Response:
+        probes.append((request.url.host, request.headers.get("authorization")))
+        if request.headers.get("authorization") != "Bearer probe":
+            return httpx.Response(401, json={})
+        status = 200 if request.url.host == "b.facilitator.test" else 502
+        return httpx.Response(status, json={})
+
+    return handler
+
+
+HEALTH_CONFIG = {
+    "urls": URLS,
+    "health_check_interval": 0,
+    "create_headers": lambda: {"supported": {"Authorization": "Bearer probe"}},
+}
+
+
+def test_health_check_marks_members():
+    probes = []
+    pool = SyncFacilitatorPool(
+        HEALTH_CONFIG,
+        http_client=httpx.Client(transport=httpx.MockTransport(health_handler(probes))),
+    )
+    pool.check_health()
+    assert [m.healthy for m in pool.members] == [False, True]
+    assert pool._acquire([]) is pool.members[1]
+    # Probes carry the members' auth headers, on the members' own client
+    assert probes == [
+        ("a.facilitator.test", "Bearer probe"),
+        ("b.facilitator.test", "Bearer probe"),
+    ]
+
+
+async def test_async_health_check_runs_on_the_serving_loop(payment_requirements):
+    probes = []
+    handle = facilitator_handler([])
+    check = health_handler(probes)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/supported":
+            return check(request)
+        return handle(request)
+
+    async def create_headers():
+        return {"supported": {"Authorization": "Bearer probe"}}
+
+    pool = FacilitatorPool(
+        {**HEALTH_CONFIG, "create_headers": create_headers},
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    # Not used on any loop yet, so the health thread has nothing to probe
+    pool._run_health_check()
+    assert probes == []
+
+    await pool.verify(make_payment(), payment_requirements)
+    await asyncio.to_thread(pool._run_health_check)
+    assert [m.healthy for m in pool.members] == [False, True]
+    assert sorted(probes) == [
+        ("a.facilitator.test", "Bearer probe"),
+        ("b.facilitator.test", "Bearer probe"),
+    ]
+
+
+async def test_async_pool_spreads_concurrent_verifies(payment_requirements):
+    calls = []
+    release = asyncio.Event()
+    handle = facilitator_handler(calls)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/verify"):
+            await release.wait()
+        return handle(request)
+
+    pool = FacilitatorPool(
+        {"urls": URLS, "health_check_interval": 0},
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    tasks = [
+        asyncio.create_task(pool.verify(make_payment(i), payment_requirements))
+        for i in range(4)
+    ]
+    await asyncio.sleep(0.01)
+    assert [m.outstanding for m in pool.members] == [2, 2]
+    release.set()
+    responses = await asyncio.gather(*tasks)
+
+    # Each payment settles where it was verified
+    for i, verify in enumerate(responses):
+        settle = await pool.settle(make_payment(i), payment_requirements)
+        assert settle.transaction == verify.payer
+    verify_hosts = [host for host, path in calls if path.endswith("/verify")]
+    assert (
+        sorted(verify_hosts) == ["a.facilitator.test"] * 2 + ["b.facilitator.test"] * 2
+    )
@@ -0,0 +1,60 @@
+from x402.path import RouteIndex, compile_path_pattern, path_is_match
+
+
+def test_compile_path_pattern_matches_path_is_match():
+    patterns = [
+        "/exact",
+        "/api/*",
+        "/api/*/profile",
+        "/file?.txt",
+        "regex:^/users/\\d+$",
+    ]
+    paths = [
+        "/exact",
+        "/exact/",
+        "/api/users",
+        "/api/user/profile",
+        "/file1.txt",
+        "/users/123",
+        "/users/abc",
+        "/other",
+        "",
+    ]
+
+    for pattern in patterns:
+        matcher = compile_path_pattern(pattern)
+        for path in paths:
+            assert matcher(path) == path_is_match(pattern, path), (pattern, path)
+
+
+def test_route_index_first_registration_wins():
+    index = RouteIndex()
+    index.add("/api/*", "glob")
+    index.add("/api/users", "exact")
+    index.add(["regex:^/users/\\d+$", "/admin"], "list")
+    index.add("*", "catch-all")
+
+    assert len(index) == 4
+    assert index.match("/api/users") == "glob"
+    assert index.match("/users/1") == "list"
+    assert index.match("/admin") == "list"
+    assert index.match("/anything") == "catch-all"
+
+
+def test_route_index_exact_before_later_patterns():
+    index = RouteIndex()
+    index.add("/api/users", "exact")
+    index.add("/api/*", "glob")
+
+    assert index.match("/api/users") == "exact"
+    assert index.match("/api/posts") == "glob"
+    assert index.match("/other") is None
+
+
+def test_route_index_add_invalidates_cache():
+    index = RouteIndex()
+    index.add("/a", "a")
+    assert index.match("/b") is None
+
+    index.add("/b", "b")
+    assert index.match("/b") == "b"
@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+from x402.payment_log import PaymentEventLogger, describe_signature
+from x402.types import PaymentPayload
+
+
+@pytest.fixture
+def payment_log():
+    return PaymentEventLogger(logging.getLogger("x402.tests.payments"))
+
+
+@pytest.fixture
+def payment():
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0x" + "ab" * 65,
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x0000000000000000000000000000000000000002",
+                "value": "10000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + "00" * 32,
+            },
+        },
+    )
+
+
+def test_describe_signature():
+    assert describe_signature("0x" + "ab" * 65) == {"length": 132, "kind": "eoa"}
+    assert describe_signature("0x" + "ab" * 100)["kind"] == "smart-wallet"
+    assert describe_signature("0x1234")["kind"] == "invalid"
+
+
+def test_emit_single_structured_record(payment_log, caplog):
+    caplog.set_level(logging.INFO, logger="x402.tests.payments")
+
+    event = payment_log.start(method="GET", path="/protected")
+    event.update(payer="0x1")
+    payment_log.emit(event, "settled", transaction="0xabc")
+
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    assert record.levelno == logging.INFO
+    assert record.x402_payment["outcome"] == "settled"
+    assert record.x402_payment["payer"] == "0x1"
+    assert record.x402_payment["transaction"] == "0xabc"
+    assert '"path": "/protected"' in record.getMessage()
+
+
+def test_failures_are_warnings_and_never_sampled(payment_log, caplog):
+    caplog.set_level(logging.INFO, logger="x402.tests.payments")
+    payment_log.set_sample_rate(0.0)
+
+    payment_log.emit(payment_log.start(), "settled")
+    payment_log.emit(payment_log.start(), "invalid", error="bad signature")
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelno == logging.WARNING
+    assert caplog.records[0].x402_payment["error"] == "bad signature"
+
+
+def test_invalid_sample_rate(payment_log):
+    with pytest.raises(ValueError):
+        payment_log.set_sample_rate(1.5)
+
+
+def test_debug_payment_is_gated(payment_log, payment, caplog):
+    caplog.set_level(logging.DEBUG, logger="x402.tests.payments")
+
+    payment_log.debug_payment(payment)
+    assert caplog.records == []
+
+    payment_log.set_debug(True)
+    payment_log.debug_payment(payment)
+    assert len(caplog.records) == 1
+    assert '"kind": "eoa"' in caplog.records[0].getMessage()
+
+
+def test_disabled_level_skips_formatting(payment_log, caplog):
+    caplog.set_level(logging.ERROR, logger="x402.tests.payments")
+    event = payment_log.start()
+
+    payment_log.emit(event, "settled")
+
+    assert caplog.records == []
+    assert "outcome" not in event.fields
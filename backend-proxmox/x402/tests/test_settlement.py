@@ -0,0 +1,196 @@
+import asyncio
+import time
+
+import pytest
+from x402.facilitator import FacilitatorUnavailableError
+from x402.settlement import SettlementBatcher, SettlementJournal
+from x402.types import PaymentPayload, PaymentRequirements, SettleResponse
+
+
+@pytest.fixture
+def payment_requirements():
+    return PaymentRequirements(
+        scheme="exact",
+        network="base-sepolia",
+        asset="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
+        pay_to="0x0000000000000000000000000000000000000000",
+        max_amount_required="10000",
+        resource="https://example.com",
+        description="test",
+        max_timeout_seconds=1000,
+        mime_type="text/plain",
+        output_schema=None,
+        extra={"name": "USD Coin", "version": "2"},
+    )
+
+
+def make_payment(nonce_byte: int) -> PaymentPayload:
+    return PaymentPayload(
+        x402_version=1,
+        scheme="exact",
+        network="base-sepolia",
+        payload={
+            "signature": "0x1234",
+            "authorization": {
+                "from": "0x0000000000000000000000000000000000000001",
+                "to": "0x0000000000000000000000000000000000000000",
+                "value": "10000",
+                "validAfter": "0",
+                "validBefore": "9999999999",
+                "nonce": "0x" + f"{nonce_byte:02x}" * 32,
+            },
+        },
+    )
+
+
+class StubFacilitator:
+    """Settles every payment, tracking how many calls overlap."""
+
+    def __init__(self, fail_nonces=(), unavailable=False):
+        self.fail_nonces = set(fail_nonces)
+        self.unavailable = unavailable
+        self.settled = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def settle(self, payment, payment_requirements):
+        if self.unavailable:
+            raise FacilitatorUnavailableError("down", "settle")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        nonce = payment.payload.authorization.nonce
+        self.settled.append(nonce)
+        if nonce in self.fail_nonces:
+            return SettleResponse(success=False, error_reason="invalid_nonce")
+        return SettleResponse(success=True, transaction=nonce, network="base-sepolia")
+
+
+async def test_settlements_are_batched_with_individual_results(payment_requirements):
+    facilitator = StubFacilitator(fail_nonces={"0x" + "02" * 32})
+    batcher = SettlementBatcher(facilitator, {"window": 0.05, "max_batch": 100})
+
+    payments = [make_payment(i) for i in range(5)]
+    responses = await asyncio.gather(
+        *(batcher.settle(p, payment_requirements) for p in payments)
+    )
+
+    assert facilitator.max_in_flight == 5
+    for i, response in enumerate(responses):
+        nonce = payments[i].payload.authorization.nonce
+        if i == 2:
+            assert not response.success
+        else:
+            assert response.transaction == nonce
+
+
+async def test_full_batch_flushes_without_waiting(payment_requirements):
+    facilitator = StubFacilitator()
+    batcher = SettlementBatcher(facilitator, {"window": 60, "max_batch": 2})
+
+    responses = await asyncio.wait_for(
+        asyncio.gather(
+            batcher.settle(make_payment(1), payment_requirements),
+            batcher.settle(make_payment(2), payment_requirements),
+        ),
+        timeout=1,
+    )
+    assert all(r.success for r in responses)
+
+
+async def test_errors_reach_only_their_caller(payment_requirements):
+    batcher = SettlementBatcher(StubFacilitator(unavailable=True), {"window": 0})
+    with pytest.raises(FacilitatorUnavailableError):
+        await batcher.settle(make_payment(1), payment_requirements)
+
+
+async def test_failed_settle_is_not_journaled(tmp_path, payment_requirements):
+    # The caller rejects the response, so the payer must not be charged later
+    batcher = SettlementBatcher(
+        StubFacilitator(unavailable=True),
+        {"window": 0, "journal_path": tmp_path / "settlements.db"},
+    )
+    with pytest.raises(FacilitatorUnavailableError):
+        await batcher.settle(make_payment(1), payment_requirements)
+    await batcher.aclose()
+    assert batcher.journal.pending() == []
+
+
+async def test_settle_later_retries_until_settled(tmp_path, payment_requirements):
+    facilitator = StubFacilitator(unavailable=True)
+    batcher = SettlementBatcher(
+        facilitator,
+        {
+            "window": 0,
+            "journal_path": tmp_path / "settlements.db",
+            "retry_interval": 0.01,
+        },
+    )
+    await batcher.settle_later(make_payment(1), payment_requirements)
+    await asyncio.sleep(0.02)
+    assert len(batcher.journal.pending()) == 1
+
+    facilitator.unavailable = False
+    await asyncio.sleep(0.05)
+    await batcher.aclose()
+    assert batcher.journal.pending() == []
+    assert batcher.journal.status(1)[0] == SettlementJournal.SETTLED
+
+
+async def test_pending_settlements_survive_restart(tmp_path, payment_requirements):
+    journal_path = tmp_path / "settlements.db"
+    down = SettlementBatcher(
+        StubFacilitator(unavailable=True), {"window": 0, "journal_path": journal_path}
+    )
+    for i in range(3):
+        await down.settle_later(make_payment(i), payment_requirements)
+    await down.aclose()
+    assert len(down.journal.pending()) == 3
+    down.journal.close()
+
+    # After a restart, the first settle also resubmits what was left pending
+    facilitator = StubFacilitator()
+    restarted = SettlementBatcher(
+        facilitator, {"window": 0, "journal_path": journal_path}
+    )
+    response = await restarted.settle(make_payment(9), payment_requirements)
+    await asyncio.sleep(0.05)
+    await restarted.aclose()
+
+    assert response.success
+    assert sorted(facilitator.settled) == sorted(
+        make_payment(i).payload.authorization.nonce for i in (0, 1, 2, 9)
+    )
+    assert restarted.journal.pending() == []
+    assert restarted.journal.status(1)[0] == SettlementJournal.SETTLED
+
+
+async def test_settle_later_gives_up_after_max_attempts(tmp_path, payment_requirements):
+    config = {
+        "window": 0,
+        "journal_path": tmp_path / "settlements.db",
+        "max_attempts": 2,
+        "retry_interval": 0.01,
+    }
+    batcher = SettlementBatcher(StubFacilitator(unavailable=True), config)
+    await batcher.settle_later(make_payment(1), payment_requirements)
+    await asyncio.sleep(0.1)
+    await batcher.aclose()
+
+    assert await batcher.recover() == 0
+    status, result = batcher.journal.status(1)
+    assert status == SettlementJournal.FAILED
+    assert "attempts" in result
+
+
+def test_prune_keeps_pending_rows(tmp_path, payment_requirements):
+    journal = SettlementJournal(tmp_path / "settlements.db")
+    settled = journal.add(make_payment(1), payment_requirements)
+    journal.complete(settled, SettleResponse(success=True, network="base-sepolia"))
+    journal.add(make_payment(2), payment_requirements)
+
+    assert journal.prune(older_than=0) == 0
+    assert journal.prune(older_than=time.time() + 1) == 1
+    assert journal.status(settled) is None
+    assert len(journal.pending()) == 1
@@ -1,4 +1,10 @@
+import json
+from dataclasses import FrozenInstanceError
+
+import pytest
+
 from x402.types import (
+    CompactPaymentPayload,
     PaymentRequirements,
     x402PaymentRequiredResponse,
     ExactPaymentPayload,
@@ -155,6 +161,62 @@ def test_payment_payload_serde():
     assert PaymentPayload(**expected) == original
 
 
+def test_compact_payment_payload_wire_compatible():
+    wire = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base",
+        "payload": {
+            "signature": "0x123",
+            "authorization": {
+                "from": "0x123",
+                "to": "0x456",
+                "value": "1000",
+                "validAfter": "0",
+                "validBefore": "1000",
+                "nonce": "0x789",
+            },
+        },
+    }
+    raw = json.dumps(wire)
+    compact = CompactPaymentPayload.model_validate_json(raw)
+    full = PaymentPayload.model_validate_json(raw)
+
+    assert compact.payload.authorization.from_ == full.payload.authorization.from_
+    assert compact.model_dump(by_alias=True) == full.model_dump(by_alias=True) == wire
+    assert json.loads(compact.model_dump_json(by_alias=True)) == wire
+    assert compact.to_model() == full
+    assert not hasattr(compact, "__dict__")
+
+    with pytest.raises(FrozenInstanceError):
+        compact.scheme = "other"
+
+
+def test_compact_payment_payload_validates():
+    wire = {
+        "x402Version": 1,
+        "scheme": "exact",
+        "network": "base",
+        "payload": {
+            "signature": "0x123",
+            "authorization": {
+                "from": "0x123",
+                "to": "0x456",
+                "value": "not a number",
+                "validAfter": "0",
+                "validBefore": "1000",
+                "nonce": "0x789",
+            },
+        },
+    }
+    with pytest.raises(ValueError):
+        CompactPaymentPayload.model_validate_json(json.dumps(wire))
+
+    del wire["payload"]["authorization"]
+    with pytest.raises(ValueError):
+        CompactPaymentPayload.model_validate_json(json.dumps(wire))
+
+
 def test_x402_headers_serde():
     original = X402Headers(x_payment="test-payment")
     expected = {"x_payment": "test-payment"}
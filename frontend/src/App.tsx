@@ -81,6 +81,9 @@ function App() {
   // Track the message that triggered the payment to retry it
   const [pendingMessageContent, setPendingMessageContent] = useState<string | null>(null);
 
+  // Server-side session id; once known, only new messages are sent
+  const [conversationId, setConversationId] = useState<string | null>(null);
+
   const inputRef = useRef<HTMLTextAreaElement | null>(null);
   const messagesRef = useRef<HTMLElement | null>(null);
 
@@ -158,11 +161,18 @@ function App() {
     }
 
     try {
+      // Always send the history: the server ignores it while it holds the
+      // session, and rebuilds the conversation from it after a restart or
+      // once the session has been evicted.
       const body: any = {
         message: content,
         history: historyPayload,
       };
 
+      if (conversationId) {
+        body.conversation_id = conversationId;
+      }
+
       if (paymentHeaders) {
         body.payment_headers = paymentHeaders;
       }
@@ -182,6 +192,10 @@ function App() {
 
       const data = await response.json();
 
+      if (data.conversation_id) {
+        setConversationId(data.conversation_id);
+      }
+
       if (data.payment_request) {
         // 402 encountered
         setPendingPayment(data.payment_request);